@@ -4,8 +4,13 @@ Strategy: parse the document into a tree of sections by header level,
 then emit each leaf section (deepest subsection) as a single chunk with
 its parent header chain prepended for context.  Sections are only split
 by paragraphs as a last resort when they exceed a hard ceiling.
+
+Chunk IDs are content-addressed (source + header path + content hash), so
+editing one section leaves the IDs of every other section untouched.
 """
 
+import hashlib
+import json
 import re
 from dataclasses import dataclass, field
 
@@ -15,6 +20,20 @@ class Chunk:
     text: str
     metadata: dict = field(default_factory=dict)
 
+    @property
+    def id(self) -> str:
+        """Stable ID: ``{source}:{path hash}:{content hash}``.
+
+        Unlike a positional index, the ID only changes when the chunk's own
+        header path, text or metadata changes.
+        """
+        source = self.metadata.get("source", "")
+        path = self.metadata.get("path", "")
+        path_hash = hashlib.sha256(path.encode("utf-8")).hexdigest()[:8]
+        payload = self.text + "\0" + json.dumps(self.metadata, sort_keys=True)
+        content_hash = hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+        return f"{source}:{path_hash}:{content_hash}"
+
 
 # ---------------------------------------------------------------------------
 # Helpers
@@ -117,6 +136,11 @@ def _header_chain(ancestors: list[_Section]) -> str:
     return "\n\n".join(s.header for s in ancestors if s.header)
 
 
+def _header_path(ancestors: list[_Section], section: _Section) -> str:
+    """Build the ``A > B > C`` title path for a section (excluding root)."""
+    return " > ".join(s.title for s in ancestors + [section] if s.title)
+
+
 def _section_full_text(section: _Section) -> str:
     """Recursively collect all text under a section (header + body + children)."""
     parts: list[str] = []
@@ -129,20 +153,20 @@ def _section_full_text(section: _Section) -> str:
     return "\n\n".join(parts)
 
 
-def _emit_chunk(text: str, source: str, title: str, chunks: list[Chunk]) -> None:
+def _emit_chunk(text: str, source: str, title: str, path: str, chunks: list[Chunk]) -> None:
     """Create a Chunk from text, extracting images and cleaning for embedding."""
     text = text.strip()
     if not text:
         return
     images = _extract_image_refs(text)
-    meta: dict = {"source": source, "section": title}
+    meta: dict = {"source": source, "section": title, "path": path}
     if images:
         meta["images"] = images
     embedding_text = _clean_images_for_embedding(text)
     chunks.append(Chunk(text=embedding_text, metadata=meta))
 
 
-def _split_oversized(text: str, source: str, title: str, chunks: list[Chunk]) -> None:
+def _split_oversized(text: str, source: str, title: str, path: str, chunks: list[Chunk]) -> None:
     """Last-resort split for a section that exceeds _HARD_CEILING.
 
     Splits by paragraphs, accumulating until the ceiling.  Each sub-chunk
@@ -152,11 +176,11 @@ def _split_oversized(text: str, source: str, title: str, chunks: list[Chunk]) ->
     current = ""
     for para in paragraphs:
         if current and len(current) + 2 + len(para) > _HARD_CEILING:
-            _emit_chunk(current, source, title, chunks)
+            _emit_chunk(current, source, title, path, chunks)
             current = para
         else:
             current = current + "\n\n" + para if current else para
-    _emit_chunk(current, source, title, chunks)
+    _emit_chunk(current, source, title, path, chunks)
 
 
 def _walk(
@@ -180,11 +204,12 @@ def _walk(
     full_text = _section_full_text(section)
     context_prefix = _header_chain(ancestors)
     title = section.title or (ancestors[-1].title if ancestors else "")
+    path = _header_path(ancestors, section)
 
     # Case 1: entire subtree fits comfortably → single chunk
     if len(full_text) <= soft_limit:
         chunk_text = context_prefix + "\n\n" + full_text if context_prefix else full_text
-        _emit_chunk(chunk_text, source, title, chunks)
+        _emit_chunk(chunk_text, source, title, path, chunks)
         return
 
     # Case 2: has children → emit own body, recurse children
@@ -199,7 +224,7 @@ def _walk(
             own_parts.append(section.body)
         own_text = "\n\n".join(own_parts)
         if own_text.strip():
-            _emit_chunk(own_text, source, title, chunks)
+            _emit_chunk(own_text, source, title, path, chunks)
 
         new_ancestors = ancestors + [section]
         for child in section.children:
@@ -220,9 +245,9 @@ def _walk(
         # Prepend context header to each sub-chunk's title area
         header_block = context_prefix + "\n\n" + section.header if context_prefix and section.header else (context_prefix or section.header or "")
         body_to_split = header_block + "\n\n" + section.body if header_block else section.body
-        _split_oversized(body_to_split, source, title, chunks)
+        _split_oversized(body_to_split, source, title, path, chunks)
     else:
-        _emit_chunk(chunk_text, source, title, chunks)
+        _emit_chunk(chunk_text, source, title, path, chunks)
 
 
 # ---------------------------------------------------------------------------
@@ -256,7 +281,7 @@ def chunk_markdown(
 
     # Handle preamble (text before first header)
     if root.body:
-        _emit_chunk(root.body, source, "", chunks)
+        _emit_chunk(root.body, source, "", "", chunks)
 
     for child in root.children:
         _walk(child, [], source, chunks, soft_limit=max_chunk_size)
@@ -0,0 +1,242 @@
+"""Prometheus metrics served at ``GET /metrics`` (mirrors mcp-web-py).
+
+A minimal implementation of the Prometheus text exposition format (0.0.4)
+with counters, gauges and fixed-bucket histograms; recording a sample is a
+dict lookup, a lock and an addition, so instrumentation stays on in
+production.  Label values must come from a bounded set (method and tool
+names are mapped to ``other`` when unknown) to keep the series count small.
+
+Every metric of the RAG server is defined here.
+"""
+import bisect
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds, covering cache hits (sub-millisecond) to deadline-bound calls
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = labels
+        self._children: dict[tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        if not labels:
+            self.labels()  # an unlabeled series is exposed from the start
+
+    def labels(self, *values: str):
+        """The child series for *values* (one per label name), created on first use."""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.label_names):
+                raise ValueError(f"{self.name} expects labels {self.label_names}, got {values}")
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _samples(self, values: tuple[str, ...], child) -> Iterator[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in sorted(self._children.items()):
+            lines.extend(self._samples(values, child))
+        return "\n".join(lines)
+
+
+class _Value:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class _Scalar(_Metric):
+    def _new_child(self) -> _Value:
+        return _Value()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+    def _samples(self, values, child) -> Iterator[str]:
+        yield f"{self.name}{_format_labels(self.label_names, values)} {_format_value(child.value)}"
+
+
+class Counter(_Scalar):
+    """Monotonic count (name it ``..._total``)."""
+
+    kind = "counter"
+
+
+class Gauge(_Scalar):
+    """Value that goes up and down (in-flight work)."""
+
+    kind = "gauge"
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.labels().dec(amount)
+
+    @contextmanager
+    def track(self, *values: str) -> Iterator[None]:
+        """Count the body of the ``with`` block as in flight."""
+        child = self.labels(*values)
+        child.inc()
+        try:
+            yield
+        finally:
+            child.dec()
+
+
+class _Buckets:
+    __slots__ = ("bounds", "counts", "sum", "_lock")
+
+    def __init__(self, bounds: tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # the last one is +Inf
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+
+class Histogram(_Metric):
+    """Distribution over fixed upper bounds (seconds by default)."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = (),
+                 buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, help, labels)
+
+    def _new_child(self) -> _Buckets:
+        return _Buckets(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def _samples(self, values, child) -> Iterator[str]:
+        with child._lock:
+            counts, total = list(child.counts), child.sum
+        cumulative = 0
+        for bound, count in zip((*self.buckets, math.inf), counts):
+            cumulative += count
+            le = f'le="{_format_value(bound)}"'
+            yield f"{self.name}_bucket{_format_labels(self.label_names, values, le)} {cumulative}"
+        labels = _format_labels(self.label_names, values)
+        yield f"{self.name}_sum{labels} {_format_value(total)}"
+        yield f"{self.name}_count{labels} {cumulative}"
+
+
+class Registry:
+    """Ordered set of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labels: tuple[str, ...] = ()) -> Counter:
+        return self.register(Counter(name, help, labels))
+
+    def gauge(self, name: str, help: str, labels: tuple[str, ...] = ()) -> Gauge:
+        return self.register(Gauge(name, help, labels))
+
+    def histogram(self, name: str, help: str, labels: tuple[str, ...] = (),
+                  buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help, labels, buckets))
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+registry = Registry()
+
+# -- JSON-RPC transport ------------------------------------------------------
+
+rpc_seconds = registry.histogram(
+    "mcp_rpc_duration_seconds", "JSON-RPC request latency by method.", ("method",))
+rpc_errors = registry.counter(
+    "mcp_rpc_errors_total", "JSON-RPC error responses by method and error code.", ("method", "code"))
+rpc_in_flight = registry.gauge(
+    "mcp_rpc_in_flight", "JSON-RPC messages being handled.")
+rpc_batch_size = registry.histogram(
+    "mcp_rpc_batch_size", "Messages per JSON-RPC batch.", buckets=(1, 2, 4, 8, 16, 32, 64))
+
+# -- Tools -------------------------------------------------------------------
+
+tool_seconds = registry.histogram(
+    "mcp_tool_duration_seconds", "Tool call latency.", ("tool",))
+tool_errors = registry.counter(
+    "mcp_tool_errors_total", "Tool calls that raised, by tool.", ("tool",))
+tool_in_flight = registry.gauge(
+    "mcp_tool_in_flight", "Tool calls running.", ("tool",))
+
+# -- Retrieval stages --------------------------------------------------------
+
+search_stage_seconds = registry.histogram(
+    "rag_search_stage_duration_seconds", "Per-stage search timings "
+    "(embedding, vector_query, serialization).", ("stage",))
+search_results = registry.histogram(
+    "rag_search_results", "Chunks returned per search.", buckets=(0, 1, 2, 3, 4, 5, 6))
+indexed_chunks = registry.gauge(
+    "rag_indexed_chunks", "Chunks in the collection after the startup sync.")
@@ -2,16 +2,20 @@
 """
 MCP RAG Server - Semantic search over Unicity knowledge base.
 
-Read-only vector search via ChromaDB. Reindexes from the data directory
-on every startup, so the admin workflow is:
+Read-only vector search via ChromaDB. Syncs with the data directory on
+every startup (only changed sections are re-embedded), so the admin
+workflow is:
   1. Edit / add / remove markdown files in the mounted docs folder
   2. docker compose restart mcp-rag
 """
 
+import asyncio
 import base64
 import json
 import mimetypes
 import os
+import time
+from dataclasses import dataclass
 from glob import glob
 
 from mcp.server import Server
@@ -19,11 +23,14 @@ from mcp.types import Tool, TextContent, ImageContent
 from starlette.applications import Starlette
 from starlette.routing import Route
 from starlette.requests import Request
-from starlette.responses import JSONResponse
+from starlette.responses import JSONResponse, Response
 import uvicorn
 import chromadb
+from chromadb.utils import embedding_functions
 
+from src import metrics, tracing
 from src.chunker import chunk_markdown
+from src.profiler import profiler
 
 # ---------------------------------------------------------------------------
 # Configuration
@@ -31,11 +38,17 @@ from src.chunker import chunk_markdown
 DATA_DIR = os.environ.get("DATA_DIR", "/data/docs")
 DB_DIR = os.environ.get("DB_DIR", "/data/chromadb")
 COLLECTION_NAME = "unicity_kb"
+# Searches run at once in worker threads; more wait for a slot
+RAG_SEARCH_CONCURRENCY = int(os.environ.get("RAG_SEARCH_CONCURRENCY", 4))
+# Messages accepted in one JSON-RPC batch
+MCP_BATCH_MAX_SIZE = int(os.environ.get("MCP_BATCH_MAX_SIZE", 32))
 
 # ---------------------------------------------------------------------------
 # ChromaDB setup
 # ---------------------------------------------------------------------------
 chroma_client = chromadb.PersistentClient(path=DB_DIR)
+# Chroma's default model, held here so searches can time embedding on its own
+embedding_function = embedding_functions.DefaultEmbeddingFunction()
 
 # ---------------------------------------------------------------------------
 # MCP server
@@ -62,20 +75,34 @@ def _load_image(filename: str) -> tuple[str, str] | None:
 # Ingestion (runs once at startup)
 # ---------------------------------------------------------------------------
 
+def _existing_ids_by_source(coll) -> dict[str, set[str]]:
+    """Group the IDs currently stored in *coll* by their ``source`` metadata."""
+    existing = coll.get(include=["metadatas"])
+    by_source: dict[str, set[str]] = {}
+    for chunk_id, meta in zip(existing["ids"], existing["metadatas"]):
+        source = (meta or {}).get("source", "")
+        by_source.setdefault(source, set()).add(chunk_id)
+    return by_source
+
+
 def reindex(directory: str) -> dict:
-    """Drop the collection and re-ingest every *.md file from *directory*."""
-    try:
-        chroma_client.delete_collection(COLLECTION_NAME)
-    except Exception:
-        pass
+    """Sync the collection with every *.md file in *directory*.
 
+    Chunk IDs are content-addressed, so each file is diffed against what is
+    already stored: only new or changed sections are embedded, and sections
+    that disappeared (including whole files) are deleted.
+    """
     coll = chroma_client.get_or_create_collection(
         name=COLLECTION_NAME,
         metadata={"hnsw:space": "cosine"},
+        embedding_function=embedding_function,
     )
+    stale = _existing_ids_by_source(coll)
 
     md_files = sorted(glob(os.path.join(directory, "*.md")))
     total_chunks = 0
+    total_added = 0
+    total_deleted = 0
     ingested: list[dict] = []
 
     for filepath in md_files:
@@ -87,16 +114,49 @@ def reindex(directory: str) -> dict:
         if not chunks:
             continue
 
-        ids = [f"{filename}:{i}" for i in range(len(chunks))]
-        documents = [c.text for c in chunks]
-        metadatas = [c.metadata for c in chunks]
-
-        coll.add(ids=ids, documents=documents, metadatas=metadatas)
-        total_chunks += len(chunks)
-        sizes = [len(c.text) for c in chunks]
-        ingested.append({"file": filename, "chunks": len(chunks), "sizes": sizes})
+        # Identical text under an identical header path collapses to one chunk
+        by_id = {c.id: c for c in chunks}
+        source = chunks[0].metadata["source"]
+        old_ids = stale.pop(source, set())
+
+        to_add = [cid for cid in by_id if cid not in old_ids]
+        to_delete = sorted(old_ids - by_id.keys())
+
+        if to_delete:
+            coll.delete(ids=to_delete)
+        if to_add:
+            coll.add(
+                ids=to_add,
+                documents=[by_id[cid].text for cid in to_add],
+                metadatas=[by_id[cid].metadata for cid in to_add],
+            )
 
-    return {"collection": coll, "files": len(ingested), "chunks": total_chunks, "details": ingested}
+        total_chunks += len(by_id)
+        total_added += len(to_add)
+        total_deleted += len(to_delete)
+        sizes = [len(c.text) for c in by_id.values()]
+        ingested.append({
+            "file": filename,
+            "chunks": len(by_id),
+            "added": len(to_add),
+            "deleted": len(to_delete),
+            "sizes": sizes,
+        })
+
+    # Sources whose file was removed (or now yields no chunks)
+    for ids in stale.values():
+        if ids:
+            coll.delete(ids=sorted(ids))
+            total_deleted += len(ids)
+
+    return {
+        "collection": coll,
+        "files": len(ingested),
+        "chunks": total_chunks,
+        "added": total_added,
+        "deleted": total_deleted,
+        "details": ingested,
+    }
 
 
 def startup_ingest():
@@ -107,23 +167,45 @@ def startup_ingest():
         collection = chroma_client.get_or_create_collection(
             name=COLLECTION_NAME,
             metadata={"hnsw:space": "cosine"},
+            embedding_function=embedding_function,
         )
+        metrics.indexed_chunks.labels().set(collection.count())
         return
 
     print(f"[RAG] Indexing {DATA_DIR} …", flush=True)
     result = reindex(DATA_DIR)
     collection = result["collection"]
-    print(f"[RAG] Indexed {result['files']} files, {result['chunks']} chunks", flush=True)
+    metrics.indexed_chunks.labels().set(result["chunks"])
+    print(
+        f"[RAG] Indexed {result['files']} files, {result['chunks']} chunks "
+        f"({result['added']} embedded, {result['deleted']} deleted)",
+        flush=True,
+    )
     for d in result["details"]:
         sizes = d.get("sizes", [])
         avg = sum(sizes) // len(sizes) if sizes else 0
         lo, hi = (min(sizes), max(sizes)) if sizes else (0, 0)
-        print(f"[RAG]   {d['file']}: {d['chunks']} chunks (avg {avg}, range {lo}-{hi} chars)", flush=True)
+        print(
+            f"[RAG]   {d['file']}: {d['chunks']} chunks (avg {avg}, range {lo}-{hi} chars, "
+            f"+{d['added']}/-{d['deleted']})",
+            flush=True,
+        )
 
 
 # will be set by startup_ingest()
 collection = None  # type: ignore[assignment]
 
+# Metric labels: anything else a client sends is counted as "other"
+RPC_METHODS = frozenset({"initialize", "notifications/initialized", "ping", "tools/list", "tools/call"})
+TOOL_NAMES = frozenset({"unicity_search"})
+
+
+_search_slots = asyncio.Semaphore(RAG_SEARCH_CONCURRENCY)
+
+
+def _label(value, known: frozenset) -> str:
+    return value if value in known else "other"
+
 
 # ---------------------------------------------------------------------------
 # Tool definitions (read-only)
@@ -168,16 +250,24 @@ async def list_tools() -> list[Tool]:
 
 @mcp_server.call_tool()
 async def call_tool(name: str, arguments: dict) -> list[TextContent | ImageContent]:
+    tool = _label(name, TOOL_NAMES)
+    started = time.perf_counter()
     try:
-        if name == "unicity_search":
-            return _tool_search(arguments)
-        else:
-            raise ValueError(f"Unknown tool: {name}")
+        with metrics.tool_in_flight.track(tool):
+            if name == "unicity_search":
+                # Off the event loop, so the calls of a batch search in parallel
+                async with _search_slots:
+                    return await asyncio.to_thread(_tool_search, arguments)
+            else:
+                raise ValueError(f"Unknown tool: {name}")
 
     except Exception as exc:
         import traceback
         traceback.print_exc()
+        metrics.tool_errors.labels(tool).inc()
         return [TextContent(type="text", text=json.dumps({"error": str(exc), "tool": name}))]
+    finally:
+        metrics.tool_seconds.labels(tool).observe(time.perf_counter() - started)
 
 
 def _text(obj: dict) -> list[TextContent]:
@@ -188,11 +278,30 @@ def _tool_search(args: dict) -> list[TextContent | ImageContent]:
     query = args["query"]
     n = min(args.get("n_results", 4), collection.count() or 1)
 
-    results = collection.query(query_texts=[query], n_results=n)
+    start = time.perf_counter()
+    with tracing.span("embedding"):
+        embeddings = embedding_function([query])
+    metrics.search_stage_seconds.labels("embedding").observe(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with tracing.span("vector_query", n_results=n):
+        results = collection.query(query_embeddings=embeddings, n_results=n)
+    metrics.search_stage_seconds.labels("vector_query").observe(time.perf_counter() - start)
 
     if not results["documents"] or not results["documents"][0]:
+        metrics.search_results.observe(0)
         return _text({"results": [], "message": "No results found."})
 
+    start = time.perf_counter()
+    with tracing.span("serialization"):
+        content, found = _format_results(results)
+    metrics.search_stage_seconds.labels("serialization").observe(time.perf_counter() - start)
+    metrics.search_results.observe(found)
+    return content
+
+
+def _format_results(results: dict) -> tuple[list[TextContent | ImageContent], int]:
+    """Tool content for a Chroma query result, and the number of chunks in it."""
     formatted = []
     seen_images: set[str] = set()
     image_items: list[ImageContent] = []
@@ -226,7 +335,7 @@ def _tool_search(args: dict) -> list[TextContent | ImageContent]:
 
     content: list[TextContent | ImageContent] = _text({"results": formatted})
     content.extend(image_items)
-    return content
+    return content, len(formatted)
 
 
 # ---------------------------------------------------------------------------
@@ -240,25 +349,90 @@ def _serialize_content_item(r) -> dict:
     return {"type": "text", "text": r.text}
 
 
+@dataclass
+class Reply:
+    """Outcome of one JSON-RPC message: its response (None for a notification) and HTTP status."""
+    message: dict | None
+    status_code: int = 200
+
+
+def _error(request_id, code: int, msg: str) -> dict:
+    return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": msg}}
+
+
 async def handle_messages(request: Request):
-    """POST /mcp – MCP protocol over HTTP (JSON-RPC 2.0)."""
-    body = None
+    """POST /mcp – MCP protocol over HTTP (JSON-RPC 2.0).
+
+    The body is one message or a batch (an array of messages); the messages
+    of a batch run concurrently and are answered in one array, without
+    entries for notifications.
+    """
+    received = time.perf_counter()
     try:
         body = await request.json()
+    except ValueError as exc:
+        metrics.rpc_errors.labels("other", "-32700").inc()
+        return JSONResponse(_error(None, -32700, f"Parse error: {exc}"), status_code=400)
+    parsed = time.perf_counter()
+
+    if not isinstance(body, list):
+        reply = await handle_message(body, received, parsed)
+        if reply.message is None:
+            return JSONResponse({})
+        return JSONResponse(reply.message, status_code=reply.status_code)
+
+    if not body or len(body) > MCP_BATCH_MAX_SIZE:
+        metrics.rpc_errors.labels("other", "-32600").inc()
+        reason = "empty batch" if not body else f"batch of {len(body)} messages (max {MCP_BATCH_MAX_SIZE})"
+        return JSONResponse(_error(None, -32600, f"Invalid Request: {reason}"), status_code=400)
+
+    print(f"[MCP] batch of {len(body)} messages", flush=True)
+    metrics.rpc_batch_size.observe(len(body))
+    replies = await asyncio.gather(*(handle_message(m, received, parsed, batch=len(body)) for m in body))
+    responses = [
+        reply.message for message, reply in zip(body, replies)
+        if reply.message is not None and not (isinstance(message, dict) and "id" not in message)
+    ]
+    if not responses:
+        return Response(status_code=202)
+    return JSONResponse(responses)
+
+
+async def handle_message(message, received: float, parsed: float, batch: int = 0) -> Reply:
+    """Answer one message with its own trace and metrics (*batch*: size of its batch, 0 if sent alone)."""
+    with metrics.rpc_in_flight.track(), tracing.start(received) as trace:
+        tracing.record("parse", received, parsed)
+        if batch:
+            tracing.tag(batch=batch)
+        try:
+            async with profiler.watch(trace):
+                return await dispatch_message(message)
+        finally:
+            method = trace.tags.get("method")
+            metrics.rpc_seconds.labels(_label(method, RPC_METHODS)).observe(time.perf_counter() - received)
+            if method == "tools/call":
+                print(f"[Trace] {json.dumps(trace.as_dict(), ensure_ascii=False)}", flush=True)
+
+
+async def dispatch_message(body) -> Reply:
+    """Answer one JSON-RPC message."""
+    if not isinstance(body, dict):
+        metrics.rpc_errors.labels("other", "-32600").inc()
+        return Reply(_error(None, -32600, "Invalid Request: expected a JSON object"), 400)
+    try:
         method = body.get("method")
         params = body.get("params", {})
         request_id = body.get("id")
+        tracing.tag(method=method, id=request_id)
 
         print(f"[MCP] {method} (id={request_id})", flush=True)
 
         def ok(result):
-            return JSONResponse({"jsonrpc": "2.0", "id": request_id, "result": result})
+            return Reply({"jsonrpc": "2.0", "id": request_id, "result": result})
 
         def err(code: int, msg: str):
-            return JSONResponse(
-                {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": msg}},
-                status_code=400,
-            )
+            metrics.rpc_errors.labels(_label(method, RPC_METHODS), str(code)).inc()
+            return Reply(_error(request_id, code, msg), 400)
 
         if method == "initialize":
             return ok({
@@ -268,7 +442,7 @@ async def handle_messages(request: Request):
             })
 
         if method == "notifications/initialized":
-            return JSONResponse({})
+            return Reply(None)
 
         if method == "ping":
             return ok({})
@@ -286,22 +460,27 @@ async def handle_messages(request: Request):
             tool_name = params.get("name")
             arguments = params.get("arguments", {})
             print(f"[MCP] Calling tool: {tool_name}", flush=True)
-            result = await call_tool(tool_name, arguments)
-            return ok({"content": [_serialize_content_item(r) for r in result]})
+            tracing.tag(tool=tool_name)
+            with tracing.span("tool", tool=tool_name):
+                result = await call_tool(tool_name, arguments)
+            response = {"content": [_serialize_content_item(r) for r in result]}
+            meta = params.get("_meta") or {}
+            if isinstance(meta, dict) and meta.get("trace") is True:
+                response["_meta"] = {"trace": tracing.current().as_dict()}
+            return ok(response)
 
         return err(-32601, f"Method not found: {method}")
 
     except Exception as exc:
         import traceback
         traceback.print_exc()
-        try:
-            return JSONResponse(
-                {"jsonrpc": "2.0", "id": body.get("id") if body else None,
-                 "error": {"code": -32603, "message": str(exc)}},
-                status_code=500,
-            )
-        except Exception:
-            return JSONResponse({"error": str(exc)}, status_code=500)
+        metrics.rpc_errors.labels(_label(body.get("method"), RPC_METHODS), "-32603").inc()
+        return Reply(_error(body.get("id"), -32603, str(exc)), 500)
+
+
+async def handle_metrics(request: Request):
+    """GET /metrics – Prometheus text exposition."""
+    return Response(metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
 
 
 # ---------------------------------------------------------------------------
@@ -310,7 +489,10 @@ async def handle_messages(request: Request):
 
 app = Starlette(
     debug=True,
-    routes=[Route("/mcp", handle_messages, methods=["POST"])],
+    routes=[
+        Route("/mcp", handle_messages, methods=["POST"]),
+        Route("/metrics", handle_metrics, methods=["GET"]),
+    ],
 )
 
 
@@ -324,6 +506,7 @@ def main():
     startup_ingest()
 
     print(f"  Endpoint : http://0.0.0.0:{port}/mcp", flush=True)
+    print(f"  Metrics  : http://0.0.0.0:{port}/metrics", flush=True)
     uvicorn.run(app, host="0.0.0.0", port=port, log_level="info")
 
 
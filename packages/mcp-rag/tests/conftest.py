@@ -0,0 +1,82 @@
+"""Shared fixtures: a throwaway Chroma store and a fake embedding model, so
+tests never download Chroma's default model."""
+import asyncio
+import hashlib
+import json
+import os
+import re
+import tempfile
+
+# server.py opens its PersistentClient at import time
+os.environ.setdefault("DB_DIR", tempfile.mkdtemp(prefix="mcp-rag-tests-"))
+
+import chromadb
+import numpy as np
+import pytest
+from starlette.requests import Request
+
+from src import server
+
+DIMENSIONS = 64
+
+
+class FakeEmbedding(chromadb.EmbeddingFunction):
+    """Hashed bag of words: texts sharing words land close together."""
+
+    def __init__(self):
+        pass
+
+    def __call__(self, input):
+        vectors = []
+        for text in input:
+            vector = np.zeros(DIMENSIONS, dtype=np.float32)
+            for word in re.findall(r"\w+", text.lower()):
+                vector[int(hashlib.sha256(word.encode()).hexdigest(), 16) % DIMENSIONS] += 1
+            vectors.append(vector / (np.linalg.norm(vector) or 1))
+        return vectors
+
+    @staticmethod
+    def name() -> str:
+        return "fake"
+
+    def get_config(self) -> dict:
+        return {}
+
+    @staticmethod
+    def build_from_config(config: dict) -> "FakeEmbedding":
+        return FakeEmbedding()
+
+
+@pytest.fixture
+def docs(tmp_path, monkeypatch):
+    """An empty docs directory indexed into a private collection.
+
+    Returns the directory; ``server.reindex(str(docs))`` syncs it.
+    """
+    directory = tmp_path / "docs"
+    directory.mkdir()
+    monkeypatch.setattr(server, "chroma_client", chromadb.PersistentClient(path=str(tmp_path / "db")))
+    monkeypatch.setattr(server, "embedding_function", FakeEmbedding())
+    monkeypatch.setattr(server, "DATA_DIR", str(directory))
+    monkeypatch.setattr(server, "collection", None)
+    return directory
+
+
+@pytest.fixture
+def mcp_request():
+    """Build a POST /mcp request for ``server.handle_messages``.
+
+    *body* is JSON-encoded unless it is already bytes.
+    """
+    def build(body) -> Request:
+        payload = body if isinstance(body, bytes) else json.dumps(body).encode()
+        messages = [{"type": "http.request", "body": payload, "more_body": False}]
+
+        async def receive():
+            if messages:
+                return messages.pop(0)
+            await asyncio.Event().wait()
+
+        scope = {"type": "http", "method": "POST", "path": "/mcp", "headers": [], "query_string": b""}
+        return Request(scope, receive)
+    return build
@@ -0,0 +1,74 @@
+import json
+
+from src import server
+from src.chunker import chunk_markdown
+
+GUIDE = "# Tokens\n\nTokens are minted off chain.\n\n# Consensus\n\nBFT finality in one round.\n"
+FAQ = "# Agents\n\nAgents trade on prediction markets.\n"
+
+
+def stored_ids(result) -> set[str]:
+    return set(result["collection"].get()["ids"])
+
+
+def expected_ids(**files: str) -> set[str]:
+    return {chunk.id for name, text in files.items() for chunk in chunk_markdown(text, source=f"{name}.md")}
+
+
+def test_first_index_embeds_every_section(docs):
+    (docs / "guide.md").write_text(GUIDE)
+    (docs / "faq.md").write_text(FAQ)
+
+    result = server.reindex(str(docs))
+
+    assert (result["files"], result["chunks"], result["added"], result["deleted"]) == (2, 3, 3, 0)
+    assert stored_ids(result) == expected_ids(guide=GUIDE, faq=FAQ)
+
+
+def test_unchanged_docs_embed_nothing(docs):
+    (docs / "guide.md").write_text(GUIDE)
+    server.reindex(str(docs))
+
+    result = server.reindex(str(docs))
+
+    assert (result["chunks"], result["added"], result["deleted"]) == (2, 0, 0)
+
+
+def test_editing_a_section_replaces_only_that_chunk(docs):
+    (docs / "guide.md").write_text(GUIDE)
+    before = stored_ids(server.reindex(str(docs)))
+
+    edited = GUIDE.replace("one round", "two rounds")
+    (docs / "guide.md").write_text(edited)
+    result = server.reindex(str(docs))
+
+    after = stored_ids(result)
+    assert (result["added"], result["deleted"]) == (1, 1)
+    assert after == expected_ids(guide=edited)
+    assert len(before & after) == 1  # the Tokens section kept its ID
+    assert result["details"][0]["added"] == result["details"][0]["deleted"] == 1
+
+
+def test_removed_files_are_dropped_from_the_index(docs):
+    (docs / "guide.md").write_text(GUIDE)
+    (docs / "faq.md").write_text(FAQ)
+    server.reindex(str(docs))
+
+    (docs / "faq.md").unlink()
+    (docs / "guide.md").write_text("")  # yields no chunks
+    result = server.reindex(str(docs))
+
+    assert (result["files"], result["chunks"], result["added"], result["deleted"]) == (0, 0, 0, 3)
+    assert stored_ids(result) == set()
+
+
+def test_search_finds_the_matching_section(docs):
+    (docs / "guide.md").write_text(GUIDE)
+    (docs / "faq.md").write_text(FAQ)
+    server.startup_ingest()
+
+    [content] = server._tool_search({"query": "prediction markets agents", "n_results": 1})
+
+    results = json.loads(content.text)["results"]
+    assert [(r["source"], r["rank"]) for r in results] == [("faq", 1)]
+    assert "prediction markets" in results[0]["content"]
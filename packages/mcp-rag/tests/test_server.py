@@ -0,0 +1,106 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+from src import server
+
+
+def search_call(request_id: int, query: str) -> dict:
+    return {"jsonrpc": "2.0", "id": request_id, "method": "tools/call",
+            "params": {"name": "unicity_search", "arguments": {"query": query}}}
+
+
+def slow_search(delay: float):
+    """A blocking stand-in for ``_tool_search`` that answers with the query."""
+    def search(args: dict):
+        time.sleep(delay)
+        return server._text({"results": [], "query": args["query"]})
+    return search
+
+
+@pytest.mark.asyncio
+async def test_batch_answers_in_order_without_notifications(docs, mcp_request):
+    server.startup_ingest()
+    response = await server.handle_messages(mcp_request([
+        {"jsonrpc": "2.0", "id": "a", "method": "ping"},
+        {"jsonrpc": "2.0", "method": "notifications/initialized"},
+        {"jsonrpc": "2.0", "id": "b", "method": "tools/list"},
+        {"jsonrpc": "2.0", "id": "c", "method": "no/such"},
+        42,
+    ]))
+
+    replies = json.loads(response.body)
+    assert response.status_code == 200
+    assert [reply["id"] for reply in replies] == ["a", "b", "c", None]
+    assert replies[0]["result"] == {}
+    assert [tool["name"] for tool in replies[1]["result"]["tools"]] == ["unicity_search"]
+    assert replies[2]["error"]["code"] == -32601
+    assert replies[3]["error"]["code"] == -32600
+
+
+@pytest.mark.asyncio
+async def test_invalid_batches_and_bodies_are_rejected(monkeypatch, mcp_request):
+    monkeypatch.setattr(server, "MCP_BATCH_MAX_SIZE", 2)
+    ping = {"jsonrpc": "2.0", "id": 1, "method": "ping"}
+
+    for body in ([], [ping, ping, ping]):
+        response = await server.handle_messages(mcp_request(body))
+        assert response.status_code == 400
+        assert json.loads(response.body)["error"]["code"] == -32600
+
+    response = await server.handle_messages(mcp_request(b"[{not json"))
+    assert response.status_code == 400
+    error = json.loads(response.body)
+    assert (error["id"], error["error"]["code"]) == (None, -32700)
+
+    response = await server.handle_messages(mcp_request([
+        {"jsonrpc": "2.0", "method": "notifications/initialized"},
+    ]))
+    assert (response.status_code, response.body) == (202, b"")
+
+
+@pytest.mark.asyncio
+async def test_batch_searches_run_in_parallel_threads(monkeypatch, mcp_request):
+    monkeypatch.setattr(server, "_tool_search", slow_search(0.3))
+    monkeypatch.setattr(server, "_search_slots", asyncio.Semaphore(4))
+
+    started = time.perf_counter()
+    response = await server.handle_messages(mcp_request([search_call(i, f"q{i}") for i in range(3)]))
+    elapsed = time.perf_counter() - started
+
+    replies = json.loads(response.body)
+    queries = [json.loads(reply["result"]["content"][0]["text"])["query"] for reply in replies]
+    assert queries == ["q0", "q1", "q2"]
+    assert elapsed < 0.6
+
+
+@pytest.mark.asyncio
+async def test_search_slots_bound_concurrent_searches(monkeypatch, mcp_request):
+    monkeypatch.setattr(server, "_tool_search", slow_search(0.2))
+    monkeypatch.setattr(server, "_search_slots", asyncio.Semaphore(1))
+
+    started = time.perf_counter()
+    batch = asyncio.create_task(server.handle_messages(mcp_request([search_call(1, "a"), search_call(2, "b")])))
+    await asyncio.sleep(0.05)
+    # The searches run in threads, so the event loop still answers meanwhile
+    ping = await server.handle_messages(mcp_request({"jsonrpc": "2.0", "id": 0, "method": "ping"}))
+    assert json.loads(ping.body)["result"] == {}
+    assert time.perf_counter() - started < 0.2
+    response = await batch
+    elapsed = time.perf_counter() - started
+
+    assert [reply["id"] for reply in json.loads(response.body)] == [1, 2]
+    assert elapsed >= 0.4
+
+
+@pytest.mark.asyncio
+async def test_search_over_the_index(docs, mcp_request):
+    (docs / "guide.md").write_text("# Consensus\n\nBFT finality in one round.\n")
+    server.startup_ingest()
+
+    response = await server.handle_messages(mcp_request(search_call(1, "BFT finality")))
+
+    results = json.loads(json.loads(response.body)["result"]["content"][0]["text"])["results"]
+    assert [(r["source"], r["section"]) for r in results] == [("guide", "Consensus")]
@@ -0,0 +1,268 @@
+"""Extraction benchmark over the saved-page corpus.
+
+Serves every page in ``benchmarks/corpus`` from a local HTTP server and
+fetches it through ``fetch_tool`` in each output format, with the HTTP and
+extraction caches disabled and extraction running in-process.  Each page is
+measured in a fresh process so its peak RSS is not masked by earlier pages.
+
+Reports, per page and format, the median latency of every stage that
+``fetch_tool`` times (download, parse, prune, extract, convert, fallback,
+plain_text) and of the whole call, the output size, and the page's peak
+RSS and RSS growth over the warmed-up process.  Results are compared against
+``benchmarks/baseline.json``; regressions beyond the tolerance are listed
+and make the run exit with status 1.
+
+    python -m benchmarks.bench_extraction                    # compare to baseline
+    python -m benchmarks.bench_extraction --update-baseline  # record a new baseline
+    python -m benchmarks.bench_extraction --pages wiki_article --formats text --runs 5
+"""
+import argparse
+import asyncio
+import contextlib
+import functools
+import http.server
+import importlib.metadata
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+CORPUS_DIR = BENCH_DIR / "corpus"
+BASELINE_PATH = BENCH_DIR / "baseline.json"
+FORMATS = ("markdown", "text", "html")
+STAGES = ("download", "parse", "prune", "extract", "convert", "fallback", "plain_text", "total")
+
+# Differences below these floors are noise, whatever the relative change
+_MIN_DELTA_MS = 10.0
+_MIN_DELTA_RSS_MB = 8.0
+_OUTPUT_TOLERANCE = 0.05
+_LIBRARIES = ("trafilatura", "readability-lxml", "html2text", "lxml", "curl_cffi")
+
+
+# -- local HTTP stand-in ----------------------------------------------------
+
+class _QuietHandler(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def serve_corpus(directory: Path = CORPUS_DIR) -> http.server.ThreadingHTTPServer:
+    """Serve *directory* on an ephemeral localhost port in a daemon thread."""
+    handler = functools.partial(_QuietHandler, directory=str(directory))
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# -- measurement (runs in a fresh child process per page) -------------------
+
+def _max_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+async def _measure(url: str, formats: tuple[str, ...], runs: int) -> dict:
+    from src.services.extraction_cache import ExtractionCache
+    from src.services.http_cache import HttpCache
+    from src.services.http_client import http_pool
+    from src.services.worker_pool import WorkerPool
+    from src.tools import fetch
+
+    fetch.http_cache = HttpCache(max_bytes=0)
+    fetch.extraction_cache = ExtractionCache(max_bytes=0)
+    fetch.extraction_pool = WorkerPool(workers=0)
+
+    samples: dict[str, dict[str, list[float]]] = {fmt: {} for fmt in formats}
+    outputs: dict[str, dict] = {}
+    try:
+        for _ in range(runs):
+            for fmt in formats:
+                start = time.perf_counter()
+                result = await fetch.fetch_tool(fetch.FetchInput(url=url, format=fmt, max_length=100000))
+                total = (time.perf_counter() - start) * 1000
+                if "error" in result:
+                    raise RuntimeError(f"{url} ({fmt}): {result['error']}")
+                for stage, ms in {**result["timings"], "total": total}.items():
+                    samples[fmt].setdefault(stage, []).append(ms)
+                outputs[fmt] = result
+    finally:
+        await http_pool.close()
+
+    return {
+        fmt: {
+            "stages": {stage: round(statistics.median(values), 2) for stage, values in samples[fmt].items()},
+            "chars": outputs[fmt]["total_length"],
+            "bytes": len(outputs[fmt]["content"].encode("utf-8")),
+            "method": _method(samples[fmt]),
+        }
+        for fmt in formats
+    }
+
+
+def _method(stages: dict) -> str:
+    if "plain_text" in stages:
+        return "text"
+    return "readability" if "fallback" in stages else "trafilatura"
+
+
+def measure_page(url: str, formats: tuple[str, ...], runs: int) -> dict:
+    """Benchmark one page; meant to run in its own process."""
+    from src.services import extraction
+
+    extraction.warm_up()
+    rss_base = _max_rss_mb()
+    # Keep fetch_tool's per-request logging out of the report
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        result = asyncio.run(_measure(url, formats, runs))
+    peak = _max_rss_mb()
+    return {
+        "formats": result,
+        "peak_rss_mb": round(peak, 1),
+        "rss_growth_mb": round(peak - rss_base, 1),
+    }
+
+
+def run_benchmark(pages: list[Path], formats: tuple[str, ...], runs: int) -> dict:
+    server = serve_corpus()
+    # spawn: each page starts from a clean interpreter, so peak RSS is its own
+    context = multiprocessing.get_context("spawn")
+    results = {}
+    try:
+        for page in pages:
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                measured = executor.submit(measure_page, f"{server.url}/{page.name}", formats, runs).result()
+            results[page.name] = {"size_bytes": page.stat().st_size, **measured}
+            print(f"[Bench] {page.name}: done", file=sys.stderr, flush=True)
+    finally:
+        server.shutdown()
+        server.server_close()
+    return {"meta": _meta(runs), "pages": results}
+
+
+def _meta(runs: int) -> dict:
+    versions = {}
+    for name in _LIBRARIES:
+        try:
+            versions[name] = importlib.metadata.version(name)
+        except importlib.metadata.PackageNotFoundError:
+            versions[name] = None
+    return {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "runs": runs,
+        "versions": versions,
+    }
+
+
+# -- reporting --------------------------------------------------------------
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Regressions of *current* against *baseline*, as human-readable lines.
+
+    A stage is slower when it exceeds the baseline by more than *tolerance*
+    (relative) and ``_MIN_DELTA_MS`` (absolute); RSS growth likewise with
+    ``_MIN_DELTA_RSS_MB``.  Output that changed size by more than 5% or
+    switched extraction method is flagged too, since a library bump can
+    regress quality as well as speed.  Pages or formats missing from the
+    baseline are skipped.
+    """
+    regressions = []
+    for page, now in current["pages"].items():
+        before = baseline.get("pages", {}).get(page)
+        if before is None:
+            continue
+        rss_now, rss_before = now["rss_growth_mb"], before["rss_growth_mb"]
+        if rss_now > rss_before * (1 + tolerance) and rss_now - rss_before > _MIN_DELTA_RSS_MB:
+            regressions.append(f"{page}: RSS growth {rss_before} -> {rss_now} MB")
+        for fmt, result in now["formats"].items():
+            old = before["formats"].get(fmt)
+            if old is None:
+                continue
+            for stage, ms in result["stages"].items():
+                old_ms = old["stages"].get(stage)
+                if old_ms is not None and ms > old_ms * (1 + tolerance) and ms - old_ms > _MIN_DELTA_MS:
+                    regressions.append(f"{page} [{fmt}] {stage}: {old_ms} -> {ms} ms")
+            if abs(result["chars"] - old["chars"]) > old["chars"] * _OUTPUT_TOLERANCE:
+                regressions.append(f"{page} [{fmt}] output: {old['chars']} -> {result['chars']} chars")
+            if result["method"] != old["method"]:
+                regressions.append(f"{page} [{fmt}] method: {old['method']} -> {result['method']}")
+    return regressions
+
+
+def format_table(results: dict) -> str:
+    header = ["page", "format", *(f"{s} ms" for s in STAGES), "chars", "peak MB", "+RSS MB"]
+    rows = [header]
+    for page, data in results["pages"].items():
+        for fmt, result in data["formats"].items():
+            stages = result["stages"]
+            rows.append([
+                page, fmt,
+                *(f"{stages[s]:.1f}" if s in stages else "-" for s in STAGES),
+                str(result["chars"]), f"{data['peak_rss_mb']:.1f}", f"{data['rss_growth_mb']:.1f}",
+            ])
+    widths = [max(len(row[i]) for row in rows) for i in range(len(header))]
+    return "\n".join(
+        "  ".join(cell.ljust(w) if i < 2 else cell.rjust(w) for i, (cell, w) in enumerate(zip(row, widths)))
+        for row in rows
+    )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=3, help="Measured runs per page and format (median is reported)")
+    parser.add_argument("--pages", help="Comma-separated page names (without .html); default: whole corpus")
+    parser.add_argument("--formats", default=",".join(FORMATS), help="Comma-separated output formats")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH, help="Baseline file to compare against")
+    parser.add_argument("--update-baseline", action="store_true", help="Write the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.3, help="Allowed relative slowdown before flagging")
+    parser.add_argument("--output", type=Path, help="Also write the results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    pages = sorted(CORPUS_DIR.glob("*.html"))
+    if args.pages:
+        wanted = set(args.pages.split(","))
+        pages = [p for p in pages if p.stem in wanted]
+    formats = tuple(f for f in args.formats.split(",") if f)
+    if not pages or not set(formats) <= set(FORMATS):
+        parser.error("no matching pages or unknown format")
+
+    results = run_benchmark(pages, formats, args.runs)
+    print(format_table(results))
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2) + "\n")
+
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+    if not args.baseline.exists():
+        print(f"\nNo baseline at {args.baseline}; run with --update-baseline to record one")
+        return 0
+
+    baseline = json.loads(args.baseline.read_text())
+    if baseline["meta"].get("versions") != results["meta"]["versions"]:
+        print(f"\nLibrary versions differ from baseline: {baseline['meta'].get('versions')}")
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) against {args.baseline} (tolerance {args.tolerance:.0%}):")
+        print("\n".join(f"  - {line}" for line in regressions))
+        return 1
+    print(f"\nNo regressions against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
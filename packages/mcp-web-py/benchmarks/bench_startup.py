@@ -0,0 +1,171 @@
+"""Server startup benchmark: time-to-bind, time-to-ready and first fetches.
+
+Starts the server (``python -m src``) on a free port and measures, from
+process start:
+
+- ``bind``: the port accepts connections;
+- ``ready``: ``GET /ready`` answers 200;
+- ``fetch_cold``: a ``fetch`` of a corpus page sent as soon as the port is
+  bound (what the first request after a restart pays);
+- ``fetch_ready``: a ``fetch`` of another page sent once the server is ready.
+
+Times are medians over ``--runs`` fresh processes.  ``--importtime`` also
+prints the slowest imports of ``src.server`` (from ``python -X importtime``).
+
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --runs 5 --env WARMUP=0
+    python -m benchmarks.bench_startup --importtime 20
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+from benchmarks.bench_extraction import serve_corpus
+
+PACKAGE_DIR = Path(__file__).resolve().parent.parent
+METRICS = ("bind", "ready", "fetch_cold", "fetch_ready")
+
+_POLL = 0.01
+_TIMEOUT = 60.0
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for_bind(port: int, proc: subprocess.Popen, deadline: float) -> None:
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"server exited with status {proc.returncode}")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.1):
+                return
+        except OSError:
+            time.sleep(_POLL)
+    raise TimeoutError("server did not bind in time")
+
+
+def _wait_for_ready(base: str, deadline: float) -> None:
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"{base}/ready", timeout=1) as response:
+                if response.status == 200:
+                    return
+        except urllib.error.HTTPError as e:
+            if e.code != 503:
+                raise
+        except OSError:
+            pass
+        time.sleep(_POLL)
+    raise TimeoutError("server did not become ready in time")
+
+
+def _fetch(base: str, url: str) -> float:
+    """Seconds a ``fetch`` tools/call takes."""
+    body = json.dumps({
+        "jsonrpc": "2.0", "id": 1, "method": "tools/call",
+        "params": {"name": "fetch", "arguments": {"url": url}},
+    }).encode()
+    request = urllib.request.Request(f"{base}/mcp", data=body, headers={"Content-Type": "application/json"})
+    start = time.monotonic()
+    with urllib.request.urlopen(request, timeout=_TIMEOUT) as response:
+        payload = json.loads(response.read())
+    elapsed = time.monotonic() - start
+    result = json.loads(payload["result"]["content"][0]["text"])
+    if "error" in result:
+        raise RuntimeError(f"fetch {url} failed: {result['error']}")
+    return elapsed
+
+
+def measure_startup(corpus_url: str, env: dict[str, str]) -> dict:
+    """Start one server process and time its startup milestones (seconds)."""
+    port = _free_port()
+    base = f"http://127.0.0.1:{port}"
+    with tempfile.TemporaryDirectory() as cache_dir:
+        child_env = {
+            **os.environ,
+            "PORT": str(port),
+            "HTTP_CACHE_DIR": cache_dir,
+            # Nothing listens there: connection warm-up fails fast
+            "SEARXNG_URL": f"http://127.0.0.1:{_free_port()}",
+            **env,
+        }
+        start = time.monotonic()
+        proc = subprocess.Popen(
+            [sys.executable, "-m", "src"], cwd=PACKAGE_DIR, env=child_env,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            deadline = start + _TIMEOUT
+            _wait_for_bind(port, proc, deadline)
+            bind = time.monotonic() - start
+            fetch_cold = _fetch(base, f"{corpus_url}/blog_post.html")
+            _wait_for_ready(base, deadline)
+            ready = time.monotonic() - start
+            fetch_ready = _fetch(base, f"{corpus_url}/news_article.html")
+        finally:
+            proc.terminate()
+            try:
+                proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+    return {"bind": bind, "ready": ready, "fetch_cold": fetch_cold, "fetch_ready": fetch_ready}
+
+
+def import_profile(top: int) -> list[tuple[float, str]]:
+    """The *top* slowest imports of ``src.server`` as (cumulative ms, module)."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import src.server"],
+        cwd=PACKAGE_DIR, capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line[len("import time:"):].split("|")
+        rows.append((int(cumulative) / 1000, module.rstrip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=3, help="Server starts to measure (median is reported)")
+    parser.add_argument("--env", action="append", default=[], metavar="NAME=VALUE",
+                        help="Extra environment for the server (repeatable)")
+    parser.add_argument("--importtime", type=int, default=0, metavar="N",
+                        help="Also print the N slowest imports of src.server")
+    args = parser.parse_args(argv)
+    env = dict(item.split("=", 1) for item in args.env)
+
+    corpus = serve_corpus()
+    try:
+        samples = [measure_startup(corpus.url, env) for _ in range(args.runs)]
+    finally:
+        corpus.shutdown()
+        corpus.server_close()
+
+    for metric in METRICS:
+        values = [s[metric] for s in samples]
+        print(f"{metric:<12} {statistics.median(values) * 1000:8.0f} ms"
+              f"  (min {min(values) * 1000:.0f}, max {max(values) * 1000:.0f})")
+
+    if args.importtime:
+        print(f"\nSlowest imports of src.server (cumulative):")
+        for ms, module in import_profile(args.importtime):
+            print(f"{ms:8.1f} ms  {module}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
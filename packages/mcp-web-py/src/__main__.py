@@ -1,3 +1,5 @@
 from src.server import main
 
-main()
+# Guarded: worker processes (forkserver/spawn) re-import the main module
+if __name__ == "__main__":
+    main()
@@ -4,27 +4,65 @@ MCP Web Server - Python Implementation with HTTP Transport
 Provides web search, fetch, and JSON fetch tools via MCP SDK over HTTP
 """
 import asyncio
+import contextlib
 import json
 import os
+import time
+from dataclasses import dataclass
 from typing import Any
 from mcp.server import Server
 from mcp.types import Tool, TextContent
 from starlette.applications import Starlette
 from starlette.routing import Route
 from starlette.requests import Request
-from starlette.responses import StreamingResponse, JSONResponse
+from starlette.responses import Response, StreamingResponse, JSONResponse
 import uvicorn
 
 # Import our tool implementations
-from src.tools.search import search_tool, SearchInput
-from src.tools.fetch import fetch_tool, FetchInput
-from src.tools.json_fetch import json_fetch_tool, JsonFetchInput
-
+from src.tools.search import search_tool, SearchInput, searxng_breaker, SEARXNG_URL
+from src.tools.fetch import fetch_tool, FetchInput, schedule_prefetch
+from src.tools.fetch_many import fetch_many_tool, FetchManyInput, FETCH_MANY_MAX_URLS, FETCH_MANY_DEADLINE
+from src.tools.search_and_read import search_and_read_tool, SearchAndReadInput, SEARCH_AND_READ_DEADLINE
+from src.tools.json_fetch import json_fetch_tool, JsonFetchInput, JSON_FETCH_MAX_BYTES
+from src.services.http_client import http_pool
+from src.services.http_cache import http_cache
+from src.services.search_cache import search_cache
+from src.services.extraction_cache import extraction_cache
+from src.services.shared_cache import shared_cache, WEB_WORKERS
+from src.services.worker_pool import extraction_pool
+from src.services.admission import admission, ServerBusy
+from src.services.prefetch import prefetcher
+from src.services import deadline, metrics, tracing
+from src.services.profiler import profiler
+from src.services.ddgs_pool import ddgs_pool
+from src.services.warmup import warmup, preconnect
+
+
+# JSON-RPC implementation-defined server error: tool call not admitted
+SERVER_BUSY = -32000
+# Messages accepted in one JSON-RPC batch
+MCP_BATCH_MAX_SIZE = int(os.environ.get("MCP_BATCH_MAX_SIZE", 32))
+# Deadline for tools/call requests that don't send one in _meta (0: none)
+TOOL_DEFAULT_DEADLINE = float(os.environ.get("TOOL_DEFAULT_DEADLINE", 0))
+# Hosts to open pooled connections to during warm-up (comma-separated)
+WARMUP_URLS = [url.strip() for url in os.environ.get("WARMUP_URLS", SEARXNG_URL).split(",") if url.strip()]
+
+# Metric labels: anything else a client sends is counted as "other"
+RPC_METHODS = frozenset({"initialize", "notifications/initialized", "ping", "tools/list", "tools/call"})
+TOOL_NAMES = frozenset({"search", "fetch", "fetch_many", "search_and_read", "json_fetch"})
 
 # Create MCP server instance
 mcp_server = Server("web")
 
 
+def tool_label(name: Any) -> str:
+    return name if name in TOOL_NAMES else "other"
+
+
+def method_label(method: Any) -> str:
+    return method if method in RPC_METHODS else "other"
+
+
 @mcp_server.list_tools()
 async def list_tools() -> list[Tool]:
     """List available tools"""
@@ -86,11 +124,123 @@ async def list_tools() -> list[Tool]:
                         "minimum": 1,
                         "maximum": 100000,
                         "default": 50000
+                    },
+                    "query": {
+                        "type": "string",
+                        "description": "Optional: return only the passages most relevant to this query (in document order, with their offsets) instead of the leading content"
+                    },
+                    "offset": {
+                        "type": "integer",
+                        "description": "Character offset into the extracted content to start from (use a passage end or the previous length to read more)",
+                        "minimum": 0,
+                        "default": 0
                     }
                 },
                 "required": ["url"]
             }
         ),
+        Tool(
+            name="fetch_many",
+            description="Fetch and extract clean content from several web pages concurrently in one call. Results are returned in input order, each with its own error or content and timing; pages still loading at the deadline are reported as errors.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "urls": {
+                        "type": "array",
+                        "items": {"type": "string", "format": "uri"},
+                        "description": "URLs to fetch and extract content from",
+                        "minItems": 1,
+                        "maxItems": FETCH_MANY_MAX_URLS
+                    },
+                    "format": {
+                        "type": "string",
+                        "description": "Output format",
+                        "enum": ["markdown", "html", "text"],
+                        "default": "markdown"
+                    },
+                    "max_length": {
+                        "type": "integer",
+                        "description": "Maximum content length per page in characters",
+                        "minimum": 1,
+                        "maximum": 100000,
+                        "default": 50000
+                    },
+                    "query": {
+                        "type": "string",
+                        "description": "Optional: return only the passages of each page most relevant to this query"
+                    },
+                    "deadline": {
+                        "type": "number",
+                        "description": "Overall time budget for the batch in seconds",
+                        "exclusiveMinimum": 0,
+                        "maximum": 120,
+                        "default": FETCH_MANY_DEADLINE
+                    }
+                },
+                "required": ["urls"]
+            }
+        ),
+        Tool(
+            name="search_and_read",
+            description="Search the web and read the top results in one call: runs a search, fetches the top result pages concurrently and returns each result's search metadata with a length-capped extracted excerpt of the page. Use instead of a search followed by several fetch calls.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "query": {
+                        "type": "string",
+                        "description": "Search query string",
+                        "minLength": 1
+                    },
+                    "max_results": {
+                        "type": "integer",
+                        "description": "Number of search results to return (1-20)",
+                        "minimum": 1,
+                        "maximum": 20,
+                        "default": 5
+                    },
+                    "read": {
+                        "type": "integer",
+                        "description": "How many of the top results to fetch and extract (0-10)",
+                        "minimum": 0,
+                        "maximum": 10,
+                        "default": 3
+                    },
+                    "region": {
+                        "type": "string",
+                        "description": "Region code (us-en, uk-en, wt-wt for worldwide)",
+                        "enum": ["us-en", "uk-en", "wt-wt"],
+                        "default": "wt-wt"
+                    },
+                    "source": {
+                        "type": "string",
+                        "description": "Search source: auto (SearXNG with DDGS fallback), searxng, or ddgs",
+                        "enum": ["auto", "searxng", "ddgs"],
+                        "default": "auto"
+                    },
+                    "format": {
+                        "type": "string",
+                        "description": "Format of extracted excerpts",
+                        "enum": ["markdown", "text"],
+                        "default": "markdown"
+                    },
+                    "max_length": {
+                        "type": "integer",
+                        "description": "Maximum extracted characters per result",
+                        "minimum": 1,
+                        "maximum": 20000,
+                        "default": 3000
+                    },
+                    "deadline": {
+                        "type": "number",
+                        "description": "Overall time budget in seconds",
+                        "exclusiveMinimum": 0,
+                        "maximum": 120,
+                        "default": SEARCH_AND_READ_DEADLINE
+                    }
+                },
+                "required": ["query"]
+            }
+        ),
         Tool(
             name="json_fetch",
             description="Fetch JSON data from remote APIs. Supports all HTTP methods and handles non-JSON responses gracefully.",
@@ -111,6 +261,22 @@ async def list_tools() -> list[Tool]:
                     "body": {
                         "type": "string",
                         "description": "Optional request body as JSON string"
+                    },
+                    "path": {
+                        "type": "string",
+                        "description": "Optional JSONPath-style projection returning only the selected data, e.g. $.data.id, $.items[*].name, $.items[0:5]. Supports .name, ['name'], [n], [*], .* and [start:stop]"
+                    },
+                    "max_bytes": {
+                        "type": "integer",
+                        "description": "Maximum response bytes to download",
+                        "minimum": 1,
+                        "maximum": JSON_FETCH_MAX_BYTES,
+                        "default": JSON_FETCH_MAX_BYTES
+                    },
+                    "include_headers": {
+                        "type": "boolean",
+                        "description": "Include response headers in the result",
+                        "default": False
                     }
                 },
                 "required": ["url"]
@@ -122,6 +288,9 @@ async def list_tools() -> list[Tool]:
 @mcp_server.call_tool()
 async def call_tool(name: str, arguments: dict) -> list[TextContent]:
     """Handle tool calls"""
+    tool = tool_label(name)
+    started = time.perf_counter()
+    metrics.tool_in_flight.labels(tool).inc()
     try:
         if name == "search":
             # Call search tool
@@ -132,17 +301,45 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
                 source=arguments.get("source", "auto")
             )
             result = await search_tool(input_data)
-            return [TextContent(type="text", text=json.dumps(result, ensure_ascii=False))]
+            if "error" not in result:
+                # The agent is likely to read a top result next
+                schedule_prefetch(result["results"])
 
         elif name == "fetch":
             # Call fetch tool
             input_data = FetchInput(
                 url=arguments["url"],
                 format=arguments.get("format", "markdown"),
-                max_length=arguments.get("max_length", 50000)
+                max_length=arguments.get("max_length", 50000),
+                query=arguments.get("query"),
+                offset=arguments.get("offset", 0)
             )
             result = await fetch_tool(input_data)
-            return [TextContent(type="text", text=json.dumps(result, ensure_ascii=False))]
+
+        elif name == "fetch_many":
+            # Call batch fetch tool
+            input_data = FetchManyInput(
+                urls=arguments["urls"],
+                format=arguments.get("format", "markdown"),
+                max_length=arguments.get("max_length", 50000),
+                query=arguments.get("query"),
+                deadline=arguments.get("deadline", FETCH_MANY_DEADLINE)
+            )
+            result = await fetch_many_tool(input_data)
+
+        elif name == "search_and_read":
+            # Call search + concurrent read pipeline
+            input_data = SearchAndReadInput(
+                query=arguments["query"],
+                max_results=arguments.get("max_results", 5),
+                read=arguments.get("read", 3),
+                region=arguments.get("region", "wt-wt"),
+                source=arguments.get("source", "auto"),
+                format=arguments.get("format", "markdown"),
+                max_length=arguments.get("max_length", 3000),
+                deadline=arguments.get("deadline", SEARCH_AND_READ_DEADLINE)
+            )
+            result = await search_and_read_tool(input_data)
 
         elif name == "json_fetch":
             # Call json_fetch tool
@@ -150,23 +347,81 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
                 url=arguments["url"],
                 method=arguments.get("method", "GET"),
                 headers=arguments.get("headers"),
-                body=arguments.get("body")
+                body=arguments.get("body"),
+                path=arguments.get("path"),
+                max_bytes=arguments.get("max_bytes", JSON_FETCH_MAX_BYTES),
+                include_headers=arguments.get("include_headers", False)
             )
             result = await json_fetch_tool(input_data)
-            return [TextContent(type="text", text=json.dumps(result, ensure_ascii=False))]
 
         else:
             raise ValueError(f"Unknown tool: {name}")
 
+        if "error" in result:
+            metrics.tool_errors.labels(tool, "error").inc()
+        with tracing.span("serialize"):
+            return [TextContent(type="text", text=json.dumps(result, ensure_ascii=False))]
+
     except Exception as e:
         import traceback
         traceback.print_exc()
+        metrics.tool_errors.labels(tool, "exception").inc()
         error_result = {
             "error": str(e),
             "tool": name,
             "message": f"Tool execution failed: {str(e)}"
         }
         return [TextContent(type="text", text=json.dumps(error_result))]
+    finally:
+        metrics.tool_in_flight.labels(tool).dec()
+        metrics.tool_seconds.labels(tool).observe(time.perf_counter() - started)
+
+
+def request_deadline(params: dict) -> float | None:
+    """Seconds the client allows for a tools/call, from ``params._meta.deadline_ms``.
+
+    Raises ``ValueError`` for a malformed value.
+    """
+    meta = params.get("_meta") or {}
+    deadline_ms = meta.get("deadline_ms") if isinstance(meta, dict) else None
+    if deadline_ms is None:
+        return TOOL_DEFAULT_DEADLINE or None
+    if isinstance(deadline_ms, bool) or not isinstance(deadline_ms, (int, float)) or deadline_ms <= 0:
+        raise ValueError("_meta.deadline_ms must be a positive number of milliseconds")
+    return deadline_ms / 1000
+
+
+def request_wants_trace(params: dict) -> bool:
+    """Whether the client asked for the request's spans (``params._meta.trace: true``)."""
+    meta = params.get("_meta") or {}
+    return isinstance(meta, dict) and meta.get("trace") is True
+
+
+async def call_tool_within_deadline(name: str, arguments: dict) -> list[TextContent]:
+    """call_tool bounded by the request deadline.
+
+    Tools shorten their own timeouts to the deadline and return partial
+    results or errors in time; this is the backstop for anything that does not.
+    """
+    try:
+        return await asyncio.wait_for(call_tool(name, arguments), deadline.clamp(None))
+    except (deadline.DeadlineExceeded, asyncio.TimeoutError):
+        print(f"[MCP] Tool {name} hit the request deadline", flush=True)
+        metrics.tool_errors.labels(tool_label(name), "deadline").inc()
+        error_result = {
+            "error": "Request deadline exceeded",
+            "tool": name,
+            "message": "The tool did not finish within the deadline sent by the client."
+        }
+        return [TextContent(type="text", text=json.dumps(error_result))]
+
+
+async def wait_for_disconnect(request: Request) -> None:
+    """Return once the client has closed the connection (the body must be read already)."""
+    while True:
+        message = await request.receive()
+        if message["type"] == "http.disconnect":
+            return
 
 
 # HTTP Server setup using MCP's SSE transport
@@ -212,13 +467,117 @@ async def handle_sse(request: Request):
                 pass
 
 
+@dataclass
+class Reply:
+    """Outcome of one JSON-RPC message.
+
+    ``message`` is the response object (None for a notification);
+    ``status_code`` and ``headers`` apply when the message was sent alone.
+    """
+    message: dict | None
+    status_code: int = 200
+    headers: dict | None = None
+
+
+def jsonrpc_error_message(request_id: Any, code: int, message: str, data: dict | None = None) -> dict:
+    error = {"code": code, "message": message}
+    if data is not None:
+        error["data"] = data
+    return {"jsonrpc": "2.0", "id": request_id, "error": error}
+
+
 async def handle_messages(request: Request):
-    """Handle POST /mcp endpoint - MCP protocol over HTTP (JSON-RPC 2.0)"""
+    """Handle POST /mcp endpoint - MCP protocol over HTTP (JSON-RPC 2.0)
+
+    The body is one message or a batch (an array of messages).  Messages of
+    a batch run concurrently, each admitted like a call of its own, and the
+    responses come back in one array without those of notifications.
+    """
+    received = time.perf_counter()
     try:
         body = await request.json()
+    except ValueError as e:
+        print(f"[MCP] Could not parse request body: {e}", flush=True)
+        metrics.rpc_errors.labels("other", "-32700").inc()
+        return JSONResponse(jsonrpc_error_message(None, -32700, f"Parse error: {e}"), status_code=400)
+    parsed = time.perf_counter()
+
+    if isinstance(body, list):
+        work = handle_batch(body, received, parsed)
+    else:
+        work = handle_single(body, received, parsed)
+
+    # Stop the work (downloads, queued extraction) if the client hangs up
+    task = asyncio.create_task(work)
+    disconnect = asyncio.create_task(wait_for_disconnect(request))
+    try:
+        await asyncio.wait({task, disconnect}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        disconnect.cancel()
+        if not task.done():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            print("[MCP] Client disconnected, cancelled the request", flush=True)
+    if task.cancelled():
+        return Response(status_code=499)
+    return task.result()
+
+
+async def handle_single(message: Any, received: float, parsed: float) -> Response:
+    reply = await handle_message(message, received, parsed)
+    if reply.message is None:
+        return JSONResponse({})
+    return JSONResponse(reply.message, status_code=reply.status_code, headers=reply.headers)
+
+
+async def handle_batch(messages: list, received: float, parsed: float) -> Response:
+    if not messages or len(messages) > MCP_BATCH_MAX_SIZE:
+        reason = "empty batch" if not messages else f"batch of {len(messages)} messages (max {MCP_BATCH_MAX_SIZE})"
+        print(f"[MCP] Rejected {reason}", flush=True)
+        metrics.rpc_errors.labels("other", "-32600").inc()
+        return JSONResponse(jsonrpc_error_message(None, -32600, f"Invalid Request: {reason}"), status_code=400)
+
+    print(f"[MCP] Received batch of {len(messages)} messages", flush=True)
+    metrics.rpc_batch_size.observe(len(messages))
+    replies = await asyncio.gather(*(
+        handle_message(message, received, parsed, batch=len(messages)) for message in messages
+    ))
+    responses = [
+        reply.message for message, reply in zip(messages, replies)
+        if reply.message is not None and not (isinstance(message, dict) and "id" not in message)
+    ]
+    if not responses:
+        # Only notifications: nothing to answer
+        return Response(status_code=202)
+    return JSONResponse(responses)
+
+
+async def handle_message(message: Any, received: float, parsed: float, batch: int = 0) -> Reply:
+    """Answer one message with its own trace and metrics (*batch*: size of its batch, 0 if sent alone)"""
+    with metrics.rpc_in_flight.track(), tracing.start(received) as trace:
+        tracing.record("parse", received, parsed)
+        if batch:
+            tracing.tag(batch=batch)
+        try:
+            async with profiler.watch(trace):
+                return await dispatch_message(message)
+        finally:
+            method = trace.tags.get("method")
+            metrics.rpc_seconds.labels(method_label(method)).observe(time.perf_counter() - received)
+            if method == "tools/call":
+                print(f"[Trace] {json.dumps(trace.as_dict(), ensure_ascii=False)}", flush=True)
+
+
+async def dispatch_message(body: Any) -> Reply:
+    """Answer one JSON-RPC message"""
+    if not isinstance(body, dict):
+        metrics.rpc_errors.labels("other", "-32600").inc()
+        return Reply(jsonrpc_error_message(None, -32600, "Invalid Request: expected a JSON object"), 400)
+    try:
         method = body.get("method")
         params = body.get("params", {})
         request_id = body.get("id")  # JSON-RPC request ID
+        tracing.tag(method=method, id=request_id)
 
         print(f"[MCP] Received method: {method} (id: {request_id})", flush=True)
         if params:
@@ -232,19 +591,13 @@ async def handle_messages(request: Request):
                 "result": result
             }
             print(f"[MCP] Sending response for id {request_id}", flush=True)
-            return JSONResponse(response)
+            return Reply(response)
 
-        def jsonrpc_error(code: int, message: str):
-            response = {
-                "jsonrpc": "2.0",
-                "id": request_id,
-                "error": {
-                    "code": code,
-                    "message": message
-                }
-            }
+        def jsonrpc_error(code: int, message: str, data: dict | None = None,
+                          status_code: int = 400, headers: dict | None = None):
             print(f"[MCP] Sending error response: {code} - {message}", flush=True)
-            return JSONResponse(response, status_code=400)
+            metrics.rpc_errors.labels(method_label(method), str(code)).inc()
+            return Reply(jsonrpc_error_message(request_id, code, message, data), status_code, headers)
 
         # Handle MCP initialization
         if method == "initialize":
@@ -263,7 +616,7 @@ async def handle_messages(request: Request):
         elif method == "notifications/initialized":
             print("[MCP] Client initialized", flush=True)
             # Notifications don't get responses in JSON-RPC
-            return JSONResponse({})
+            return Reply(None)
 
         # Handle ping
         elif method == "ping":
@@ -289,13 +642,45 @@ async def handle_messages(request: Request):
             arguments = params.get("arguments", {})
             print(f"[MCP] Calling tool: {tool_name}", flush=True)
             print(f"[MCP] Arguments: {json.dumps(arguments, indent=2)[:300]}", flush=True)
+            tracing.tag(tool=tool_name)
+            try:
+                budget = request_deadline(params)
+            except ValueError as e:
+                return jsonrpc_error(-32602, f"Invalid params: {e}")
+
+            def tool_response(content: list[dict]):
+                result = {"content": content}
+                if request_wants_trace(params):
+                    result["_meta"] = {"trace": tracing.current().as_dict()}
+                return jsonrpc_response(result)
 
-            result = await call_tool(tool_name, arguments)
+            try:
+                with deadline.budget(budget):
+                    async with admission.admit(tool_name):
+                        with tracing.span("tool", tool=tool_name):
+                            result = await call_tool_within_deadline(tool_name, arguments)
+            except deadline.DeadlineExceeded:
+                # The deadline ran out while the call was still queued
+                metrics.tool_errors.labels(tool_label(tool_name), "deadline").inc()
+                return tool_response([{"type": "text", "text": json.dumps({
+                    "error": "Request deadline exceeded",
+                    "tool": tool_name,
+                    "message": "The tool call could not start before the deadline sent by the client."
+                })}])
+            except ServerBusy as e:
+                # Shed load fast instead of queueing without bound
+                metrics.tool_errors.labels(tool_label(tool_name), "busy").inc()
+                retry_after = max(1, round(e.retry_after))
+                return jsonrpc_error(
+                    SERVER_BUSY,
+                    str(e),
+                    data={"tool": e.tool, "reason": e.reason, "retry_after": retry_after},
+                    status_code=503,
+                    headers={"Retry-After": str(retry_after)},
+                )
 
             print(f"[MCP] Tool {tool_name} completed, returning result", flush=True)
-            return jsonrpc_response({
-                "content": [{"type": r.type, "text": r.text} for r in result]
-            })
+            return tool_response([{"type": r.type, "text": r.text} for r in result])
 
         else:
             print(f"[MCP] Unknown method: {method}", flush=True)
@@ -311,10 +696,65 @@ async def handle_messages(request: Request):
 
         # Try to return error response if we have request_id
         try:
-            return jsonrpc_error(-32603, f"Internal error: {str(e)}")
-        except:
+            return jsonrpc_error(-32603, f"Internal error: {str(e)}", status_code=500)
+        except Exception:
             # If jsonrpc_error fails, return basic error
-            return JSONResponse({"error": str(e)}, status_code=500)
+            return Reply(jsonrpc_error_message(body.get("id"), -32603, f"Internal error: {str(e)}"), 500)
+
+
+async def handle_stats(request: Request):
+    """Handle GET /stats endpoint - runtime counters for shared services"""
+    return JSONResponse({
+        "worker": {"pid": os.getpid(), "workers": WEB_WORKERS},
+        "http": http_pool.stats(),
+        "http_cache": http_cache.stats(),
+        "search_cache": search_cache.stats(),
+        "searxng_breaker": searxng_breaker.stats(),
+        "ddgs": ddgs_pool.stats(),
+        "extraction_pool": extraction_pool.stats(),
+        "extraction_cache": extraction_cache.stats(),
+        "shared_cache": await shared_cache.stats(),
+        "admission": admission.stats(),
+        "prefetch": prefetcher.stats(),
+        "warmup": warmup.stats(),
+        "profiler": profiler.stats(),
+    })
+
+
+async def handle_metrics(request: Request):
+    """Handle GET /metrics endpoint - Prometheus text exposition"""
+    return Response(metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+
+
+async def handle_ready(request: Request):
+    """Handle GET /ready endpoint - 200 once warm-up has finished, 503 before"""
+    if not warmup.ready:
+        return JSONResponse({"status": "warming", **warmup.stats()}, status_code=503)
+    return JSONResponse({"status": "ready", **warmup.stats()})
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app: Starlette):
+    """Open shared services on startup and release them on shutdown.
+
+    Only cheap setup happens before the server binds; spawning workers and
+    opening connections run in the background warm-up (see ``/ready``).
+    """
+    await http_pool.start()
+    warmup.start({
+        "extraction_pool": extraction_pool.start,
+        "ddgs": ddgs_pool.start,
+        "connections": lambda: preconnect(WARMUP_URLS),
+    })
+    try:
+        yield
+    finally:
+        await warmup.close()
+        await prefetcher.close()
+        await ddgs_pool.close()
+        await extraction_pool.close()
+        await http_pool.close()
+        await shared_cache.flush()
 
 
 # Create Starlette app
@@ -323,7 +763,11 @@ app = Starlette(
     routes=[
         Route("/mcp", handle_messages, methods=["POST"]),
         Route("/sse", handle_sse, methods=["GET"]),
-    ]
+        Route("/stats", handle_stats, methods=["GET"]),
+        Route("/ready", handle_ready, methods=["GET"]),
+        Route("/metrics", handle_metrics, methods=["GET"]),
+    ],
+    lifespan=lifespan,
 )
 
 
@@ -331,20 +775,29 @@ def main():
     """Main entry point"""
     port = int(os.environ.get("PORT", 3002))
 
-    from src.tools.search import SEARXNG_URL, SEARXNG_KEY
+    from src.tools.search import SEARXNG_KEY
 
     print(f"Starting MCP Web Server v1.1.0 on port {port}...", flush=True)
     print("Available tools:", flush=True)
     key_status = "key configured" if SEARXNG_KEY else "no key"
     print(f"  - search: SearXNG ({SEARXNG_URL}, {key_status}) + DDGS fallback", flush=True)
     print("  - fetch: Extract clean content from web pages (curl_cffi)", flush=True)
+    print("  - fetch_many: Fetch several pages concurrently", flush=True)
+    print("  - search_and_read: Search and read the top results in one call", flush=True)
     print("  - json_fetch: Fetch JSON from APIs (curl_cffi)", flush=True)
     print(f"\nHTTP endpoint: http://0.0.0.0:{port}/mcp", flush=True)
+    print(f"Stats endpoint: http://0.0.0.0:{port}/stats", flush=True)
+    print(f"Metrics endpoint: http://0.0.0.0:{port}/metrics", flush=True)
+    print(f"Readiness endpoint: http://0.0.0.0:{port}/ready", flush=True)
+    if WEB_WORKERS > 1:
+        print(f"Workers: {WEB_WORKERS} (shared cache: {shared_cache.path})", flush=True)
 
+    # Several workers need an import string so each process can load the app
     uvicorn.run(
-        app,
+        "src.server:app" if WEB_WORKERS > 1 else app,
         host="0.0.0.0",
         port=port,
+        workers=WEB_WORKERS,
         log_level="info"
     )
 
@@ -0,0 +1,186 @@
+"""Admission control: per-tool concurrency limits with bounded wait queues.
+
+Each tool gets a gate admitting at most ``limit`` concurrent calls.  Further
+calls wait in a FIFO queue of at most ``ADMISSION_QUEUE_SIZE`` entries for
+up to ``ADMISSION_QUEUE_TIMEOUT`` seconds; calls that find the queue full or
+time out waiting raise ``ServerBusy`` so the server can answer immediately
+instead of piling up downloads and extraction jobs.  A call whose request
+deadline runs out first raises ``deadline.DeadlineExceeded`` instead: the
+client's budget is spent, so telling it to retry would be wrong.
+
+Limits come from ``TOOL_CONCURRENCY`` (``"search=16,fetch=8"``); names not
+listed there share one ``(other)`` gate limited to ``ADMISSION_DEFAULT_LIMIT``.
+"""
+import asyncio
+import contextlib
+import os
+import time
+from collections import deque
+
+from src.services import deadline, tracing
+
+ADMISSION_DEFAULT_LIMIT = int(os.environ.get("ADMISSION_DEFAULT_LIMIT", 16))
+ADMISSION_QUEUE_SIZE = int(os.environ.get("ADMISSION_QUEUE_SIZE", 32))
+ADMISSION_QUEUE_TIMEOUT = float(os.environ.get("ADMISSION_QUEUE_TIMEOUT", 10))
+
+# fetch_many / search_and_read fan out to several fetches per call
+_DEFAULT_LIMITS = {"search": 16, "fetch": 8, "fetch_many": 2, "search_and_read": 2, "json_fetch": 16}
+
+
+def _parse_limits(spec: str) -> dict[str, int]:
+    limits = dict(_DEFAULT_LIMITS)
+    for part in spec.split(","):
+        name, sep, value = part.partition("=")
+        if sep and name.strip() and value.strip().isdigit():
+            limits[name.strip()] = int(value)
+    return limits
+
+
+TOOL_CONCURRENCY = _parse_limits(os.environ.get("TOOL_CONCURRENCY", ""))
+
+
+class ServerBusy(Exception):
+    """A call could not be admitted: the tool's queue is full or the wait timed out."""
+
+    def __init__(self, tool: str, reason: str, retry_after: float):
+        super().__init__(f"Server busy: {tool} {reason}")
+        self.tool = tool
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class _Gate:
+    """FIFO concurrency gate for one tool."""
+
+    def __init__(self, name: str, limit: int, queue_size: int, queue_timeout: float):
+        self.name = name
+        self.limit = limit
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self.admitted = 0
+        self.queued = 0
+        self.rejected_queue_full = 0
+        self.rejected_timeout = 0
+        self.deadline_expired = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    async def acquire(self) -> None:
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            self.admitted += 1
+            return
+        if len(self._waiters) >= self.queue_size:
+            self.rejected_queue_full += 1
+            raise ServerBusy(self.name, "queue is full", self.queue_timeout)
+
+        # Never queue past the request deadline
+        timeout = deadline.clamp(self.queue_timeout)
+        deadline_bound = timeout < self.queue_timeout
+        self.queued += 1
+        start = time.monotonic()
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, timeout)
+        except asyncio.TimeoutError:
+            # Since 3.12 wait_for can time out after the slot was handed over
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            if deadline_bound:
+                self.deadline_expired += 1
+                raise deadline.DeadlineExceeded("request deadline exceeded while queued") from None
+            self.rejected_timeout += 1
+            raise ServerBusy(self.name, f"not admitted within {timeout:g}s",
+                             self.queue_timeout) from None
+        except asyncio.CancelledError:
+            # Caller went away; pass on a slot that was handed over meanwhile
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+        finally:
+            with contextlib.suppress(ValueError):
+                self._waiters.remove(waiter)
+        waited = time.monotonic() - start
+        self.wait_total += waited
+        self.wait_max = max(self.wait_max, waited)
+        self.admitted += 1
+
+    def release(self) -> None:
+        # Hand the slot straight to the oldest live waiter, keeping FIFO order
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def stats(self) -> dict:
+        return {
+            "limit": self.limit,
+            "active": self.active,
+            "queue_depth": len(self._waiters),
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "rejected_queue_full": self.rejected_queue_full,
+            "rejected_timeout": self.rejected_timeout,
+            "deadline_expired": self.deadline_expired,
+            "wait_ms_avg": round(self.wait_total / self.queued * 1000, 1) if self.queued else 0.0,
+            "wait_ms_max": round(self.wait_max * 1000, 1),
+        }
+
+
+class AdmissionController:
+    """Per-tool gates, created on first use."""
+
+    def __init__(
+        self,
+        limits: dict[str, int] | None = None,
+        default_limit: int = ADMISSION_DEFAULT_LIMIT,
+        queue_size: int = ADMISSION_QUEUE_SIZE,
+        queue_timeout: float = ADMISSION_QUEUE_TIMEOUT,
+    ):
+        self.limits = dict(TOOL_CONCURRENCY if limits is None else limits)
+        self.default_limit = default_limit
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self._gates: dict[str, _Gate] = {}
+
+    def _gate(self, tool: str) -> _Gate:
+        if tool not in self.limits:
+            tool = "(other)"  # keeps arbitrary client-supplied names from adding gates
+        gate = self._gates.get(tool)
+        if gate is None:
+            limit = self.limits.get(tool, self.default_limit)
+            gate = self._gates[tool] = _Gate(tool, limit, self.queue_size, self.queue_timeout)
+        return gate
+
+    @contextlib.asynccontextmanager
+    async def admit(self, tool: str):
+        """Hold one of *tool*'s slots for the duration of the block.
+
+        Raises ``ServerBusy`` if no slot frees up in time, or
+        ``deadline.DeadlineExceeded`` if the request deadline runs out first.
+        """
+        gate = self._gate(tool)
+        with tracing.span("admission", queued=gate.active >= gate.limit):
+            await gate.acquire()
+        try:
+            yield
+        finally:
+            gate.release()
+
+    def stats(self) -> dict:
+        gates = {name: gate.stats() for name, gate in self._gates.items()}
+        return {
+            "queue_size": self.queue_size,
+            "queue_timeout": self.queue_timeout,
+            "rejected": sum(g["rejected_queue_full"] + g["rejected_timeout"] for g in gates.values()),
+            "tools": gates,
+        }
+
+
+# Process-wide singleton used by handle_messages
+admission = AdmissionController()
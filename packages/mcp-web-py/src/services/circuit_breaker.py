@@ -0,0 +1,85 @@
+"""Circuit breaker for upstream services (closed → open → half-open).
+
+Opens after ``failure_threshold`` consecutive failures and rejects calls
+for ``recovery_time`` seconds.  Then a single probe is let through
+(half-open): success closes the circuit, failure re-opens it.  Also keeps
+an exponentially weighted latency average of successful calls, which
+auto search uses to time its DDGS hedge.
+"""
+import time
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with latency tracking."""
+
+    def __init__(self, name: str, failure_threshold: int = 3, recovery_time: float = 30.0,
+                 latency_alpha: float = 0.2):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_time = recovery_time
+        self.latency_alpha = latency_alpha
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.latency_ewma: float | None = None
+        self._probe_in_flight = False
+        self.successes = 0
+        self.failures = 0
+        self.rejected = 0
+        self.times_opened = 0
+
+    def allow(self) -> bool:
+        """Whether a call may go to the upstream right now."""
+        if self.state == OPEN:
+            if time.monotonic() - self.opened_at < self.recovery_time:
+                self.rejected += 1
+                return False
+            self.state = HALF_OPEN
+        if self.state == HALF_OPEN:
+            if self._probe_in_flight:
+                self.rejected += 1
+                return False
+            self._probe_in_flight = True
+        return True
+
+    def record_success(self, latency: float) -> None:
+        self.successes += 1
+        self.consecutive_failures = 0
+        self._probe_in_flight = False
+        self.state = CLOSED
+        if self.latency_ewma is None:
+            self.latency_ewma = latency
+        else:
+            self.latency_ewma += self.latency_alpha * (latency - self.latency_ewma)
+
+    def record_abandoned(self) -> None:
+        """A call given up for reasons of the caller's own: counts as nothing,
+        but lets the next call probe if it was the half-open probe."""
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self.consecutive_failures += 1
+        self._probe_in_flight = False
+        if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != OPEN:
+                self.times_opened += 1
+                print(f"[CircuitBreaker] {self.name} opened after "
+                      f"{self.consecutive_failures} failure(s)", flush=True)
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "successes": self.successes,
+            "failures": self.failures,
+            "rejected": self.rejected,
+            "times_opened": self.times_opened,
+            "latency_ewma_ms": round(self.latency_ewma * 1000, 1) if self.latency_ewma is not None else None,
+        }
@@ -0,0 +1,221 @@
+"""Dedicated thread pool with long-lived DDGS clients.
+
+``DDGS`` is synchronous and keeps one HTTP client per search engine
+("backend") for as long as the ``DDGS`` object lives.  Creating a fresh
+``DDGS()`` per query in the default executor therefore redoes every TLS
+handshake and competes with unrelated ``to_thread`` work.  Here each
+worker thread of a bounded executor owns one ``DDGS`` whose engines are
+instantiated up front and reused across queries.
+
+An engine that answers with a rate-limit status (or raises) is dropped
+from its client and re-created, with a new HTTP client and browser
+fingerprint, before the next query; a client whose whole search failed
+is replaced.  Per-backend latency, status and error counters are kept
+for ``/stats``.
+
+Engine instrumentation and recycling use DDGS internals (``_get_engines``
+and ``_engines_cache``).  If a ddgs release drops them, searches still run
+on the pooled clients, just without per-backend stats or recycling.
+"""
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from ddgs import DDGS
+
+from src.services import deadline
+
+DDGS_WORKERS = int(os.environ.get("DDGS_WORKERS", 4))
+
+# Statuses search engines use to turn scrapers away
+_RATE_LIMIT_STATUSES = {202, 403, 429}
+_LATENCY_ALPHA = 0.2
+
+
+class _BackendStats:
+    __slots__ = ("requests", "errors", "rate_limited", "latency_ewma")
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.rate_limited = 0
+        self.latency_ewma: float | None = None
+
+    def as_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "rate_limited": self.rate_limited,
+            "latency_ewma_ms": round(self.latency_ewma * 1000, 1) if self.latency_ewma is not None else None,
+        }
+
+
+class DdgsPool:
+    """Bounded executor whose threads each reuse one warmed ``DDGS`` client."""
+
+    def __init__(self, workers: int = DDGS_WORKERS):
+        self.workers = workers
+        self._executor: ThreadPoolExecutor | None = None
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._backends: dict[str, _BackendStats] = {}
+        self.queries = 0
+        self.errors = 0
+        self.clients_created = 0
+        self.clients_recycled = 0
+        self.engines_recycled = 0
+        self.instrumented: bool | None = None
+
+    # -- worker-thread side -------------------------------------------------
+
+    def _client(self) -> DDGS:
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = DDGS()
+            self._local.client = client
+            self._local.stale_engines = set()
+            with self._lock:
+                self.clients_created += 1
+        if not self._has_hooks(client):
+            return client
+        # Instantiate (or re-create recycled) engines and hook their HTTP clients
+        for engine in client._get_engines("text", "auto"):
+            if not getattr(engine, "_pool_instrumented", False):
+                self._instrument(engine)
+        return client
+
+    def _has_hooks(self, client: DDGS) -> bool:
+        hooks = hasattr(client, "_get_engines") and isinstance(getattr(client, "_engines_cache", None), dict)
+        if self.instrumented is None:
+            self.instrumented = hooks
+            if not hooks:
+                print("[DdgsPool] DDGS internals not found; searching without per-engine stats", flush=True)
+        return hooks
+
+    def _instrument(self, engine) -> None:
+        http_client = engine.http_client
+        request = http_client.request
+        name = engine.name
+        stale = self._local.stale_engines
+
+        def timed_request(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                response = request(*args, **kwargs)
+            except Exception:
+                self._record(name, time.perf_counter() - start, error=True)
+                stale.add(type(engine))
+                raise
+            limited = response.status_code in _RATE_LIMIT_STATUSES
+            self._record(name, time.perf_counter() - start, rate_limited=limited)
+            if limited:
+                stale.add(type(engine))
+            return response
+
+        http_client.request = timed_request
+        engine._pool_instrumented = True
+
+    def _record(self, backend: str, latency: float, error: bool = False, rate_limited: bool = False) -> None:
+        with self._lock:
+            stats = self._backends.setdefault(backend, _BackendStats())
+            stats.requests += 1
+            if error:
+                stats.errors += 1
+                return
+            if rate_limited:
+                stats.rate_limited += 1
+                return
+            if stats.latency_ewma is None:
+                stats.latency_ewma = latency
+            else:
+                stats.latency_ewma += _LATENCY_ALPHA * (latency - stats.latency_ewma)
+
+    def _text_sync(self, query: str, region: str, max_results: int) -> list[dict]:
+        client = self._client()
+        try:
+            return list(client.text(
+                query=query,
+                region=region,
+                safesearch="off",
+                max_results=max_results,
+                backend="auto",
+            ))
+        except Exception:
+            # Every engine failed or timed out: start over with a fresh client
+            self._local.client = None
+            with self._lock:
+                self.clients_recycled += 1
+            raise
+        finally:
+            stale = self._local.stale_engines
+            if self._local.client is not None and stale:
+                engines = self._local.client._engines_cache
+                for engine_class in stale:
+                    engines.pop(engine_class, None)
+                with self._lock:
+                    self.engines_recycled += len(stale)
+            stale.clear()
+
+    def _warm(self, barrier: threading.Barrier) -> None:
+        self._client()
+        barrier.wait(timeout=30)  # keeps this thread busy so every worker gets a task
+
+    # -- event-loop side ----------------------------------------------------
+
+    def _ensure_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="ddgs")
+        return self._executor
+
+    async def start(self) -> None:
+        """Create every worker thread and its client before serving traffic."""
+        loop = asyncio.get_running_loop()
+        executor = self._ensure_executor()
+        barrier = threading.Barrier(self.workers)
+        await asyncio.gather(*(loop.run_in_executor(executor, self._warm, barrier) for _ in range(self.workers)))
+        print(f"[DdgsPool] {self.workers} DDGS client(s) ready", flush=True)
+
+    async def close(self) -> None:
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            await asyncio.to_thread(executor.shutdown, wait=True, cancel_futures=True)
+
+    async def text(self, query: str, region: str, max_results: int) -> list[dict]:
+        """Run a DDGS text search on a pooled client within the request deadline.
+
+        At the deadline the caller gets ``DeadlineExceeded``; the worker
+        thread finishes the search in the background (DDGS can't be
+        interrupted) and then serves the next query.
+        """
+        self.queries += 1
+        loop = asyncio.get_running_loop()
+        try:
+            timeout = deadline.clamp(None)
+            future = loop.run_in_executor(self._ensure_executor(), self._text_sync, query, region, max_results)
+            try:
+                return await asyncio.wait_for(future, timeout)
+            except asyncio.TimeoutError:
+                raise deadline.DeadlineExceeded("request deadline exceeded during DDGS search") from None
+        except Exception:
+            self.errors += 1
+            raise
+
+    def stats(self) -> dict:
+        with self._lock:
+            backends = {name: s.as_dict() for name, s in sorted(self._backends.items())}
+            return {
+                "workers": self.workers,
+                "queries": self.queries,
+                "errors": self.errors,
+                "clients_created": self.clients_created,
+                "clients_recycled": self.clients_recycled,
+                "engines_recycled": self.engines_recycled,
+                "instrumented": self.instrumented,
+                "backends": backends,
+            }
+
+
+# Process-wide singleton used by search_tool
+ddgs_pool = DdgsPool()
@@ -0,0 +1,58 @@
+"""Per-request time budget, propagated through a context variable.
+
+The server opens a ``budget()`` scope around each ``tools/call`` with the
+deadline the client sent in ``params._meta``.  The absolute deadline lives
+in a ``ContextVar``, so it follows the call into every task and thread it
+starts without being threaded through function signatures.  Code that
+waits on I/O or workers shortens its own timeout with ``clamp()``:
+
+    response = await http_pool.get(url, timeout=deadline.clamp(10))
+
+Outside a budget ``clamp()`` returns the timeout unchanged.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+_deadline: ContextVar[float | None] = ContextVar("deadline", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    """The request's time budget is used up."""
+
+
+def remaining() -> float | None:
+    """Seconds left in the current budget, or None if there is none."""
+    at = _deadline.get()
+    return None if at is None else at - time.monotonic()
+
+
+def clamp(timeout: float | None, reserve: float = 0.0) -> float | None:
+    """*timeout* shortened to the time left, minus *reserve* seconds.
+
+    Raises ``DeadlineExceeded`` when nothing is left.  ``clamp(None)`` is
+    the time left (None without a budget), for ``asyncio.wait_for``.
+    """
+    left = remaining()
+    if left is None:
+        return timeout
+    left -= reserve
+    if left <= 0:
+        raise DeadlineExceeded("request deadline exceeded")
+    return left if timeout is None else min(timeout, left)
+
+
+@contextmanager
+def budget(seconds: float | None) -> Iterator[None]:
+    """Limit the enclosed work to *seconds*; never extends an outer budget."""
+    if seconds is None:
+        yield
+        return
+    at = time.monotonic() + seconds
+    outer = _deadline.get()
+    token = _deadline.set(at if outer is None else min(at, outer))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
@@ -0,0 +1,407 @@
+"""HTML / PDF → clean content extraction (CPU-bound, runs in worker processes).
+
+trafilatura (F1: 0.958) as primary extraction, readability-lxml as fallback;
+PDFs go through pypdf page by page.  Everything here is synchronous and
+picklable so it can be shipped to the extraction process pool (see
+``worker_pool``).
+
+HTML extraction is bounded for hostile pages: the parsed tree is pruned of
+scripts, styles, SVG and comments and capped at ``EXTRACT_MAX_NODES``
+elements and ``EXTRACT_MAX_DEPTH`` levels before any extractor sees it, and
+each attempt in the trafilatura → readability chain runs under its share of
+the time budget.  When the budget is spent the chain stops and returns the
+pruned document's plain text.
+"""
+import copy
+import functools
+import io
+import os
+import signal
+import threading
+import time
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Iterator
+
+from lxml import etree
+
+if TYPE_CHECKING:
+    import html2text
+    from trafilatura.settings import Extractor
+
+from src.services import deadline
+from src.services.worker_pool import EXTRACT_TIMEOUT
+
+EXTRACT_MAX_NODES = int(os.environ.get("EXTRACT_MAX_NODES", 50_000))
+EXTRACT_MAX_DEPTH = int(os.environ.get("EXTRACT_MAX_DEPTH", 100))
+
+# Elements no extractor keeps (trafilatura drops them all while cleaning)
+_PRUNED_TAGS = (
+    "script", "style", "noscript", "template", "svg", "math",
+    "iframe", "object", "embed", "canvas",
+)
+# Share of the budget trafilatura may use before readability gets the rest,
+# and the share held back for the plain-text last resort
+_TRAFILATURA_SHARE = 0.6
+_RESERVE_SHARE = 0.1
+
+# trafilatura, readability, html2text and pypdf are imported on first use:
+# they are most of the server's import time, and with the process pool only
+# the extraction workers ever need them (see ``warm_up``).
+
+
+@functools.cache
+def _output_options(fmt: str) -> "Extractor":
+    # Same options fetch_tool has always used: no comments, keep tables
+    from trafilatura.settings import Extractor
+
+    return Extractor(output_format=fmt, comments=False, tables=True, with_metadata=False)
+
+
+def _extraction_options() -> "Extractor":
+    # Fresh per call: bare_extraction records per-document state on it.
+    # Output formats are rendered afterwards from the returned document.
+    from trafilatura.settings import Extractor
+
+    return Extractor(output_format="txt", comments=False, tables=True, with_metadata=True)
+
+
+def _html2text(ignore_links: bool = False) -> "html2text.HTML2Text":
+    import html2text
+
+    h = html2text.HTML2Text()
+    h.ignore_links = ignore_links
+    h.ignore_images = ignore_links
+    h.body_width = 0
+    return h
+
+
+def _ms(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 2)
+
+
+FORMATS = ("markdown", "text", "html")
+
+
+class _AttemptTimeout(Exception):
+    """One extraction attempt used up its share of the budget."""
+
+
+def _raise_attempt_timeout(signum, frame):
+    raise _AttemptTimeout()
+
+
+@contextmanager
+def _time_limit(seconds: float) -> Iterator[None]:
+    """Interrupt the enclosed block with ``_AttemptTimeout`` after *seconds*.
+
+    Signals only reach the main thread, which is where pool workers run
+    tasks; on other threads (``EXTRACT_WORKERS=0``) the block runs to
+    completion and the caller's clock checks stop the chain instead.  The
+    worker pool's own alarm is re-armed afterwards with the time it had left.
+    """
+    if threading.current_thread() is not threading.main_thread():
+        yield
+        return
+    started = time.monotonic()
+    outer, _ = signal.getitimer(signal.ITIMER_REAL)
+    previous = signal.signal(signal.SIGALRM, _raise_attempt_timeout)
+    signal.setitimer(signal.ITIMER_REAL, max(min(seconds, outer or seconds), 0.001))
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+        if outer:
+            signal.setitimer(signal.ITIMER_REAL, max(outer - (time.monotonic() - started), 0.001))
+
+
+def _default_budget() -> float:
+    """Time this task may take: the pool's pending alarm, request deadline or ``EXTRACT_TIMEOUT``."""
+    budget = EXTRACT_TIMEOUT
+    if threading.current_thread() is threading.main_thread():
+        alarm, _ = signal.getitimer(signal.ITIMER_REAL)
+        if alarm:
+            budget = min(budget, alarm)
+    left = deadline.remaining()
+    return budget if left is None else max(min(budget, left), 0.0)
+
+
+def prune(tree, max_nodes: int = EXTRACT_MAX_NODES, max_depth: int = EXTRACT_MAX_DEPTH) -> dict:
+    """Shrink *tree* in place to what extraction can use, within fixed bounds.
+
+    Drops ``_PRUNED_TAGS`` elements (JSON-LD scripts are kept for metadata),
+    comments and processing instructions, keeping the text that follows
+    them.  Elements at ``max_depth`` have their descendants' tags stripped,
+    so their text survives one level up.  The document is cut off after
+    ``max_nodes`` elements, like a download stopped at a byte cap.
+
+    Returns ``{"removed", "nodes", "flattened", "truncated"}``.
+    """
+    victims = [
+        el for el in tree.iter(*_PRUNED_TAGS, etree.Comment, etree.ProcessingInstruction)
+        if not (el.tag == "script" and (el.get("type") or "").strip().lower() == "application/ld+json")
+    ]
+    for el in victims:
+        el.drop_tree()
+
+    nodes = 0
+    flattened = 0
+    truncated = False
+    stack = [(tree, 0)]
+    while stack:
+        el, depth = stack.pop()
+        nodes += 1
+        if nodes > max_nodes:
+            _truncate_from(el)
+            truncated = True
+            break
+        if depth >= max_depth and len(el):
+            etree.strip_tags(el, "*")
+            flattened += 1
+            continue
+        # Reversed so elements are visited in document order
+        stack.extend((child, depth + 1) for child in reversed(el))
+    return {"removed": len(victims), "nodes": min(nodes, max_nodes), "flattened": flattened, "truncated": truncated}
+
+
+def _truncate_from(el) -> None:
+    """Remove *el* and everything after it in document order."""
+    parent = el.getparent()
+    if parent is None:
+        return
+    for following in list(el.itersiblings()):
+        parent.remove(following)
+    parent.remove(el)
+    while parent.getparent() is not None:
+        grandparent = parent.getparent()
+        for following in list(parent.itersiblings()):
+            grandparent.remove(following)
+        parent.tail = None
+        parent = grandparent
+
+
+def render(source: str, format: str) -> str:
+    """Render *format* from the ``source`` markup of an ``extract_all`` result.
+
+    For the formats extraction left out (see ``extract_all``); runs in the
+    worker pool like extraction.
+    """
+    if format == "markdown":
+        return _html2text().handle(source)
+    if format == "text":
+        return _html2text(ignore_links=True).handle(source)
+    return source
+
+
+def _with_formats(result: dict, rendered: dict, source: str, formats: tuple[str, ...]) -> dict:
+    for fmt in formats:
+        if fmt not in rendered:
+            rendered[fmt] = render(source, fmt)
+    result["formats"] = rendered
+    if len(rendered) < len(FORMATS):
+        result["source"] = source
+    return result
+
+
+def _trafilatura(tree, timings: dict, formats: tuple[str, ...]) -> dict | None:
+    from trafilatura import bare_extraction
+    from trafilatura.core import determine_returnstring
+
+    start = time.perf_counter()
+    # Metadata is extracted from the pristine tree before the body is cleaned
+    # (bare_extraction works on its own copy, so *tree* stays intact)
+    document = bare_extraction(tree, options=_extraction_options())
+    timings["extract"] = _ms(start)
+    if document is None or document.body is None or not len(document.body):
+        return None
+
+    start = time.perf_counter()
+    text = determine_returnstring(document, _output_options("txt"))
+    if not text:
+        timings["convert"] = _ms(start)
+        return None
+    # The XML rendering prunes empty nodes in place: work on a copy
+    xml = determine_returnstring(copy.deepcopy(document), _output_options("xml"))
+    result = _with_formats({
+        "title": document.title or "Untitled",
+        "author": document.author or None,
+        "method": "trafilatura",
+    }, {"text": text, "html": text}, xml or text, formats)
+    timings["convert"] = _ms(start)
+    return result
+
+
+def _readability(source, timings: dict, formats: tuple[str, ...]) -> dict:
+    from readability import Document
+
+    start = time.perf_counter()
+    doc = Document(source)
+    title = doc.title()
+    content_html = doc.summary()
+    timings["fallback"] = _ms(start)
+
+    start = time.perf_counter()
+    result = _with_formats(
+        {"title": title, "author": None, "method": "readability"}, {"html": content_html}, content_html, formats
+    )
+    timings["convert"] = _ms(start)
+    return result
+
+
+def _plain_text(tree, timings: dict) -> dict:
+    """Last resort: the whitespace-normalized text of the pruned document."""
+    start = time.perf_counter()
+    title = ""
+    text = ""
+    if tree is not None:
+        title = (tree.findtext(".//title") or "").strip()
+        body = tree.find(".//body")
+        lines = ((body if body is not None else tree).text_content()).splitlines()
+        text = "\n".join(line for line in (" ".join(raw.split()) for raw in lines) if line)
+    timings["plain_text"] = _ms(start)
+    return {
+        "title": title or "Untitled",
+        "author": None,
+        "formats": {"markdown": text, "text": text, "html": text},
+        "method": "text",
+    }
+
+
+def extract_all(html: str, budget: float | None = None, formats: tuple[str, ...] = FORMATS) -> dict:
+    """Extract title, author and the content in *formats*.
+
+    The HTML is parsed into one lxml tree and pruned (see ``prune``);
+    trafilatura's main-content body and metadata come from a single
+    ``bare_extraction`` over it.  readability works on the same pruned tree
+    when trafilatura finds nothing.  Formats that cost nothing extra (text
+    and html from trafilatura, html from readability) are always included;
+    markdown (html2text, the expensive one) only when asked for.  When a
+    format is left out, ``source`` holds the markup ``render`` turns into
+    it, so a cached result can serve any later format request for the same
+    HTML without extracting again.
+
+    *budget* (seconds) defaults to the time left before the worker pool's
+    alarm or the request deadline.  trafilatura may use 60% of it and
+    readability what remains short of a 10% reserve; an attempt that runs
+    out is interrupted, and if neither produced a result the plain text of
+    the pruned tree is returned.
+
+    Returns ``{"title", "author", "formats", "method", "timings", "limits",
+    "degraded"}`` (plus ``source``) where ``formats`` maps formats to content,
+    ``method`` is ``"trafilatura"``, ``"readability"`` or ``"text"``,
+    ``timings`` holds per-stage milliseconds (``parse``, ``prune``,
+    ``extract``, ``convert``, ...), ``limits`` names the bounds that were
+    hit and ``degraded`` is true when the time budget cut the chain short.
+    """
+    # First-use imports happen here, before the budget starts and outside
+    # the attempts' time limits
+    import readability  # noqa: F401
+    from trafilatura.utils import load_html
+
+    started = time.monotonic()
+    if budget is None:
+        budget = _default_budget()
+    give_up_at = started + budget * (1 - _RESERVE_SHARE)
+    timings: dict[str, float] = {}
+    limits: list[str] = []
+
+    start = time.perf_counter()
+    tree = load_html(html)
+    timings["parse"] = _ms(start)
+
+    result = None
+    if tree is not None:
+        start = time.perf_counter()
+        pruned = prune(tree)
+        timings["prune"] = _ms(start)
+        if pruned["truncated"]:
+            limits.append("max_nodes")
+        if pruned["flattened"]:
+            limits.append("max_depth")
+
+        left = min(started + budget * _TRAFILATURA_SHARE, give_up_at) - time.monotonic()
+        if left <= 0:
+            limits.append("trafilatura_skipped")
+        else:
+            start = time.perf_counter()
+            try:
+                with _time_limit(left):
+                    result = _trafilatura(tree, timings, formats)
+            except _AttemptTimeout:
+                timings["extract"] = _ms(start)
+                limits.append("trafilatura_timeout")
+
+    if result is None:
+        left = give_up_at - time.monotonic()
+        if left <= 0:
+            limits.append("readability_skipped")
+        else:
+            try:
+                with _time_limit(left):
+                    # Without a tree readability parses the raw HTML itself
+                    result = _readability(tree if tree is not None else html, timings, formats)
+            except _AttemptTimeout:
+                limits.append("readability_timeout")
+
+    if result is None:
+        result = _plain_text(tree, timings)
+
+    degraded = any(limit.startswith(("trafilatura_", "readability_")) for limit in limits)
+    return {**result, "timings": timings, "limits": limits, "degraded": degraded}
+
+
+def extract_pdf(data: bytes, max_length: int) -> dict:
+    """Extract text from a PDF page by page, stopping after *max_length* chars.
+
+    Pages past the point where enough text has been produced are never
+    parsed.  Returns ``title``, ``author``, ``content``, ``method`` and
+    ``timings`` like a single-format HTML extraction, plus ``pages`` (pages
+    read) and ``pages_total``.
+    """
+    from pypdf import PdfReader
+
+    timings: dict[str, float] = {}
+
+    start = time.perf_counter()
+    reader = PdfReader(io.BytesIO(data), strict=False)
+    if reader.is_encrypted:
+        reader.decrypt("")  # many PDFs are "encrypted" with an empty user password
+    metadata = reader.metadata
+    pages_total = len(reader.pages)
+    timings["parse"] = _ms(start)
+
+    start = time.perf_counter()
+    parts: list[str] = []
+    length = 0
+    pages = 0
+    for page in reader.pages:
+        text = (page.extract_text() or "").strip()
+        pages += 1
+        if text:
+            parts.append(text)
+            length += len(text) + 2
+        if length >= max_length:
+            break
+    timings["extract"] = _ms(start)
+
+    return {
+        "title": (metadata.title if metadata else None) or None,
+        "author": (metadata.author if metadata else None) or None,
+        "content": "\n\n".join(parts),
+        "method": "pypdf",
+        "timings": timings,
+        "pages": pages,
+        "pages_total": pages_total,
+    }
+
+
+_WARMUP_HTML = (
+    "<html><head><title>warm-up</title></head><body><article>"
+    "<h1>Warm-up</h1><p>" + "Prime lxml, trafilatura and readability. " * 20 + "</p>"
+    "</article></body></html>"
+)
+
+
+def warm_up() -> None:
+    """Run one small extraction so first real calls are fast."""
+    extract_all(_WARMUP_HTML)
@@ -0,0 +1,178 @@
+"""Content-addressed cache of HTML extraction results.
+
+Keyed by the SHA-256 of the downloaded HTML bytes, so identical pages
+share one entry no matter which URL, mirror or cache tier they came from.
+An entry holds the title, author, the content in the formats rendered so
+far and the ``source`` markup the others are rendered from
+(``extraction.extract_all``), so a page fetched as ``text`` and later as
+``markdown`` is extracted once; the markdown is rendered on its first
+request and memoized into the entry.  The cache is an in-memory LRU
+bounded by the total size of the stored strings; concurrent requests for
+the same HTML share one extraction.  With several workers, entries are
+also written to the shared cache tier, which is consulted before
+extracting.  Results cut short by the time budget (``degraded``) are
+returned but never stored: a later request with more time may do better.
+"""
+import asyncio
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from typing import Awaitable, Callable
+
+from src.services.shared_cache import SharedCache, shared_cache
+
+EXTRACT_CACHE_MAX_BYTES = int(os.environ.get("EXTRACT_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+
+
+def content_key(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _entry_size(entry: dict) -> int:
+    text = sum(len(v) for v in entry["formats"].values()) + len(entry.get("source") or "")
+    return text + len(entry.get("title") or "") + 256
+
+
+class ExtractionCache:
+    """Size-bounded LRU of ``extract_all`` results with single-flight misses."""
+
+    def __init__(self, max_bytes: int = EXTRACT_CACHE_MAX_BYTES, shared: SharedCache | None = None):
+        self.max_bytes = max_bytes
+        self.shared = shared if shared is not None else shared_cache
+        self._entries: OrderedDict[str, tuple[dict, int]] = OrderedDict()
+        self._bytes = 0
+        self._inflight: dict[str, asyncio.Task] = {}
+        self._rendering: dict[tuple[str, str], asyncio.Task] = {}
+        self.hits = 0
+        self.coalesced = 0
+        self.misses = 0
+        self.shared_hits = 0
+        self.degraded = 0
+        self.renders = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    async def get_or_extract(self, key: str, extract: Callable[[], Awaitable[dict]]) -> tuple[dict, str]:
+        """Return ``(entry, status)`` for *key*; status is ``hit``, ``coalesced`` or ``miss``.
+
+        An entry found in the shared tier counts as a ``hit``.  Entries are
+        shared: callers must not mutate them.
+        """
+        if not self.enabled:
+            self.misses += 1
+            return await extract(), "miss"
+
+        cached = self._entries.get(key)
+        if cached is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return cached[0], "hit"
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.coalesced += 1
+            entry, _ = await asyncio.shield(inflight)
+            return entry, "coalesced"
+
+        task = asyncio.create_task(self._load_or_extract(key, extract))
+        self._inflight[key] = task
+
+        def _clear(t: asyncio.Task) -> None:
+            if self._inflight.get(key) is t:
+                del self._inflight[key]
+            if not t.cancelled():
+                t.exception()  # mark retrieved; waiters re-raise it themselves
+
+        task.add_done_callback(_clear)
+        return await asyncio.shield(task)
+
+    async def _load_or_extract(self, key: str, extract: Callable[[], Awaitable[dict]]) -> tuple[dict, str]:
+        raw = await self.shared.get("extraction", key)
+        if raw is not None:
+            self.hits += 1
+            self.shared_hits += 1
+            entry = json.loads(raw)
+            self._store(key, entry)
+            return entry, "hit"
+        self.misses += 1
+        entry = await extract()
+        if entry.get("degraded"):
+            self.degraded += 1
+            return entry, "miss"
+        self._store(key, entry)
+        self.shared.put_in_background("extraction", key, json.dumps(entry, ensure_ascii=False).encode("utf-8"))
+        return entry, "miss"
+
+    async def get_format(self, key: str, entry: dict, format: str, render: Callable[[], Awaitable[str]]) -> str:
+        """*format* of *entry*, rendered by *render* on its first request.
+
+        The rendering is memoized into the entry (and the shared tier);
+        concurrent requests for the same format share one rendering.
+        """
+        content = entry["formats"].get(format)
+        if content is not None:
+            return content
+        flight = (key, format)
+        task = self._rendering.get(flight)
+        if task is None:
+            task = self._rendering[flight] = asyncio.create_task(self._render(key, entry, format, render))
+
+            def _clear(t: asyncio.Task) -> None:
+                if self._rendering.get(flight) is t:
+                    del self._rendering[flight]
+                if not t.cancelled():
+                    t.exception()  # mark retrieved; waiters re-raise it themselves
+
+            task.add_done_callback(_clear)
+        return await asyncio.shield(task)
+
+    async def _render(self, key: str, entry: dict, format: str, render: Callable[[], Awaitable[str]]) -> str:
+        self.renders += 1
+        content = await render()
+        entry["formats"][format] = content
+        if all(fmt in entry["formats"] for fmt in ("markdown", "text", "html")):
+            entry.pop("source", None)
+        cached = self._entries.get(key)
+        if cached is not None and cached[0] is entry:
+            size = _entry_size(entry)
+            self._bytes += size - cached[1]
+            self._entries[key] = (entry, size)
+            self._evict()
+            self.shared.put_in_background("extraction", key, json.dumps(entry, ensure_ascii=False).encode("utf-8"))
+        return content
+
+    def _store(self, key: str, entry: dict) -> None:
+        size = _entry_size(entry)
+        if size > self.max_bytes:
+            return
+        self._entries[key] = (entry, size)
+        self._bytes += size
+        self._evict()
+
+    def _evict(self) -> None:
+        while self._bytes > self.max_bytes:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self._bytes -= evicted
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.coalesced + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "coalesced": self.coalesced,
+            "misses": self.misses,
+            "shared_hits": self.shared_hits,
+            "degraded": self.degraded,
+            "renders": self.renders,
+            "hit_ratio": round((self.hits + self.coalesced) / lookups, 3) if lookups else 0.0,
+        }
+
+
+# Process-wide singleton used by fetch_tool
+extraction_cache = ExtractionCache()
@@ -0,0 +1,532 @@
+"""Size-bounded on-disk HTTP response cache with conditional revalidation.
+
+Sits between the tools and the shared ``http_pool``.  Follows the parts of
+RFC 9111 that matter for a shared cache in front of agent traffic:
+
+- only safe requests (GET) without ``Authorization`` are cached, and only
+  200 responses that are not ``no-store`` / ``private`` / ``Vary: *``;
+- freshness comes from ``s-maxage`` / ``max-age``, then ``Expires``, then a
+  ``Last-Modified`` heuristic (10% of the document age, capped);
+- stale entries with an ``ETag`` / ``Last-Modified`` are revalidated with
+  ``If-None-Match`` / ``If-Modified-Since`` and refreshed on ``304``;
+- entries are evicted least-recently-used once the byte budget is exceeded.
+
+Each entry is a ``<key>.body`` file plus a ``<key>.json`` metadata file,
+both written atomically (temp file + ``os.replace``).  Reads bump the
+metadata file's mtime, so LRU order lives on disk.  With several workers
+sharing the directory, a lookup missing from this process's index still
+checks the disk, and the index is rebuilt from the directory every
+``HTTP_CACHE_RESCAN`` seconds.  That way the byte budget and LRU order
+cover every worker's entries.
+
+Responses downloaded speculatively (``prefetch=True``, see ``prefetch``)
+are also held in memory for ``PREFETCH_TTL`` seconds whether or not they
+are storable, the way browsers keep prefetched resources for their next
+navigation.  Any GET of the same URL in that window is served from memory
+(``cache="prefetch"``), unless the held body was cut short of what the
+request would read.
+"""
+import asyncio
+import email.utils
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
+
+from src.services.http_client import http_pool
+from src.services.shared_cache import WEB_WORKERS
+
+HTTP_CACHE_DIR = os.environ.get(
+    "HTTP_CACHE_DIR", os.path.join(tempfile.gettempdir(), "mcp-web-http-cache")
+)
+HTTP_CACHE_MAX_BYTES = int(os.environ.get("HTTP_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+HTTP_CACHE_RESCAN = float(os.environ.get("HTTP_CACHE_RESCAN", 30))
+PREFETCH_TTL = float(os.environ.get("PREFETCH_TTL", 120))
+PREFETCH_MAX_BYTES = int(os.environ.get("PREFETCH_MAX_BYTES", 32 * 1024 * 1024))
+
+_CACHEABLE_METHODS = {"GET"}
+_HEURISTIC_MAX_SECONDS = 24 * 3600
+# Never replayed from the cache (hop-by-hop, body framing, per-client state)
+_UNSTORED_HEADERS = {
+    "set-cookie", "connection", "keep-alive", "transfer-encoding",
+    "content-length", "content-encoding",
+}
+# Body prefix handed to inspect hooks for cached responses
+_SNIFF_BYTES = 64 * 1024
+_CHARSET_RE = re.compile(r"charset=([\w.:-]+)", re.IGNORECASE)
+
+
+@dataclass
+class CachedResponse:
+    """Minimal response shared by live and cached paths.
+
+    ``cache`` is one of ``"hit"`` (served fresh from disk), ``"revalidated"``
+    (server answered 304), ``"prefetch"`` (downloaded shortly before by a
+    prefetch), ``"miss"`` (downloaded, possibly stored) or ``"bypass"``
+    (request/response not cacheable).
+    """
+    url: str
+    status_code: int
+    reason: str
+    headers: dict[str, str]
+    content: bytes
+    cache: str = "bypass"
+    truncated: bool = False
+    _text: str | None = field(default=None, repr=False)
+
+    @property
+    def encoding(self) -> str:
+        m = _CHARSET_RE.search(_header(self.headers, "content-type") or "")
+        return m.group(1) if m else "utf-8"
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            try:
+                self._text = self.content.decode(self.encoding, errors="replace")
+            except LookupError:
+                self._text = self.content.decode("utf-8", errors="replace")
+        return self._text
+
+    def json(self):
+        return json.loads(self.text)
+
+    @property
+    def from_cache(self) -> bool:
+        return self.cache in ("hit", "revalidated", "prefetch")
+
+
+def _header(headers: dict[str, str], name: str) -> str | None:
+    """Case-insensitive header lookup."""
+    name = name.lower()
+    for key, value in headers.items():
+        if key.lower() == name:
+            return value
+    return None
+
+
+def _cache_control(headers: dict[str, str]) -> dict[str, str | None]:
+    directives: dict[str, str | None] = {}
+    for part in (_header(headers, "cache-control") or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        name, _, value = part.partition("=")
+        directives[name.strip().lower()] = value.strip().strip('"') or None
+    return directives
+
+
+def _parse_date(value: str | None) -> float | None:
+    if not value:
+        return None
+    try:
+        return email.utils.parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+def _int(value: str | None) -> int | None:
+    try:
+        return max(0, int(value)) if value is not None else None
+    except ValueError:
+        return None
+
+
+def freshness_lifetime(headers: dict[str, str], now: float) -> float:
+    """Seconds a stored response stays fresh (RFC 9111 §4.2.1)."""
+    cc = _cache_control(headers)
+    for directive in ("s-maxage", "max-age"):
+        seconds = _int(cc.get(directive))
+        if seconds is not None:
+            return float(seconds)
+
+    date = _parse_date(_header(headers, "date")) or now
+    expires = _header(headers, "expires")
+    if expires is not None:
+        expires_at = _parse_date(expires)
+        return max(0.0, expires_at - date) if expires_at is not None else 0.0
+
+    last_modified = _parse_date(_header(headers, "last-modified"))
+    if last_modified is not None:
+        return min(max(0.0, (date - last_modified) * 0.1), _HEURISTIC_MAX_SECONDS)
+    return 0.0
+
+
+def is_storable(method: str, request_headers: dict[str, str], status: int,
+                headers: dict[str, str]) -> bool:
+    """Whether a response may be stored by this (shared) cache."""
+    if method not in _CACHEABLE_METHODS or status != 200:
+        return False
+    cc = _cache_control(headers)
+    if "no-store" in cc or "private" in cc:
+        return False
+    if (_header(headers, "vary") or "").strip() == "*":
+        return False
+    if _header(request_headers, "authorization") is not None and "public" not in cc:
+        return False
+    # Without freshness or validators a stored copy could never be reused
+    has_validator = _header(headers, "etag") or _header(headers, "last-modified")
+    return bool(has_validator) or freshness_lifetime(headers, time.time()) > 0
+
+
+class HttpCache:
+    """LRU on-disk cache of GET responses keyed by URL (+ request headers)."""
+
+    def __init__(self, directory: str = HTTP_CACHE_DIR, max_bytes: int = HTTP_CACHE_MAX_BYTES,
+                 shared: bool = WEB_WORKERS > 1, prefetch_ttl: float = PREFETCH_TTL,
+                 prefetch_max_bytes: int = PREFETCH_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        # Other processes write to the same directory
+        self.shared = shared
+        self.prefetch_ttl = prefetch_ttl
+        self.prefetch_max_bytes = prefetch_max_bytes
+        self._index: OrderedDict[str, int] | None = None  # key -> size, LRU order
+        self._scanned_at = 0.0
+        self._bytes = 0
+        # key -> (expires_at, response) for prefetched responses, oldest first
+        self._prefetched: OrderedDict[str, tuple[float, CachedResponse]] = OrderedDict()
+        self._prefetched_bytes = 0
+        self.prefetch_hits = 0
+        self.prefetch_short = 0
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.bypassed = 0
+        self.stores = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    # -- index --------------------------------------------------------------
+
+    def _load_index(self) -> OrderedDict[str, int]:
+        if self._index is None:
+            self._use_index(self._scan())
+        return self._index
+
+    def _use_index(self, index: OrderedDict[str, int]) -> None:
+        self._index = index
+        self._bytes = sum(index.values())
+        self._scanned_at = time.monotonic()
+
+    def _scan(self) -> OrderedDict[str, int]:
+        """Index of the entries on disk, least recently used first."""
+        os.makedirs(self.directory, exist_ok=True)
+        entries: list[tuple[float, str, int]] = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            key = name[:-5]
+            try:
+                meta_stat = os.stat(self._path(key, "json"))
+                body_size = os.stat(self._path(key, "body")).st_size
+            except OSError:
+                continue
+            entries.append((meta_stat.st_mtime, key, body_size + meta_stat.st_size))
+        entries.sort()
+        return OrderedDict((key, size) for _, key, size in entries)
+
+    def _path(self, key: str, ext: str) -> str:
+        return os.path.join(self.directory, f"{key}.{ext}")
+
+    @staticmethod
+    def key(method: str, url: str, headers: dict[str, str] | None = None) -> str:
+        normalized = sorted((k.lower(), v) for k, v in (headers or {}).items())
+        raw = f"{method} {url}\n{json.dumps(normalized)}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    # -- disk I/O (run in threads) -----------------------------------------
+
+    def _read(self, key: str) -> tuple[dict, bytes] | None:
+        try:
+            with open(self._path(key, "json"), "r", encoding="utf-8") as fh:
+                meta = json.load(fh)
+            with open(self._path(key, "body"), "rb") as fh:
+                body = fh.read()
+            os.utime(self._path(key, "json"))  # persist LRU recency
+        except (OSError, ValueError):
+            return None
+        return meta, body
+
+    def _atomic_write(self, path: str, data: bytes) -> None:
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+
+    def _write(self, key: str, meta: dict, body: bytes | None) -> int:
+        if body is not None:
+            self._atomic_write(self._path(key, "body"), body)
+        meta_bytes = json.dumps(meta).encode("utf-8")
+        self._atomic_write(self._path(key, "json"), meta_bytes)
+        return os.path.getsize(self._path(key, "body")) + len(meta_bytes)
+
+    def _remove(self, key: str) -> None:
+        for ext in ("json", "body"):
+            try:
+                os.unlink(self._path(key, ext))
+            except OSError:
+                pass
+
+    # -- bookkeeping --------------------------------------------------------
+
+    def _touch(self, key: str, size: int) -> None:
+        index = self._load_index()
+        self._bytes += size - index.pop(key, 0)
+        index[key] = size
+
+    def _forget(self, key: str) -> None:
+        index = self._load_index()
+        self._bytes -= index.pop(key, 0)
+
+    def _hold(self, key: str, response: CachedResponse) -> None:
+        """Keep a prefetched response in memory for ``prefetch_ttl`` seconds."""
+        self._drop_held(key)
+        size = len(response.content)
+        if size > self.prefetch_max_bytes:
+            return
+        self._prefetched[key] = (time.monotonic() + self.prefetch_ttl, response)
+        self._prefetched_bytes += size
+        while self._prefetched_bytes > self.prefetch_max_bytes:
+            self._drop_held(next(iter(self._prefetched)))
+
+    def _drop_held(self, key: str) -> None:
+        held = self._prefetched.pop(key, None)
+        if held is not None:
+            self._prefetched_bytes -= len(held[1].content)
+
+    def _take_held(self, key: str, max_bytes: int | None, inspect) -> CachedResponse | None:
+        held = self._prefetched.get(key)
+        if held is None:
+            return None
+        expires_at, stored = held
+        if expires_at <= time.monotonic():
+            self._drop_held(key)
+            return None
+        response = replace(stored, cache="prefetch")
+        limit = _limit(response, max_bytes, inspect)
+        if stored.truncated and (limit is None or limit > len(stored.content)):
+            # This request reads further than the prefetch downloaded
+            self.prefetch_short += 1
+            return None
+        self.prefetch_hits += 1
+        if limit is not None and len(response.content) > limit:
+            response.content = response.content[:limit]
+            response.truncated = True
+        return response
+
+    async def _evict(self) -> None:
+        if self.shared and time.monotonic() - self._scanned_at > HTTP_CACHE_RESCAN:
+            # Pick up sizes and recency of entries written by other workers
+            self._use_index(await asyncio.to_thread(self._scan))
+        index = self._load_index()
+        victims: list[str] = []
+        while self._bytes > self.max_bytes and index:
+            key, size = index.popitem(last=False)
+            self._bytes -= size
+            victims.append(key)
+        if victims:
+            self.evictions += len(victims)
+            await asyncio.to_thread(lambda: [self._remove(k) for k in victims])
+
+    async def _store(self, key: str, meta: dict, body: bytes | None) -> None:
+        try:
+            size = await asyncio.to_thread(self._write, key, meta, body)
+        except OSError as e:
+            print(f"[HttpCache] Write failed for {meta.get('url')}: {e}", flush=True)
+            return
+        self._touch(key, size)
+        self.stores += 1
+        await self._evict()
+
+    # -- public API ---------------------------------------------------------
+
+    async def request(self, method: str, url: str, *, headers: dict[str, str] | None = None,
+                      max_bytes: int | None = None, inspect=None, prefetch: bool = False,
+                      **kwargs) -> CachedResponse:
+        """Perform *method* on *url* through the cache and the shared pool.
+
+        *max_bytes* / *inspect* have the same meaning as for
+        ``HttpClientPool.request`` and are applied to cached bodies too.
+        Truncated downloads are never stored on disk.  With *prefetch* a
+        downloaded 200 response is also held in memory for the request
+        expected to follow.
+        """
+        headers = dict(headers or {})
+        kwargs.update(max_bytes=max_bytes, inspect=inspect)
+        safe = (
+            method in _CACHEABLE_METHODS
+            and kwargs.get("data") is None
+            and _header(headers, "authorization") is None
+        )
+        key = self.key(method, url, headers)
+        if safe and self._prefetched and not prefetch:
+            held = self._take_held(key, max_bytes, inspect)
+            if held is not None:
+                return held
+        if not (safe and self.enabled):
+            self.bypassed += 1
+            result = self._wrap(await http_pool.request(method, url, headers=headers, **kwargs), "bypass")
+            if prefetch and safe and result.status_code == 200:
+                self._hold(key, result)
+            return result
+
+        stored = None
+        if key in self._load_index() or self.shared:
+            stored = await asyncio.to_thread(self._read, key)
+            if stored is None:
+                self._forget(key)
+            elif key not in self._index:
+                # Written by another worker since the last scan
+                self._touch(key, len(stored[1]) + len(json.dumps(stored[0])))
+
+        now = time.time()
+        if stored is not None:
+            meta, body = stored
+            cc = _cache_control(meta["headers"])
+            age = now - meta["stored_at"] + meta.get("age", 0)
+            if "no-cache" not in cc and age < meta["lifetime"]:
+                self.hits += 1
+                self._touch(key, self._index[key])
+                return _cap(self._from_meta(meta, body, "hit"), max_bytes, inspect)
+
+            # Stale: revalidate if we have validators
+            etag = _header(meta["headers"], "etag")
+            last_modified = _header(meta["headers"], "last-modified")
+            if etag or last_modified:
+                conditional = dict(headers)
+                if etag:
+                    conditional["If-None-Match"] = etag
+                if last_modified:
+                    conditional["If-Modified-Since"] = last_modified
+                response = await http_pool.request(method, url, headers=conditional, **kwargs)
+                if response.status_code == 304:
+                    self.revalidated += 1
+                    # 304s carry updated freshness/validator headers only
+                    updates = {
+                        k: v for k, v in dict(response.headers).items()
+                        if k.lower() not in _UNSTORED_HEADERS
+                    }
+                    replaced = {k.lower() for k in updates}
+                    merged = {k: v for k, v in meta["headers"].items() if k.lower() not in replaced}
+                    merged.update(updates)
+                    meta.update(
+                        headers=merged,
+                        stored_at=now,
+                        age=_int(_header(merged, "age")) or 0,
+                        lifetime=freshness_lifetime(merged, now),
+                    )
+                    await self._store(key, meta, None)
+                    return _cap(self._from_meta(meta, body, "revalidated"), max_bytes, inspect)
+                return await self._handle_live(key, method, url, headers, response, now, prefetch)
+
+        response = await http_pool.request(method, url, headers=headers, **kwargs)
+        return await self._handle_live(key, method, url, headers, response, now, prefetch)
+
+    async def _handle_live(self, key: str, method: str, url: str, request_headers: dict[str, str],
+                           response, now: float, prefetch: bool = False) -> CachedResponse:
+        self.misses += 1
+        result = self._wrap(response, "miss")
+        storable = is_storable(method, request_headers, result.status_code, result.headers)
+        if prefetch and result.status_code == 200 and (result.truncated or not storable):
+            self._hold(key, result)
+        if not result.truncated and storable:
+            meta = {
+                "url": result.url,
+                "status_code": result.status_code,
+                "reason": result.reason,
+                "headers": {
+                    k: v for k, v in result.headers.items() if k.lower() not in _UNSTORED_HEADERS
+                },
+                "stored_at": now,
+                "age": _int(_header(result.headers, "age")) or 0,
+                "lifetime": freshness_lifetime(result.headers, now),
+            }
+            await self._store(key, meta, result.content)
+        elif key in self._load_index():
+            self._forget(key)
+            await asyncio.to_thread(self._remove, key)
+        return result
+
+    @staticmethod
+    def _wrap(response, cache: str) -> CachedResponse:
+        return CachedResponse(
+            url=response.url,
+            status_code=response.status_code,
+            reason=getattr(response, "reason", "") or "",
+            headers=dict(response.headers),
+            content=response.content,
+            cache=cache,
+            truncated=getattr(response, "truncated", False),
+        )
+
+    @staticmethod
+    def _from_meta(meta: dict, body: bytes, cache: str) -> CachedResponse:
+        return CachedResponse(
+            url=meta["url"],
+            status_code=meta["status_code"],
+            reason=meta["reason"],
+            headers=meta["headers"],
+            content=body,
+            cache=cache,
+        )
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.revalidated + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._index) if self._index is not None else 0,
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "revalidated": self.revalidated,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "hit_ratio": round((self.hits + self.revalidated) / lookups, 3) if lookups else 0.0,
+            "prefetched": {
+                "entries": len(self._prefetched),
+                "bytes": self._prefetched_bytes,
+                "max_bytes": self.prefetch_max_bytes,
+                "ttl": self.prefetch_ttl,
+                "hits": self.prefetch_hits,
+                "too_short": self.prefetch_short,
+            },
+        }
+
+
+def _limit(response: CachedResponse, max_bytes: int | None, inspect) -> int | None:
+    """The byte cap a download of *response* would have had."""
+    if inspect is not None:
+        limit = inspect(response, response.content[:_SNIFF_BYTES])
+        if limit is not None:
+            max_bytes = limit if max_bytes is None else min(max_bytes, limit)
+    return max_bytes
+
+
+def _cap(response: CachedResponse, max_bytes: int | None, inspect) -> CachedResponse:
+    """Apply a download's inspect hook and byte cap to a cached body."""
+    max_bytes = _limit(response, max_bytes, inspect)
+    if max_bytes is not None and len(response.content) > max_bytes:
+        response.content = response.content[:max_bytes]
+        response.truncated = True
+    return response
+
+
+# Process-wide singleton used by fetch and json_fetch
+http_cache = HttpCache()
@@ -0,0 +1,191 @@
+"""Process-wide pooled HTTP client (curl_cffi) shared by all tools.
+
+One ``AsyncSession`` backed by one curl multi handle lives for the whole
+process, so TCP/TLS connections (and HTTP/2 streams) are kept alive and
+reused across tool calls instead of being re-established per request.
+Its lifecycle is tied to the Starlette app via ``start()`` / ``close()``;
+if a tool runs outside the app (scripts, tests) the session is created
+lazily on first use.
+"""
+import asyncio
+import os
+from typing import Callable
+from urllib.parse import urlsplit
+
+from curl_cffi import AsyncCurl, CurlHttpVersion, CurlInfo, CurlMOpt
+from curl_cffi.requests import AsyncSession, Response
+
+HTTP_MAX_CLIENTS = int(os.environ.get("HTTP_MAX_CLIENTS", 64))
+HTTP_MAX_HOST_CONNECTIONS = int(os.environ.get("HTTP_MAX_HOST_CONNECTIONS", 8))
+HTTP_MAX_IDLE_CONNECTIONS = int(os.environ.get("HTTP_MAX_IDLE_CONNECTIONS", 128))
+
+_MAX_TRACKED_HOSTS = 256  # fetch targets are arbitrary; keep per-host stats bounded
+
+
+class HttpClientPool:
+    """Lazily-created shared ``AsyncSession`` with keep-alive and reuse stats."""
+
+    def __init__(
+        self,
+        max_clients: int = HTTP_MAX_CLIENTS,
+        max_host_connections: int = HTTP_MAX_HOST_CONNECTIONS,
+        max_idle_connections: int = HTTP_MAX_IDLE_CONNECTIONS,
+    ):
+        self.max_clients = max_clients
+        self.max_host_connections = max_host_connections
+        self.max_idle_connections = max_idle_connections
+        self._session: AsyncSession | None = None
+        self._acurl: AsyncCurl | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self.requests = 0
+        self.errors = 0
+        self.new_connections = 0
+        self.reused_connections = 0
+        self.http2_responses = 0
+        self.per_host: dict[str, dict[str, int]] = {}
+
+    # -- lifecycle ----------------------------------------------------------
+
+    async def start(self) -> None:
+        """Create the shared session (idempotent)."""
+        self._ensure_session()
+
+    async def close(self) -> None:
+        """Close the shared session and drop all pooled connections."""
+        session, acurl = self._session, self._acurl
+        self._session = self._acurl = self._loop = None
+        if session is not None:
+            await session.close()
+        if acurl is not None:
+            await acurl.close()
+
+    def _ensure_session(self) -> AsyncSession:
+        loop = asyncio.get_running_loop()
+        if self._session is not None and self._loop is loop:
+            return self._session
+        # A different loop (e.g. a fresh asyncio.run) can't reuse the old
+        # multi handle; its connections are simply abandoned.
+        acurl = AsyncCurl(loop=loop)
+        acurl.setopt(CurlMOpt.MAX_HOST_CONNECTIONS, self.max_host_connections)
+        acurl.setopt(CurlMOpt.MAXCONNECTS, self.max_idle_connections)
+        self._acurl = acurl
+        self._loop = loop
+        self._session = AsyncSession(
+            loop=loop,
+            async_curl=acurl,
+            max_clients=self.max_clients,
+            http_version=CurlHttpVersion.V2TLS,
+            curl_infos=[CurlInfo.NUM_CONNECTS],
+            # Sessions are shared between unrelated callers: never persist cookies
+            discard_cookies=True,
+        )
+        return self._session
+
+    @property
+    def session(self) -> AsyncSession:
+        return self._ensure_session()
+
+    # -- requests -----------------------------------------------------------
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        max_bytes: int | None = None,
+        inspect: Callable[[Response, bytes], int | None] | None = None,
+        **kwargs,
+    ) -> Response:
+        """Issue a request on the shared session and record reuse counters.
+
+        With *max_bytes* the body is streamed and the transfer is aborted
+        once that many (decoded) bytes have arrived; ``response.truncated``
+        tells whether that happened.  *inspect* is called once with the
+        response headers and the first chunk of the body before the rest is
+        read: it may raise to abort the download, or return a lower byte
+        limit.
+        """
+        session = self._ensure_session()
+        host = urlsplit(url).netloc
+        if host not in self.per_host and len(self.per_host) >= _MAX_TRACKED_HOSTS:
+            host = "(other)"
+        self.requests += 1
+        host_stats = self.per_host.setdefault(host, {"requests": 0, "new": 0, "reused": 0})
+        host_stats["requests"] += 1
+        try:
+            if max_bytes is None and inspect is None:
+                response = await session.request(method, url, **kwargs)
+                response.truncated = False
+            else:
+                response = await session.request(method, url, stream=True, **kwargs)
+                try:
+                    await self._read_capped(response, max_bytes, inspect)
+                finally:
+                    response.quit_now.set()  # makes curl abort the transfer if still running
+                    await response.aclose()
+        except Exception:
+            self.errors += 1
+            raise
+        self._record(response, host_stats)
+        return response
+
+    @staticmethod
+    async def _read_capped(response: Response, max_bytes: int | None,
+                           inspect: Callable[[Response, bytes], int | None] | None) -> None:
+        # Streamed responses are parsed before curl_infos are collected
+        if response.curl is not None:
+            response.infos[CurlInfo.NUM_CONNECTS] = response.curl.getinfo(CurlInfo.NUM_CONNECTS)
+        chunks: list[bytes] = []
+        size = 0
+        truncated = False
+        inspected = inspect is None
+        async for chunk in response.aiter_content():
+            if not inspected:
+                inspected = True
+                limit = inspect(response, chunk)
+                if limit is not None:
+                    max_bytes = limit if max_bytes is None else min(max_bytes, limit)
+            chunks.append(chunk)
+            size += len(chunk)
+            if max_bytes is not None and size > max_bytes:
+                truncated = True
+                break
+        if not inspected:
+            inspect(response, b"")
+        content = b"".join(chunks)
+        response.content = content[:max_bytes] if max_bytes is not None else content
+        response.truncated = truncated
+
+    async def get(self, url: str, **kwargs) -> Response:
+        return await self.request("GET", url, **kwargs)
+
+    def _record(self, response: Response, host_stats: dict[str, int]) -> None:
+        num_connects = response.infos.get(CurlInfo.NUM_CONNECTS, 0) or 0
+        if num_connects:
+            self.new_connections += num_connects
+            host_stats["new"] += num_connects
+        else:
+            self.reused_connections += 1
+            host_stats["reused"] += 1
+        if response.http_version == CurlHttpVersion.V2_0:
+            self.http2_responses += 1
+
+    def stats(self) -> dict:
+        """Snapshot of pool configuration and connection-reuse counters."""
+        total = self.new_connections + self.reused_connections
+        return {
+            "active": self._session is not None,
+            "max_clients": self.max_clients,
+            "max_host_connections": self.max_host_connections,
+            "requests": self.requests,
+            "errors": self.errors,
+            "new_connections": self.new_connections,
+            "reused_connections": self.reused_connections,
+            "reuse_ratio": round(self.reused_connections / total, 3) if total else 0.0,
+            "http2_responses": self.http2_responses,
+            "per_host": self.per_host,
+        }
+
+
+# Process-wide singleton used by every tool
+http_pool = HttpClientPool()
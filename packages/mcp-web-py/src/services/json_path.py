@@ -0,0 +1,185 @@
+"""Streaming JSONPath-style projection over a JSON byte stream.
+
+Supports a practical subset of JSONPath: ``$`` root, ``.name`` /
+``['name']`` member access, ``[3]`` indexes, ``[*]`` / ``.*`` wildcards
+and ``[start:stop]`` slices (non-negative bounds).  Recursive descent
+(``..``), filters and negative indexes need the whole document and are
+rejected.
+
+The document is walked as ijson parse events; only values at matching
+locations are materialized, and parsing stops as soon as no further match
+is possible, e.g. right after ``$.data.id`` or after the third element of
+``$.items[0:3]``.  Bytes after that point are never decoded.
+"""
+import re
+from dataclasses import dataclass
+from typing import Any, Iterable
+
+import ijson
+
+_TOKEN_RE = re.compile(
+    r"""\.(?P<name>[A-Za-z_$][\w$-]*)     # .name
+      | \.\*                              # .*
+      | \[\s*(?P<quoted>'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")\s*\]   # ['name']
+      | \[\s*(?P<index>\d+)\s*\]          # [3]
+      | \[\s*\*\s*\]                      # [*]
+      | \[\s*(?P<start>\d*)\s*:\s*(?P<stop>\d*)\s*\]   # [1:5]
+    """,
+    re.VERBOSE,
+)
+_START_EVENTS = frozenset(("start_map", "start_array"))
+_END_EVENTS = frozenset(("end_map", "end_array"))
+
+
+class JsonPathError(ValueError):
+    """The path expression is malformed or uses unsupported syntax."""
+
+
+@dataclass(frozen=True)
+class _Step:
+    name: str | None = None      # object member
+    index: int | None = None     # array element
+    start: int = 0               # slice / wildcard bounds
+    stop: int | None = None
+    wildcard: bool = False
+
+    @property
+    def single(self) -> bool:
+        return self.name is not None or self.index is not None
+
+    def matches(self, key: Any) -> bool:
+        if self.name is not None:
+            return key == self.name
+        if self.index is not None:
+            return key == self.index
+        if self.wildcard:
+            return True
+        return isinstance(key, int) and key >= self.start and (self.stop is None or key < self.stop)
+
+
+class JsonPath:
+    """A compiled path expression."""
+
+    def __init__(self, expression: str):
+        self.expression = expression
+        self.steps = _compile(expression)
+        # Leading steps that select at most one location
+        self.unique = next((i for i, s in enumerate(self.steps) if not s.single), len(self.steps))
+
+    @property
+    def single(self) -> bool:
+        """Whether the path selects at most one value."""
+        return self.unique == len(self.steps)
+
+    def select(self, source) -> tuple[list[Any], bool]:
+        """Values at matching locations of the JSON document *source*.
+
+        *source* is bytes or a binary file object.  Returns
+        ``(matches, complete)``; ``complete`` is False when parsing stopped
+        early because nothing further could match.
+        """
+        return _select(self, ijson.basic_parse(source, use_float=True))
+
+
+def _compile(expression: str) -> list[_Step]:
+    expr = expression.strip()
+    if not expr.startswith("$"):
+        if not expr.startswith((".", "[")):
+            expr = "." + expr
+        expr = "$" + expr
+    if ".." in expr:
+        raise JsonPathError("recursive descent ('..') is not supported")
+    steps: list[_Step] = []
+    pos = 1
+    while pos < len(expr):
+        m = _TOKEN_RE.match(expr, pos)
+        if m is None:
+            raise JsonPathError(f"unsupported path syntax at {expr[pos:]!r}")
+        if m.group("name") is not None:
+            steps.append(_Step(name=m.group("name")))
+        elif m.group("quoted") is not None:
+            quoted = m.group("quoted")
+            steps.append(_Step(name=re.sub(r"\\(.)", r"\1", quoted[1:-1])))
+        elif m.group("index") is not None:
+            steps.append(_Step(index=int(m.group("index"))))
+        elif m.group("start") is not None:
+            start = int(m.group("start") or 0)
+            stop = int(m.group("stop")) if m.group("stop") else None
+            steps.append(_Step(start=start, stop=stop))
+        else:
+            steps.append(_Step(wildcard=True))
+        pos = m.end()
+    return steps
+
+
+class _Frame:
+    __slots__ = ("is_array", "key", "viable")
+
+    def __init__(self, is_array: bool, viable: bool):
+        self.is_array = is_array
+        self.key: Any = -1 if is_array else None
+        self.viable = viable
+
+
+def _select(path: JsonPath, events: Iterable[tuple[str, Any]]) -> tuple[list[Any], bool]:
+    steps = path.steps
+    unique = path.unique
+    # A bounded slice right after the unique prefix lets us stop at its end
+    limit = steps[unique].stop if unique < len(steps) and not steps[unique].wildcard else None
+    matches: list[Any] = []
+    stack: list[_Frame] = []
+    builder: ijson.ObjectBuilder | None = None
+    depth = 0  # nesting inside the value being built
+
+    for event, value in events:
+        if builder is not None:
+            builder.event(event, value)
+            if event in _START_EVENTS:
+                depth += 1
+            elif event in _END_EVENTS:
+                depth -= 1
+                if not depth:
+                    matches.append(builder.value)
+                    builder = None
+                    if len(stack) == unique:
+                        return matches, False  # the only possible match is done
+            continue
+
+        if event == "map_key":
+            stack[-1].key = value
+            continue
+        if event in _END_EVENTS:
+            frame = stack.pop()
+            if frame.viable and len(stack) == unique:
+                return matches, False  # left the one subtree that can hold matches
+            continue
+
+        # A value starts at the location described by the stack
+        level = len(stack)
+        if level:
+            parent = stack[-1]
+            if parent.is_array:
+                parent.key += 1
+            viable = parent.viable and steps[level - 1].matches(parent.key)
+            if (parent.viable and level == unique + 1 and limit is not None
+                    and parent.is_array and parent.key >= limit):
+                return matches, False  # past the end of the slice
+        else:
+            viable = True
+
+        if viable and level == len(steps):
+            builder = ijson.ObjectBuilder()
+            builder.event(event, value)
+            if event in _START_EVENTS:
+                depth = 1
+                continue
+            matches.append(builder.value)
+            builder = None
+            if level == unique:
+                return matches, False
+        elif event in _START_EVENTS:
+            stack.append(_Frame(event == "start_array", viable))
+        elif viable and level == unique:
+            return matches, False  # a scalar where the path needs a container
+
+    return matches, True
@@ -0,0 +1,135 @@
+"""Query-focused passage selection over extracted page text.
+
+The document is split into paragraph passages (short headings are merged
+into the paragraph that follows them, very long paragraphs are split at
+sentence boundaries), each passage is scored against the query with BM25,
+and the best passages that fit a character budget are returned in document
+order together with their offsets into the full text.
+"""
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+
+# Passages shorter than this are merged into the next one (headings, captions)
+_MIN_PASSAGE = 80
+# Longer paragraphs are split into sentence-bounded windows of about this size
+_MAX_PASSAGE = 1200
+_BM25_K1 = 1.2
+_BM25_B = 0.75
+GAP_MARKER = "\n\n[...]\n\n"
+
+_PARAGRAPH_RE = re.compile(r"\S(?:.*?\S)?(?=[ \t]*\n\s*\n|\s*\Z)", re.DOTALL)
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+")
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have how in is it its of on or that the "
+    "this to was were what when where which who why will with".split()
+)
+
+
+@dataclass
+class Passage:
+    start: int
+    end: int
+    score: float = 0.0
+
+
+def tokenize(text: str) -> list[str]:
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in _STOPWORDS]
+
+
+def split_passages(text: str) -> list[Passage]:
+    """Split *text* into passages with ``[start, end)`` offsets."""
+    spans: list[tuple[int, int]] = []
+    for m in _PARAGRAPH_RE.finditer(text):
+        start, end = m.start(), m.end()
+        while end - start > _MAX_PASSAGE:
+            # Cut at the last sentence end inside the window, else hard cut
+            window = text[start:start + _MAX_PASSAGE]
+            cuts = [s.start() for s in _SENTENCE_END_RE.finditer(window) if s.start() > _MIN_PASSAGE]
+            cut = start + (cuts[-1] if cuts else _MAX_PASSAGE)
+            spans.append((start, cut))
+            start = cut
+            while start < end and text[start].isspace():
+                start += 1
+        spans.append((start, end))
+
+    passages: list[Passage] = []
+    pending: int | None = None
+    for start, end in spans:
+        if pending is not None:
+            start, pending = pending, None
+        if end - start < _MIN_PASSAGE:
+            pending = start
+            continue
+        passages.append(Passage(start, end))
+    if pending is not None:
+        if passages:
+            passages[-1].end = spans[-1][1]
+        else:
+            passages.append(Passage(pending, spans[-1][1]))
+    return passages
+
+
+def score_passages(text: str, passages: list[Passage], query: str) -> None:
+    """Set each passage's BM25 score for *query* in place."""
+    terms = set(tokenize(query))
+    if not terms or not passages:
+        return
+    counts = [Counter(tokenize(text[p.start:p.end])) for p in passages]
+    lengths = [sum(c.values()) for c in counts]
+    avg_length = sum(lengths) / len(lengths) or 1.0
+    n = len(passages)
+    for term in terms:
+        df = sum(1 for c in counts if term in c)
+        if not df:
+            continue
+        idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+        for passage, c, length in zip(passages, counts, lengths):
+            tf = c.get(term, 0)
+            if tf:
+                norm = tf + _BM25_K1 * (1 - _BM25_B + _BM25_B * length / avg_length)
+                passage.score += idf * tf * (_BM25_K1 + 1) / norm
+
+
+def select_passages(text: str, query: str, budget: int) -> tuple[str, list[Passage]]:
+    """Best-scoring passages of *text* for *query* within *budget* characters.
+
+    Returns ``(content, passages)``: the chosen passages in document order
+    joined by ``GAP_MARKER`` where text was skipped, and their offsets and
+    scores.  Returns ``("", [])`` when no passage matches the query.
+    """
+    passages = split_passages(text)
+    score_passages(text, passages, query)
+    ranked = sorted((p for p in passages if p.score > 0), key=lambda p: p.score, reverse=True)
+
+    chosen: list[Passage] = []
+    used = 0
+    for passage in ranked:
+        size = passage.end - passage.start + len(GAP_MARKER)
+        if used + size > budget:
+            if chosen:
+                continue
+            # Even the best passage is too long: keep its head
+            passage = Passage(passage.start, passage.start + max(budget, 0), passage.score)
+            size = budget
+        chosen.append(passage)
+        used += size
+    chosen.sort(key=lambda p: p.start)
+
+    parts: list[str] = []
+    previous_end = 0
+    for passage in chosen:
+        skipped = text[previous_end:passage.start].strip()
+        if parts:
+            parts.append(GAP_MARKER if skipped else "\n\n")
+        elif skipped:
+            parts.append(GAP_MARKER.lstrip("\n"))
+        parts.append(text[passage.start:passage.end])
+        previous_end = passage.end
+    if chosen and text[previous_end:].strip():
+        parts.append(GAP_MARKER.rstrip("\n"))
+    for passage in chosen:
+        passage.score = round(passage.score, 3)
+    return "".join(parts), chosen
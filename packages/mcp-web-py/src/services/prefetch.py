@@ -0,0 +1,250 @@
+"""Speculative prefetch of search results the agent is likely to read next.
+
+After a ``search`` the agent usually fetches one of the top results.  The
+prefetcher queues the top ``PREFETCH_TOP_N`` result URLs and downloads and
+extracts them in the background, so the follow-up ``fetch`` finds the page
+in the HTTP cache's prefetch tier and its extraction in the extraction
+cache.  Prefetching is low priority:
+
+- at most ``PREFETCH_CONCURRENCY`` pages load at once (the global budget),
+  at most ``PREFETCH_PER_HOST`` per host, and at most
+  ``PREFETCH_QUEUE_SIZE`` wait; further URLs are dropped;
+- a queued page only starts while foreground work is light (an idle
+  extraction worker, no tool queueing for admission) and is dropped if
+  that does not happen within ``PREFETCH_MAX_WAIT`` seconds;
+- a foreground fetch of a URL still queued takes it over, and one of a URL
+  being prefetched waits for that download instead of starting another.
+
+``stats()`` reports how many prefetched pages were then fetched, overall
+and per search rank, which is what ``PREFETCH_TOP_N`` should be tuned on.
+"""
+import asyncio
+import contextlib
+import contextvars
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable
+from urllib.parse import urlsplit
+
+from src.services import deadline
+from src.services.admission import admission
+from src.services.http_cache import PREFETCH_TTL
+from src.services.worker_pool import extraction_pool
+
+PREFETCH_TOP_N = int(os.environ.get("PREFETCH_TOP_N", 0))
+PREFETCH_CONCURRENCY = int(os.environ.get("PREFETCH_CONCURRENCY", 2))
+PREFETCH_PER_HOST = int(os.environ.get("PREFETCH_PER_HOST", 1))
+PREFETCH_QUEUE_SIZE = int(os.environ.get("PREFETCH_QUEUE_SIZE", 16))
+PREFETCH_MAX_WAIT = float(os.environ.get("PREFETCH_MAX_WAIT", 30))
+
+# Time budget of one prefetch, and how long a foreground fetch waits for one
+_JOB_DEADLINE = 30.0
+_JOIN_TIMEOUT = 15.0
+_IDLE_POLL = 0.05
+# Completed prefetches remembered for hit accounting
+_RECENT_SIZE = 1024
+
+_prefetching: contextvars.ContextVar[bool] = contextvars.ContextVar("prefetching", default=False)
+
+
+def in_prefetch() -> bool:
+    """Whether the current task is running a prefetch."""
+    return _prefetching.get()
+
+
+def foreground_busy() -> bool:
+    """Whether tool calls are using the capacity a prefetch would take."""
+    if extraction_pool.in_flight >= max(extraction_pool.workers, 1):
+        return True
+    return any(
+        gate["queue_depth"] or gate["active"] >= gate["limit"]
+        for gate in admission.stats()["tools"].values()
+    )
+
+
+@dataclass
+class _Job:
+    url: str
+    host: str
+    rank: int
+    load: Callable[[str], Awaitable[Any]]
+    queued_at: float = field(default_factory=time.monotonic)
+    started: bool = False
+    task: asyncio.Task | None = None
+
+
+class Prefetcher:
+    """Bounded, low-priority background loader for likely next fetches."""
+
+    def __init__(
+        self,
+        top_n: int = PREFETCH_TOP_N,
+        concurrency: int = PREFETCH_CONCURRENCY,
+        per_host: int = PREFETCH_PER_HOST,
+        queue_size: int = PREFETCH_QUEUE_SIZE,
+        max_wait: float = PREFETCH_MAX_WAIT,
+        busy: Callable[[], bool] = foreground_busy,
+    ):
+        self.top_n = top_n
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.queue_size = queue_size
+        self.max_wait = max_wait
+        self._busy = busy
+        self._jobs: dict[str, _Job] = {}
+        self._limit: asyncio.Semaphore | None = None
+        self._host_limits: dict[str, asyncio.Semaphore] = {}
+        self._host_jobs: dict[str, int] = {}
+        # url -> (rank, completed_at) of recent prefetches, oldest first
+        self._recent: OrderedDict[str, tuple[int, float]] = OrderedDict()
+        self.scheduled = 0
+        self.dropped = 0
+        self.expired = 0
+        self.promoted = 0
+        self.joined = 0
+        self.completed = 0
+        self.failed = 0
+        self.used = 0
+        self._completed_by_rank: dict[int, int] = {}
+        self._used_by_rank: dict[int, int] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.top_n > 0 and self.concurrency > 0
+
+    def schedule(self, urls: list[str], load: Callable[[str], Awaitable[Any]]) -> int:
+        """Queue ``load(url)`` for the top ``top_n`` *urls*; returns how many were queued.
+
+        *load* returns the tool result; a dict with an ``error`` key counts
+        as a failed prefetch.
+        """
+        if not self.enabled:
+            return 0
+        if self._limit is None:
+            self._limit = asyncio.Semaphore(self.concurrency)
+        queued = 0
+        for rank, url in enumerate(urls[:self.top_n], start=1):
+            if not url.startswith(("http://", "https://")) or url in self._jobs or self._is_recent(url):
+                continue
+            if sum(1 for job in self._jobs.values() if not job.started) >= self.queue_size:
+                self.dropped += 1
+                continue
+            job = _Job(url=url, host=urlsplit(url).hostname or "", rank=rank, load=load)
+            self._jobs[url] = job
+            self._host_jobs[job.host] = self._host_jobs.get(job.host, 0) + 1
+            # A fresh context: the job must not inherit the search call's deadline
+            job.task = asyncio.create_task(self._run(job), context=contextvars.Context())
+            queued += 1
+        self.scheduled += queued
+        if queued:
+            print(f"[Prefetch] Queued {queued} result(s)", flush=True)
+        return queued
+
+    async def _run(self, job: _Job) -> None:
+        _prefetching.set(True)
+        host_limit = self._host_limits.setdefault(job.host, asyncio.Semaphore(self.per_host))
+        try:
+            async with host_limit, self._limit:
+                if not await self._wait_for_idle(job):
+                    self.expired += 1
+                    return
+                job.started = True
+                with deadline.budget(_JOB_DEADLINE):
+                    result = await job.load(job.url)
+            if isinstance(result, dict) and "error" in result:
+                self.failed += 1
+                return
+            self.completed += 1
+            self._completed_by_rank[job.rank] = self._completed_by_rank.get(job.rank, 0) + 1
+            self._recent[job.url] = (job.rank, time.monotonic())
+            while len(self._recent) > _RECENT_SIZE:
+                self._recent.popitem(last=False)
+        except Exception as e:
+            self.failed += 1
+            print(f"[Prefetch] {job.url} failed: {e}", flush=True)
+        finally:
+            if self._jobs.get(job.url) is job:
+                del self._jobs[job.url]
+            self._host_jobs[job.host] -= 1
+            if not self._host_jobs[job.host]:
+                del self._host_jobs[job.host]
+                self._host_limits.pop(job.host, None)
+
+    async def _wait_for_idle(self, job: _Job) -> bool:
+        """Wait for a quiet moment; False if the job waited past ``max_wait``."""
+        while True:
+            if time.monotonic() - job.queued_at > self.max_wait:
+                return False
+            if not self._busy():
+                return True
+            await asyncio.sleep(_IDLE_POLL)
+
+    async def join(self, url: str) -> None:
+        """Prepare a foreground fetch of *url* to reuse its prefetch.
+
+        A queued prefetch is cancelled (the caller fetches the page itself);
+        one already loading is waited for, within the request deadline.
+        """
+        job = self._jobs.get(url)
+        if job is None or in_prefetch():
+            return
+        if not job.started:
+            del self._jobs[url]
+            job.task.cancel()
+            self.promoted += 1
+            return
+        self.joined += 1
+        with contextlib.suppress(deadline.DeadlineExceeded):
+            await asyncio.wait({job.task}, timeout=deadline.clamp(_JOIN_TIMEOUT))
+
+    def _is_recent(self, url: str) -> bool:
+        recent = self._recent.get(url)
+        return recent is not None and time.monotonic() - recent[1] < PREFETCH_TTL
+
+    def record_use(self, url: str) -> None:
+        """Count a foreground fetch of *url* served from cache after its prefetch."""
+        if not self._is_recent(url):
+            return
+        rank, _ = self._recent.pop(url)
+        self.used += 1
+        self._used_by_rank[rank] = self._used_by_rank.get(rank, 0) + 1
+
+    async def close(self) -> None:
+        tasks = [job.task for job in self._jobs.values() if job.task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._jobs.clear()
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "top_n": self.top_n,
+            "concurrency": self.concurrency,
+            "per_host": self.per_host,
+            "queued": sum(1 for job in self._jobs.values() if not job.started),
+            "running": sum(1 for job in self._jobs.values() if job.started),
+            "scheduled": self.scheduled,
+            "dropped": self.dropped,
+            "expired": self.expired,
+            "promoted": self.promoted,
+            "joined": self.joined,
+            "completed": self.completed,
+            "failed": self.failed,
+            "used": self.used,
+            "hit_rate": round(self.used / self.completed, 3) if self.completed else 0.0,
+            "by_rank": {
+                str(rank): {
+                    "completed": completed,
+                    "used": self._used_by_rank.get(rank, 0),
+                    "hit_rate": round(self._used_by_rank.get(rank, 0) / completed, 3),
+                }
+                for rank, completed in sorted(self._completed_by_rank.items())
+            },
+        }
+
+
+# Process-wide singleton fed by the search tool call
+prefetcher = Prefetcher()
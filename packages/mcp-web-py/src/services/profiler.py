@@ -0,0 +1,204 @@
+"""Sampling profiler that captures stacks of slow requests.
+
+Every request is watched; one that is still running ``PROFILE_SLOW_MS``
+after it started is sampled every ``PROFILE_INTERVAL_MS`` until it ends,
+and the profile is written to ``PROFILE_DIR`` as JSON together with the
+request's trace.  Each sample records two kinds of stack:
+
+- ``loop_stacks``: what the event-loop thread was executing, which shows
+  blocking work on the loop (it may belong to another request);
+- ``task_stacks``: the await chain of every task that opened a span in the
+  request's trace, which shows what the request was waiting on.
+
+Stacks are folded (``outer;inner;innermost`` → sample count), the format
+flame-graph tools read.  Sampling runs in one daemon thread that sleeps
+until the oldest watched request turns slow, so a request that finishes
+in time only costs registering and unregistering its watch.  At most
+``_MAX_ACTIVE`` requests are sampled at once, and only the newest
+``PROFILE_MAX_FILES`` profiles are kept.
+"""
+import asyncio
+import contextlib
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from typing import AsyncIterator
+
+from src.services.tracing import Trace
+
+PROFILE_SLOW_MS = int(os.environ.get("PROFILE_SLOW_MS", 5000))
+PROFILE_INTERVAL_MS = int(os.environ.get("PROFILE_INTERVAL_MS", 10))
+PROFILE_DIR = os.environ.get("PROFILE_DIR", os.path.join(tempfile.gettempdir(), "mcp-web-profiles"))
+PROFILE_MAX_FILES = int(os.environ.get("PROFILE_MAX_FILES", 100))
+
+_MAX_ACTIVE = 4
+_MAX_STACK_DEPTH = 64
+
+
+def _label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_qualname} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+
+
+def _thread_stack(frame) -> str:
+    labels = []
+    while frame is not None and len(labels) < _MAX_STACK_DEPTH:
+        labels.append(_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+def _await_stack(task: asyncio.Task) -> str:
+    labels = []
+    coro = task.get_coro()
+    while coro is not None and len(labels) < _MAX_STACK_DEPTH:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None)
+        if frame is None:
+            break
+        labels.append(_label(frame))
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None)
+    return ";".join(labels)
+
+
+class _Watch:
+    __slots__ = ("trace", "thread_id", "slow_at", "samples", "loop_stacks", "task_stacks")
+
+    def __init__(self, trace: Trace, slow_at: float):
+        self.trace = trace
+        self.thread_id = threading.get_ident()
+        self.slow_at = slow_at
+        self.samples = 0
+        self.loop_stacks: dict[str, int] = {}
+        self.task_stacks: dict[str, int] = {}
+
+    def sample(self, frames: dict) -> None:
+        self.samples += 1
+        frame = frames.get(self.thread_id)
+        if frame is not None:
+            stack = _thread_stack(frame)
+            self.loop_stacks[stack] = self.loop_stacks.get(stack, 0) + 1
+        for task in list(self.trace.tasks):
+            if task.done():
+                continue
+            stack = _await_stack(task)
+            if stack:
+                self.task_stacks[stack] = self.task_stacks.get(stack, 0) + 1
+
+
+class Profiler:
+    """Watches requests and profiles the ones slower than ``slow_ms``."""
+
+    def __init__(
+        self,
+        slow_ms: int = PROFILE_SLOW_MS,
+        interval_ms: int = PROFILE_INTERVAL_MS,
+        directory: str = PROFILE_DIR,
+        max_files: int = PROFILE_MAX_FILES,
+    ):
+        self.slow_ms = slow_ms
+        self.interval_ms = interval_ms
+        self.directory = directory
+        self.max_files = max_files
+        self._watches: set[_Watch] = set()
+        self._cond = threading.Condition()
+        self._thread: threading.Thread | None = None
+        self.profiled = 0
+        self.written: list[str] = []
+
+    @property
+    def enabled(self) -> bool:
+        return self.slow_ms > 0 and self.interval_ms > 0 and bool(self.directory)
+
+    @contextlib.asynccontextmanager
+    async def watch(self, trace: Trace) -> AsyncIterator[None]:
+        """Profile the ``async with`` body if it runs past the threshold."""
+        if not self.enabled:
+            yield
+            return
+        watch = _Watch(trace, trace.started + self.slow_ms / 1000)
+        with self._cond:
+            self._watches.add(watch)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._monitor, name="profiler", daemon=True)
+                self._thread.start()
+            elif len(self._watches) == 1:
+                # Watches turn slow in the order they start, so only the first
+                # one changes when the sampler thread must wake up
+                self._cond.notify()
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._watches.discard(watch)
+            if watch.samples:
+                self.profiled += 1
+                await asyncio.to_thread(self._write, watch)
+
+    def _monitor(self) -> None:
+        while True:
+            with self._cond:
+                while True:
+                    now = time.perf_counter()
+                    due = sorted((w for w in self._watches if w.slow_at <= now), key=lambda w: w.slow_at)
+                    if due:
+                        break
+                    next_due = min((w.slow_at for w in self._watches), default=None)
+                    self._cond.wait(None if next_due is None else next_due - now)
+            frames = sys._current_frames()
+            for watch in due[:_MAX_ACTIVE]:
+                watch.sample(frames)
+            del frames
+            time.sleep(self.interval_ms / 1000)
+
+    def _write(self, watch: _Watch) -> None:
+        trace = watch.trace
+        profile = {
+            **trace.as_dict(),
+            "threshold_ms": self.slow_ms,
+            "interval_ms": self.interval_ms,
+            "samples": watch.samples,
+            "loop_stacks": dict(sorted(watch.loop_stacks.items(), key=lambda item: -item[1])),
+            "task_stacks": dict(sorted(watch.task_stacks.items(), key=lambda item: -item[1])),
+        }
+        name = f"{time.strftime('%Y%m%dT%H%M%S')}-{trace.id}.json"
+        path = os.path.join(self.directory, name)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(profile, f, ensure_ascii=False, indent=1)
+            self._prune()
+        except OSError as e:
+            print(f"[Profiler] Could not write {path}: {e}", flush=True)
+            return
+        self.written.append(path)
+        del self.written[:-self.max_files]
+        print(f"[Profiler] Slow request {trace.id} ({trace.elapsed_ms()}ms): "
+              f"{watch.samples} samples written to {path}", flush=True)
+
+    def _prune(self) -> None:
+        entries = [
+            entry for entry in os.scandir(self.directory)
+            if entry.name.endswith(".json") and entry.is_file()
+        ]
+        entries.sort(key=lambda entry: entry.stat().st_mtime)
+        for entry in entries[:max(len(entries) - self.max_files, 0)]:
+            with contextlib.suppress(OSError):
+                os.unlink(entry.path)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "slow_ms": self.slow_ms,
+            "interval_ms": self.interval_ms,
+            "directory": self.directory,
+            "watching": len(self._watches),
+            "profiled": self.profiled,
+            "last": self.written[-1] if self.written else None,
+        }
+
+
+# Process-wide singleton used by handle_messages
+profiler = Profiler()
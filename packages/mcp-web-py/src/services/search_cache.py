@@ -0,0 +1,214 @@
+"""In-memory search result cache with TTL, stale-while-revalidate and
+in-flight deduplication.
+
+Entries are keyed by (normalized query, region, source) and remember the
+``max_results`` they were fetched with, so a cached 20-result set also
+answers a later request for 10.  Concurrent identical searches share one
+upstream call; entries past their TTL but inside the stale window are
+served immediately while a single background refresh runs.  With several
+workers, fetched results are also written to the shared cache tier and a
+local miss is looked up there before going upstream.
+"""
+import asyncio
+import contextvars
+import json
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+from src.services.shared_cache import SharedCache, shared_cache
+
+SEARCH_CACHE_TTL = float(os.environ.get("SEARCH_CACHE_TTL", 300))
+SEARCH_CACHE_STALE = float(os.environ.get("SEARCH_CACHE_STALE", 900))
+SEARCH_CACHE_MAX_ENTRIES = int(os.environ.get("SEARCH_CACHE_MAX_ENTRIES", 2048))
+
+# (query, region, source) -> fetch(max_results) -> (results, source_used)
+SearchKey = tuple[str, str, str]
+Fetcher = Callable[[int], Awaitable[tuple[list[dict], str]]]
+
+
+def normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive form of a query used as cache key."""
+    return " ".join(query.lower().split())
+
+
+@dataclass
+class _Entry:
+    results: list[dict]
+    source_used: str
+    max_results: int
+    stored_at: float
+
+    def covers(self, max_results: int) -> bool:
+        # A short result set means upstream had nothing more to give
+        return self.max_results >= max_results or len(self.results) < self.max_results
+
+
+class SearchCache:
+    """TTL + stale-while-revalidate cache with single-flight upstream calls."""
+
+    def __init__(
+        self,
+        ttl: float = SEARCH_CACHE_TTL,
+        stale: float = SEARCH_CACHE_STALE,
+        max_entries: int = SEARCH_CACHE_MAX_ENTRIES,
+        shared: SharedCache | None = None,
+    ):
+        self.ttl = ttl
+        self.stale = stale
+        self.max_entries = max_entries
+        self.shared = shared if shared is not None else shared_cache
+        self._entries: OrderedDict[SearchKey, _Entry] = OrderedDict()
+        self._inflight: dict[SearchKey, tuple[int, asyncio.Task]] = {}
+        self._background: set[asyncio.Task] = set()
+        self.hits = 0
+        self.stale_hits = 0
+        self.coalesced = 0
+        self.misses = 0
+        self.shared_hits = 0
+        self.upstream_calls = 0
+        self.upstream_errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_entries > 0
+
+    async def get_or_fetch(
+        self, key: SearchKey, max_results: int, fetch: Fetcher
+    ) -> tuple[list[dict], str, str]:
+        """Return ``(results, source_used, cache_status)`` for *key*.
+
+        ``cache_status`` is ``hit``, ``stale``, ``coalesced`` or ``miss``.
+        Results are fresh copies trimmed to *max_results*.
+        """
+        if not self.enabled:
+            self.misses += 1
+            results, source_used = await self._call_upstream(fetch, max_results)
+            return _trim(results, max_results), source_used, "miss"
+
+        entry = self._entries.get(key)
+        if (entry is None or not entry.covers(max_results)) and key not in self._inflight:
+            entry = await self._load_shared(key, max_results) or entry
+        now = time.monotonic()
+        if entry is not None and entry.covers(max_results):
+            age = now - entry.stored_at
+            if age < self.ttl:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return _trim(entry.results, max_results), entry.source_used, "hit"
+            if age < self.ttl + self.stale:
+                self.stale_hits += 1
+                self._entries.move_to_end(key)
+                self._refresh_in_background(key, entry.max_results, fetch)
+                return _trim(entry.results, max_results), entry.source_used, "stale"
+
+        inflight = self._inflight.get(key)
+        if inflight is not None and inflight[0] >= max_results:
+            self.coalesced += 1
+            results, source_used = await asyncio.shield(inflight[1])
+            return _trim(results, max_results), source_used, "coalesced"
+
+        self.misses += 1
+        task = self._start(key, max_results, fetch)
+        results, source_used = await asyncio.shield(task)
+        return _trim(results, max_results), source_used, "miss"
+
+    def _start(self, key: SearchKey, max_results: int, fetch: Fetcher) -> asyncio.Task:
+        # A fresh context: the shared call must not inherit the first caller's
+        # deadline or trace, since other callers and background refreshes await it
+        task = asyncio.create_task(self._fetch_and_store(key, max_results, fetch), context=contextvars.Context())
+        self._inflight[key] = (max_results, task)
+
+        def _clear(t: asyncio.Task) -> None:
+            if self._inflight.get(key, (0, None))[1] is t:
+                del self._inflight[key]
+            if not t.cancelled():
+                t.exception()  # mark retrieved; waiters re-raise it themselves
+
+        task.add_done_callback(_clear)
+        return task
+
+    def _refresh_in_background(self, key: SearchKey, max_results: int, fetch: Fetcher) -> None:
+        if key in self._inflight:
+            return
+        task = self._start(key, max_results, fetch)
+        self._background.add(task)
+
+        def _done(t: asyncio.Task) -> None:
+            self._background.discard(t)
+            if not t.cancelled() and t.exception() is not None:
+                print(f"[SearchCache] Background refresh failed: {t.exception()}", flush=True)
+
+        task.add_done_callback(_done)
+
+    async def _fetch_and_store(self, key: SearchKey, max_results: int, fetch: Fetcher):
+        results, source_used = await self._call_upstream(fetch, max_results)
+        self._remember(key, _Entry(results, source_used, max_results, time.monotonic()))
+        payload = {"results": results, "source_used": source_used, "max_results": max_results,
+                   "stored_at": time.time()}
+        self.shared.put_in_background("search", _shared_key(key), json.dumps(payload).encode("utf-8"),
+                                      ttl=self.ttl + self.stale)
+        return results, source_used
+
+    def _remember(self, key: SearchKey, entry: _Entry) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def _load_shared(self, key: SearchKey, max_results: int) -> _Entry | None:
+        """Adopt another worker's results for *key* from the shared tier."""
+        raw = await self.shared.get("search", _shared_key(key))
+        if raw is None:
+            return None
+        data = json.loads(raw)
+        # Carry the entry's age over: shared entries use wall-clock time
+        age = max(0.0, time.time() - data["stored_at"])
+        entry = _Entry(data["results"], data["source_used"], data["max_results"], time.monotonic() - age)
+        if not entry.covers(max_results):
+            return None
+        self.shared_hits += 1
+        self._remember(key, entry)
+        return entry
+
+    async def _call_upstream(self, fetch: Fetcher, max_results: int):
+        self.upstream_calls += 1
+        try:
+            return await fetch(max_results)
+        except Exception:
+            self.upstream_errors += 1
+            raise
+
+    def stats(self) -> dict:
+        served = self.hits + self.stale_hits + self.coalesced
+        lookups = served + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "ttl": self.ttl,
+            "stale": self.stale,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "coalesced": self.coalesced,
+            "misses": self.misses,
+            "shared_hits": self.shared_hits,
+            "hit_ratio": round(served / lookups, 3) if lookups else 0.0,
+            "upstream_calls": self.upstream_calls,
+            "upstream_errors": self.upstream_errors,
+            "upstream_calls_avoided": served,
+        }
+
+
+def _shared_key(key: SearchKey) -> str:
+    return json.dumps(key)
+
+
+def _trim(results: list[dict], max_results: int) -> list[dict]:
+    # Callers annotate results (e.g. positions); never hand out cached dicts
+    return [dict(r) for r in results[:max_results]]
+
+
+# Process-wide singleton used by search_tool
+search_cache = SearchCache()
@@ -0,0 +1,226 @@
+"""Cross-process cache tier in a local SQLite database.
+
+With ``WEB_WORKERS > 1`` every uvicorn worker keeps its own in-memory
+search and extraction caches; this store sits behind them so a result
+computed by one worker is a hit in all the others.  It is a namespaced
+key/value table of byte blobs with optional expiry:
+
+- the database runs in WAL mode, so readers never block the writer and
+  each write is one transaction (a crash never leaves a partial entry);
+- a trigger-maintained ``usage`` row tracks total size, and once it exceeds
+  ``SHARED_CACHE_MAX_BYTES`` the least-recently-read entries are evicted
+  in the same transaction as the write that overflowed it;
+- read recency is recorded at most once per ``_TOUCH_INTERVAL`` per entry
+  to keep reads from contending for the write lock.
+
+SQLite calls block, so the async API runs them in threads, with one
+connection per thread.  Callers write through with ``put_in_background``,
+so a locked database never holds up the request that produced the value.
+Errors are logged and treated as misses: the tier is an optimization,
+never a dependency.
+"""
+import asyncio
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+WEB_WORKERS = int(os.environ.get("WEB_WORKERS", 1))
+SHARED_CACHE_PATH = os.environ.get(
+    "SHARED_CACHE_PATH",
+    os.path.join(tempfile.gettempdir(), "mcp-web-shared-cache.sqlite3") if WEB_WORKERS > 1 else "",
+)
+SHARED_CACHE_MAX_BYTES = int(os.environ.get("SHARED_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+
+_TOUCH_INTERVAL = 60.0
+_BUSY_TIMEOUT = 5.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    expires_at REAL,
+    accessed_at REAL NOT NULL,
+    UNIQUE (namespace, key)
+);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at);
+CREATE TABLE IF NOT EXISTS usage (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    entries INTEGER NOT NULL,
+    bytes INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO usage VALUES (0, 0, 0);
+CREATE TRIGGER IF NOT EXISTS entries_insert AFTER INSERT ON entries BEGIN
+    UPDATE usage SET entries = entries + 1, bytes = bytes + NEW.size WHERE id = 0;
+END;
+CREATE TRIGGER IF NOT EXISTS entries_delete AFTER DELETE ON entries BEGIN
+    UPDATE usage SET entries = entries - 1, bytes = bytes - OLD.size WHERE id = 0;
+END;
+CREATE TRIGGER IF NOT EXISTS entries_update AFTER UPDATE OF size ON entries BEGIN
+    UPDATE usage SET bytes = bytes + NEW.size - OLD.size WHERE id = 0;
+END;
+"""
+
+
+class SharedCache:
+    """Namespaced blob store shared by all worker processes on this host."""
+
+    def __init__(self, path: str = SHARED_CACHE_PATH, max_bytes: int = SHARED_CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+        self._pending: set[asyncio.Task] = set()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self.errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path) and self.max_bytes > 0
+
+    # -- worker-thread side -------------------------------------------------
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            # Autocommit; writes open explicit transactions
+            conn = sqlite3.connect(self.path, timeout=_BUSY_TIMEOUT, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with self._schema_lock:
+                if not self._schema_ready:
+                    conn.executescript(_SCHEMA)
+                    self._schema_ready = True
+            self._local.conn = conn
+        return conn
+
+    def _get(self, namespace: str, key: str) -> bytes | None:
+        conn = self._connection()
+        row = conn.execute(
+            "SELECT value, expires_at, accessed_at FROM entries WHERE namespace = ? AND key = ?",
+            (namespace, key),
+        ).fetchone()
+        if row is None:
+            return None
+        value, expires_at, accessed_at = row
+        now = time.time()
+        if expires_at is not None and expires_at <= now:
+            conn.execute("DELETE FROM entries WHERE namespace = ? AND key = ? AND expires_at <= ?",
+                         (namespace, key, now))
+            return None
+        if now - accessed_at > _TOUCH_INTERVAL:
+            conn.execute("UPDATE entries SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                         (now, namespace, key))
+        return value
+
+    def _put(self, namespace: str, key: str, value: bytes, ttl: float | None) -> int:
+        """Store one entry and evict down to the budget; returns entries evicted."""
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else None
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT INTO entries (namespace, key, value, size, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (namespace, key) DO UPDATE SET value = excluded.value, "
+                "size = excluded.size, expires_at = excluded.expires_at, accessed_at = excluded.accessed_at",
+                (namespace, key, value, len(value), expires_at, now),
+            )
+            evicted = self._evict(conn, now)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return evicted
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> int:
+        (total,) = conn.execute("SELECT bytes FROM usage WHERE id = 0").fetchone()
+        if total <= self.max_bytes:
+            return 0
+        evicted = conn.execute("DELETE FROM entries WHERE expires_at <= ?", (now,)).rowcount
+        (excess,) = conn.execute("SELECT bytes - ? FROM usage WHERE id = 0", (self.max_bytes,)).fetchone()
+        victims = []
+        for rowid, size in conn.execute("SELECT rowid, size FROM entries ORDER BY accessed_at"):
+            if excess <= 0:
+                break
+            victims.append((rowid,))
+            excess -= size
+        conn.executemany("DELETE FROM entries WHERE rowid = ?", victims)
+        return evicted + len(victims)
+
+    def _usage(self) -> tuple[int, int]:
+        return self._connection().execute("SELECT entries, bytes FROM usage WHERE id = 0").fetchone()
+
+    # -- event-loop side ----------------------------------------------------
+
+    async def get(self, namespace: str, key: str) -> bytes | None:
+        """The stored value, or None if absent, expired or the store failed."""
+        if not self.enabled:
+            return None
+        try:
+            value = await asyncio.to_thread(self._get, namespace, key)
+        except sqlite3.Error as e:
+            self.errors += 1
+            print(f"[SharedCache] Read failed ({namespace}): {e}", flush=True)
+            return None
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def put(self, namespace: str, key: str, value: bytes, ttl: float | None = None) -> None:
+        """Store *value*, replacing any previous one; oversized values are skipped."""
+        if not self.enabled or len(value) > self.max_bytes:
+            return
+        try:
+            self.evictions += await asyncio.to_thread(self._put, namespace, key, value, ttl)
+            self.writes += 1
+        except sqlite3.Error as e:
+            self.errors += 1
+            print(f"[SharedCache] Write failed ({namespace}): {e}", flush=True)
+
+    def put_in_background(self, namespace: str, key: str, value: bytes, ttl: float | None = None) -> None:
+        """``put`` without waiting for it; ``flush`` waits for pending writes."""
+        if not self.enabled or len(value) > self.max_bytes:
+            return
+        task = asyncio.create_task(self.put(namespace, key, value, ttl))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def flush(self) -> None:
+        """Wait for the writes started by ``put_in_background``."""
+        while self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+
+    async def stats(self) -> dict:
+        stats = {
+            "enabled": self.enabled,
+            "path": self.path or None,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "evictions": self.evictions,
+            "errors": self.errors,
+            "pending_writes": len(self._pending),
+        }
+        if self.enabled:
+            try:
+                stats["entries"], stats["bytes"] = await asyncio.to_thread(self._usage)
+            except sqlite3.Error:
+                pass
+        return stats
+
+
+# Process-wide singleton behind the search and extraction caches
+shared_cache = SharedCache()
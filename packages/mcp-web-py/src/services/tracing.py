@@ -0,0 +1,176 @@
+"""Per-request spans: where the time of one JSON-RPC request went.
+
+``handle_messages`` opens a ``Trace`` for each request (each message of a
+batch gets its own) and stores it in a context variable, so tasks spawned
+while serving it (tool calls, hedged searches, ``fetch_many`` fan-out)
+record into the same trace.  Code marks its stages with::
+
+    with tracing.span("download", url=url) as s:
+        ...
+        s.set(cache=response.cache)
+
+Spans nest by context: a span's parent is the innermost span open in the
+task (or the task that spawned it) when it started.  Outside a request
+(tests, scripts, prefetches) ``span`` returns a shared no-op object, so
+instrumented code costs one context-variable lookup.
+
+Each span records ``name``, ``start_ms`` (from the start of the request),
+``duration_ms``, ``parent`` (index into the span list, or None) and any
+attributes.  Traces are logged as one JSON line per ``tools/call`` and
+returned in the response's ``_meta.trace`` when the client sends
+``_meta.trace: true``.  The profiler (``src/services/profiler.py``) samples
+the tasks that opened spans in a trace.
+"""
+import asyncio
+import contextvars
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+# Spans kept per trace; a large fan-out records the first ones and counts the rest
+_MAX_SPANS = 256
+
+
+class Span:
+    """One timed stage; ``set`` adds attributes to its record."""
+
+    __slots__ = ("_trace", "_index", "_started", "_token", "_record")
+
+    def __init__(self, trace: "Trace", name: str, attrs: dict):
+        self._trace = trace
+        self._record = {"name": name, "start_ms": 0.0, "duration_ms": None, "parent": None, **attrs}
+
+    def set(self, **attrs: Any) -> None:
+        self._record.update(attrs)
+
+    def __enter__(self) -> "Span":
+        trace = self._trace
+        self._started = time.perf_counter()
+        self._record["start_ms"] = round((self._started - trace.started) * 1000, 2)
+        self._record["parent"] = _current_span.get()
+        self._index = len(trace.spans)
+        trace.spans.append(self._record)
+        self._token = _current_span.set(self._index)
+        trace.track_task()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        _current_span.reset(self._token)
+        self._record["duration_ms"] = round((time.perf_counter() - self._started) * 1000, 2)
+        if exc_type is not None:
+            self._record["error"] = exc_type.__name__
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def set(self, **attrs: Any) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+class Trace:
+    """Spans and metadata of one request."""
+
+    def __init__(self, started: float | None = None):
+        self.id = uuid.uuid4().hex[:16]
+        self.started = time.perf_counter() if started is None else started
+        self.duration: float | None = None
+        self.spans: list[dict] = []
+        self.tags: dict[str, Any] = {}
+        self.dropped = 0
+        # Tasks that opened spans (insertion-ordered; read by the profiler thread)
+        self.tasks: dict[asyncio.Task, None] = {}
+
+    def track_task(self) -> None:
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:  # no running loop (a worker thread)
+            return
+        if task is not None and task not in self.tasks:
+            self.tasks[task] = None
+
+    def elapsed_ms(self) -> float:
+        duration = self.duration if self.duration is not None else time.perf_counter() - self.started
+        return round(duration * 1000, 2)
+
+    def as_dict(self) -> dict:
+        trace = {"trace_id": self.id, **self.tags, "duration_ms": self.elapsed_ms(), "spans": list(self.spans)}
+        if self.dropped:
+            trace["spans_dropped"] = self.dropped
+        return trace
+
+
+_current_trace: contextvars.ContextVar[Trace | None] = contextvars.ContextVar("trace", default=None)
+_current_span: contextvars.ContextVar[int | None] = contextvars.ContextVar("trace_span", default=None)
+
+
+def current() -> Trace | None:
+    """The trace of the request being served, if any."""
+    return _current_trace.get()
+
+
+def span(name: str, **attrs: Any) -> Span | _NoopSpan:
+    """A context manager timing *name* within the current trace."""
+    trace = _current_trace.get()
+    if trace is None:
+        return _NOOP
+    if len(trace.spans) >= _MAX_SPANS:
+        trace.dropped += 1
+        return _NOOP
+    return Span(trace, name, attrs)
+
+
+def record(name: str, started: float, ended: float, **attrs: Any) -> None:
+    """Add a span for a stage timed before the trace was opened.
+
+    The body of a batch is parsed once, before the traces of its messages.
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        return
+    if len(trace.spans) >= _MAX_SPANS:
+        trace.dropped += 1
+        return
+    trace.spans.append({
+        "name": name,
+        "start_ms": round((started - trace.started) * 1000, 2),
+        "duration_ms": round((ended - started) * 1000, 2),
+        "parent": _current_span.get(),
+        **attrs,
+    })
+
+
+def tag(**tags: Any) -> None:
+    """Attach request-level fields (method, tool, id) to the current trace."""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.tags.update(tags)
+
+
+@contextmanager
+def start(started: float | None = None) -> Iterator[Trace]:
+    """Open a new trace for the request handled in the ``with`` block.
+
+    *started* (a ``time.perf_counter()`` value) backdates the trace to when
+    the HTTP request arrived.
+    """
+    trace = Trace(started)
+    trace.track_task()
+    trace_token, span_token = _current_trace.set(trace), _current_span.set(None)
+    try:
+        yield trace
+    finally:
+        _current_span.reset(span_token)
+        _current_trace.reset(trace_token)
+        trace.duration = time.perf_counter() - trace.started
+        trace.tasks.clear()
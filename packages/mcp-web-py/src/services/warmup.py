@@ -0,0 +1,93 @@
+"""Startup warm-up run in the background after the server binds.
+
+Spawning the extraction workers (each importing trafilatura and running a
+sample extraction), creating the DDGS clients and opening connections to
+the hosts every search needs take a couple of seconds.  Done in the
+lifespan they would delay binding the port; instead the server binds as
+soon as its cheap services exist and ``Warmup`` runs these steps
+concurrently in a background task.  Until they finish ``GET /ready``
+answers 503, so a load balancer or orchestrator can hold traffic back while
+a client that calls anyway is still served (paying the lazy-start cost).
+
+A failed step is logged and recorded but does not block readiness: every
+step only front-loads work the tools otherwise do on first use.
+``WARMUP=0`` skips the phase and reports ready immediately.
+"""
+import asyncio
+import os
+import time
+from typing import Awaitable, Callable
+
+from src.services.http_client import http_pool
+
+WARMUP = int(os.environ.get("WARMUP", 1))
+
+# Pre-connects are best effort: give up quickly on hosts that are down
+_CONNECT_TIMEOUT = 2.0
+
+
+async def preconnect(urls: list[str]) -> None:
+    """Open pooled connections to *urls* (the response is discarded)."""
+    async def connect(url: str) -> None:
+        try:
+            await http_pool.request("HEAD", url, timeout=_CONNECT_TIMEOUT)
+        except Exception as e:
+            print(f"[Warmup] Pre-connect to {url} failed: {e}", flush=True)
+
+    await asyncio.gather(*(connect(url) for url in urls))
+
+
+class Warmup:
+    """Runs named startup steps in the background and tracks readiness."""
+
+    def __init__(self, enabled: bool = bool(WARMUP)):
+        self.enabled = enabled
+        self._task: asyncio.Task | None = None
+        self._started_at: float | None = None
+        self.duration: float | None = None
+        self.steps: dict[str, float] = {}
+        self.errors: dict[str, str] = {}
+
+    @property
+    def ready(self) -> bool:
+        return not self.enabled or self.duration is not None
+
+    def start(self, steps: dict[str, Callable[[], Awaitable]]) -> None:
+        """Run every step concurrently in a background task (idempotent)."""
+        if not self.enabled or self._task is not None:
+            return
+        self._started_at = time.monotonic()
+        self._task = asyncio.create_task(self._run(steps))
+
+    async def _run(self, steps: dict[str, Callable[[], Awaitable]]) -> None:
+        await asyncio.gather(*(self._step(name, step) for name, step in steps.items()))
+        self.duration = time.monotonic() - self._started_at
+        print(f"[Warmup] Ready after {self.duration * 1000:.0f}ms", flush=True)
+
+    async def _step(self, name: str, step: Callable[[], Awaitable]) -> None:
+        start = time.monotonic()
+        try:
+            await step()
+        except Exception as e:
+            self.errors[name] = str(e)
+            print(f"[Warmup] {name} failed: {e}", flush=True)
+        self.steps[name] = round((time.monotonic() - start) * 1000, 2)
+
+    async def close(self) -> None:
+        task, self._task = self._task, None
+        if task is not None and not task.done():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "ready": self.ready,
+            "duration_ms": round(self.duration * 1000, 2) if self.duration is not None else None,
+            "steps_ms": dict(self.steps),
+            "errors": dict(self.errors),
+        }
+
+
+# Process-wide singleton started by the server lifespan
+warmup = Warmup()
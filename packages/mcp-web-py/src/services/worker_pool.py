@@ -0,0 +1,190 @@
+"""Process pool for CPU-bound extraction so the event loop stays free.
+
+Workers are started with ``forkserver`` (required for per-child task
+limits), import the extraction libraries and run a warm-up extraction in
+their initializer, and are recycled after ``EXTRACT_MAX_TASKS_PER_CHILD``
+tasks to contain lxml memory growth.  Every task runs under a timeout that
+is enforced twice: by ``SIGALRM`` inside the worker (interrupts the
+Python-level extraction loop) and by ``asyncio.wait_for`` in the caller.
+A task that outlives both is stuck where the alarm cannot reach (C code),
+so its worker would stay busy: the pool is then replaced and the old
+workers are terminated.
+
+With ``EXTRACT_WORKERS=0`` tasks run in a thread instead (handy for
+debugging and single-core deployments).
+"""
+import asyncio
+import multiprocessing
+import os
+import signal
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable
+
+from src.services import deadline
+
+# Each web worker has its own pool: split the cores between them by default
+EXTRACT_WORKERS = int(os.environ.get(
+    "EXTRACT_WORKERS", max(1, (os.cpu_count() or 1) // int(os.environ.get("WEB_WORKERS", 1)))
+))
+EXTRACT_TIMEOUT = float(os.environ.get("EXTRACT_TIMEOUT", 20))
+EXTRACT_MAX_TASKS_PER_CHILD = int(os.environ.get("EXTRACT_MAX_TASKS_PER_CHILD", 200))
+
+# Extra time the caller waits beyond the in-worker alarm before giving up
+_TIMEOUT_GRACE = 2.0
+
+
+class ExtractionTimeout(TimeoutError):
+    """An extraction task exceeded its time budget."""
+
+
+def _raise_timeout(signum, frame):
+    raise ExtractionTimeout("extraction timed out")
+
+
+def _init_worker() -> None:
+    """Worker initializer: import heavy libraries and prime them."""
+    from src.services import extraction
+
+    extraction.warm_up()
+
+
+def _run_with_alarm(timeout: float, fn: Callable, args: tuple) -> Any:
+    """Run ``fn(*args)`` in the worker, interrupted by SIGALRM after *timeout*."""
+    previous = signal.signal(signal.SIGALRM, _raise_timeout)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return fn(*args)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def _noop() -> int:
+    return os.getpid()
+
+
+def _terminate_workers(executor: ProcessPoolExecutor) -> None:
+    terminate = getattr(executor, "terminate_workers", None)  # Python 3.14+
+    if terminate is not None:
+        terminate()
+        return
+    processes = list((executor._processes or {}).values())
+    executor.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        if process.is_alive():
+            process.terminate()
+
+
+class WorkerPool:
+    """Lazily-created ``ProcessPoolExecutor`` with timeouts and recycling."""
+
+    def __init__(
+        self,
+        workers: int = EXTRACT_WORKERS,
+        timeout: float = EXTRACT_TIMEOUT,
+        max_tasks_per_child: int = EXTRACT_MAX_TASKS_PER_CHILD,
+    ):
+        self.workers = workers
+        self.timeout = timeout
+        self.max_tasks_per_child = max_tasks_per_child
+        self._executor: ProcessPoolExecutor | None = None
+        self.tasks = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.restarts = 0
+        self.in_flight = 0
+
+    def _ensure_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("forkserver"),
+                initializer=_init_worker,
+                max_tasks_per_child=self.max_tasks_per_child or None,
+            )
+        return self._executor
+
+    async def start(self) -> None:
+        """Spawn and prewarm every worker before serving traffic."""
+        if self.workers <= 0:
+            await asyncio.to_thread(_init_worker)
+            return
+        loop = asyncio.get_running_loop()
+        executor = self._ensure_executor()
+        pids = await asyncio.gather(
+            *(loop.run_in_executor(executor, _noop) for _ in range(self.workers))
+        )
+        print(f"[WorkerPool] {len(set(pids))} extraction worker(s) ready", flush=True)
+
+    async def close(self) -> None:
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            await asyncio.to_thread(executor.shutdown, wait=True, cancel_futures=True)
+
+    async def run(self, fn: Callable, *args, timeout: float | None = None) -> Any:
+        """Run ``fn(*args)`` off the event loop under a timeout.
+
+        *fn* must be a picklable module-level function.  The timeout is
+        shortened to the request deadline, if any.  Raises
+        ``ExtractionTimeout`` if the budget is exceeded.
+        """
+        timeout = deadline.clamp(timeout if timeout is not None else self.timeout)
+        self.tasks += 1
+        self.in_flight += 1
+        try:
+            if self.workers <= 0:
+                return await asyncio.wait_for(asyncio.to_thread(fn, *args), timeout)
+            return await self._run_in_process(fn, args, timeout)
+        except (ExtractionTimeout, asyncio.TimeoutError) as e:
+            self.timeouts += 1
+            raise ExtractionTimeout(f"extraction exceeded {timeout:.1f}s") from e
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            self.in_flight -= 1
+
+    async def _run_in_process(self, fn: Callable, args: tuple, timeout: float) -> Any:
+        loop = asyncio.get_running_loop()
+        for attempt in range(2):
+            executor = self._ensure_executor()
+            try:
+                return await asyncio.wait_for(
+                    loop.run_in_executor(executor, _run_with_alarm, timeout, fn, args),
+                    timeout + _TIMEOUT_GRACE,
+                )
+            except asyncio.TimeoutError:
+                # The alarm did not interrupt the task: free its worker, other
+                # tasks of the old pool retry on the new one
+                print("[WorkerPool] Task stuck past its timeout, restarting the pool", flush=True)
+                self.restarts += 1
+                if self._executor is executor:
+                    self._executor = None
+                    await asyncio.to_thread(_terminate_workers, executor)
+                raise
+            except BrokenProcessPool:
+                # A worker died (OOM, segfault in a C extension): rebuild once
+                print("[WorkerPool] Process pool broken, restarting", flush=True)
+                self.restarts += 1
+                if self._executor is executor:
+                    self._executor = None
+                    executor.shutdown(wait=False, cancel_futures=True)
+                if attempt:
+                    raise
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "timeout": self.timeout,
+            "max_tasks_per_child": self.max_tasks_per_child,
+            "tasks": self.tasks,
+            "in_flight": self.in_flight,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+            "restarts": self.restarts,
+        }
+
+
+# Process-wide singleton used by fetch_tool
+extraction_pool = WorkerPool()
@@ -1,10 +1,80 @@
-"""Web Fetch Tool using curl_cffi + trafilatura/readability"""
-from typing import Literal
-from pydantic import BaseModel, Field, HttpUrl
-import trafilatura
-from readability import Document
-import html2text
-from curl_cffi.requests import AsyncSession, RequestsError
+"""Web Fetch Tool using curl_cffi + trafilatura/readability (pypdf for PDFs)"""
+import functools
+import json
+import os
+import time
+from typing import Literal, Optional
+from urllib.parse import urlsplit
+from pydantic import BaseModel, Field, HttpUrl, ValidationError
+from curl_cffi.requests import RequestsError
+
+from src.services import deadline, extraction, metrics, tracing
+from src.services.extraction_cache import extraction_cache, content_key
+from src.services.passages import select_passages
+from src.services.http_cache import http_cache
+from src.services.prefetch import prefetcher, in_prefetch
+from src.services.worker_pool import extraction_pool, ExtractionTimeout
+
+
+# Download ceilings: HTML carries far more bytes than the text extracted from
+# it; PDFs need their trailer, so they may use the whole hard cap
+FETCH_MAX_BYTES = int(os.environ.get("FETCH_MAX_BYTES", 10 * 1024 * 1024))
+FETCH_MIN_BYTES = int(os.environ.get("FETCH_MIN_BYTES", 2 * 1024 * 1024))
+_HTML_BYTES_PER_CHAR = 50
+_TEXT_BYTES_PER_CHAR = 4  # worst-case UTF-8
+
+_TEXT_TYPES = {"text/plain", "text/markdown", "text/x-markdown", "text/csv", "application/json"}
+_PDF_TYPES = {"application/pdf", "application/x-pdf"}
+_BINARY_TYPE_PREFIXES = ("image/", "audio/", "video/", "font/", "model/")
+_BINARY_TYPES = {
+    "application/octet-stream", "application/zip", "application/gzip",
+    "application/x-gzip", "application/x-tar", "application/x-7z-compressed",
+    "application/x-rar-compressed", "application/wasm", "application/msword",
+    "application/vnd.ms-excel", "application/x-msdownload",
+}
+_BINARY_MAGIC = (
+    b"\x89PNG", b"\xff\xd8\xff", b"GIF8", b"PK\x03\x04", b"\x1f\x8b",
+    b"RIFF", b"\x7fELF", b"MZ", b"OggS", b"ID3", b"\x00\x00\x01\x00", b"wOFF", b"wOF2",
+)
+
+
+class UnsupportedContent(Exception):
+    """The URL points at content fetch can't turn into text."""
+
+
+def _media_type(headers: dict) -> str:
+    for key, value in headers.items():
+        if key.lower() == "content-type":
+            return value.split(";")[0].strip().lower()
+    return ""
+
+
+def classify_content(media_type: str, head: bytes) -> Literal["html", "text", "pdf", "binary"]:
+    """Classify a response from its Content-Type and first body bytes."""
+    if media_type in _PDF_TYPES or head.startswith(b"%PDF-"):
+        return "pdf"
+    if media_type in _TEXT_TYPES or media_type.endswith("+json"):
+        return "text"
+    if media_type in _BINARY_TYPES or media_type.startswith(_BINARY_TYPE_PREFIXES):
+        # Servers often mislabel; trust markup if the body clearly is HTML
+        if media_type == "application/octet-stream" and head.lstrip()[:1] == b"<":
+            return "html"
+        return "binary"
+    if head.startswith(_BINARY_MAGIC) or b"\x00" in head[:1024]:
+        return "binary"
+    return "html"
+
+
+# Characters of extracted text a query-focused fetch ranks passages over
+_QUERY_SCAN_CHARS = 200_000
+
+
+def _byte_limit(max_length: int) -> int:
+    return min(FETCH_MAX_BYTES, max(FETCH_MIN_BYTES, max_length * _HTML_BYTES_PER_CHAR))
+
+
+def _url_filename(url: str) -> str | None:
+    return urlsplit(url).path.rsplit("/", 1)[-1] or None
 
 
 class FetchInput(BaseModel):
@@ -12,6 +82,8 @@ class FetchInput(BaseModel):
     url: HttpUrl = Field(..., description="URL to fetch")
     format: Literal["markdown", "html", "text"] = Field("markdown", description="Output format")
     max_length: int = Field(50000, le=100000, description="Maximum content length in characters")
+    query: Optional[str] = Field(None, description="Return only the passages most relevant to this query")
+    offset: int = Field(0, ge=0, description="Character offset into the extracted content to start from")
 
 
 async def fetch_tool(input: FetchInput) -> dict:
@@ -19,31 +91,70 @@ async def fetch_tool(input: FetchInput) -> dict:
     Fetch and extract clean content from web pages.
 
     Uses curl_cffi with Chrome TLS impersonation to avoid bot detection.
-    trafilatura (F1: 0.958) as primary extraction, readability-lxml as fallback.
+    trafilatura (F1: 0.958) as primary extraction, readability-lxml as fallback;
+    PDFs are extracted page by page with pypdf. Extraction runs in the
+    extraction process pool. With ``query`` only the best-matching passages
+    are returned, with their offsets into the full extracted text. A page
+    prefetched after a search is served from the prefetch (``cache`` is
+    ``"prefetch"``).
     """
     try:
-        print(f"[Fetch] URL: {input.url}, Format: {input.format}", flush=True)
+        prefetching = in_prefetch()
+        print(f"[Fetch] URL: {input.url}, Format: {input.format}{' (prefetch)' if prefetching else ''}", flush=True)
+
+        kind = "html"
+        # Extracted characters needed to serve this request
+        wanted = _QUERY_SCAN_CHARS if input.query else input.offset + input.max_length
 
-        # Fetch HTML using curl_cffi with browser impersonation
-        async with AsyncSession() as session:
+        def inspect(resp, head: bytes) -> int | None:
+            """Reject binary bodies before downloading them; pick a byte cap per kind."""
+            nonlocal kind
+            if not 200 <= resp.status_code < 300:
+                return _byte_limit(wanted)
+            media_type = _media_type(dict(resp.headers))
+            kind = classify_content(media_type, head)
+            if kind == "binary":
+                raise UnsupportedContent(f"Unsupported content type: {media_type or 'binary data'}")
+            if kind == "text":
+                return wanted * _TEXT_BYTES_PER_CHAR
+            if kind == "pdf":
+                return None  # up to FETCH_MAX_BYTES
+            return _byte_limit(wanted)
+
+        # Stream through the HTTP cache / shared curl_cffi pool with browser impersonation
+        with tracing.span("download") as download_span:
+            download_start = time.perf_counter()
+            if not prefetching:
+                # Reuse a prefetch of this URL that is queued or in flight
+                await prefetcher.join(str(input.url))
             try:
-                response = await session.get(
+                response = await http_cache.request(
+                    "GET",
                     str(input.url),
                     impersonate="chrome",
-                    timeout=15,
+                    timeout=deadline.clamp(15),
+                    max_bytes=FETCH_MAX_BYTES,
+                    inspect=inspect,
+                    prefetch=prefetching,
                 )
             except RequestsError as e:
                 err_str = str(e).lower()
                 if "ssl" in err_str or "certificate" in err_str or "tls" in err_str:
                     print(f"[Fetch] SSL error, retrying without verification: {e}", flush=True)
-                    response = await session.get(
+                    response = await http_cache.request(
+                        "GET",
                         str(input.url),
                         impersonate="chrome",
-                        timeout=15,
+                        timeout=deadline.clamp(15),
                         verify=False,
+                        max_bytes=FETCH_MAX_BYTES,
+                        inspect=inspect,
+                        prefetch=prefetching,
                     )
                 else:
                     raise
+            download_span.set(status=response.status_code, cache=response.cache, bytes=len(response.content))
+        download_ms = round((time.perf_counter() - download_start) * 1000, 2)
 
         # Check for HTTP errors
         if response.status_code >= 400:
@@ -62,57 +173,102 @@ async def fetch_tool(input: FetchInput) -> dict:
                 "message": f"The server returned an error. Status: {response.status_code} {error_message}"
             }
 
-        html = response.text
-
-        # Try trafilatura first (best quality)
-        content = trafilatura.extract(
-            html,
-            include_comments=False,
-            include_tables=True,
-            no_fallback=False
-        )
-
-        if content:
-            metadata = trafilatura.extract_metadata(html)
-            title = metadata.title if metadata and metadata.title else "Untitled"
-            author = metadata.author if metadata and metadata.author else None
-
-            if input.format == "markdown":
-                h = html2text.HTML2Text()
-                h.ignore_links = False
-                h.body_width = 0
-                html_content = trafilatura.extract(html, include_comments=False, include_tables=True, output_format="xml")
-                if html_content:
-                    content = h.handle(html_content)
-                else:
-                    content = h.handle(content)
-            elif input.format == "text":
-                content = trafilatura.extract(html, no_fallback=False, output_format="txt")
-
-            print(f"[Fetch] Extracted {len(content)} chars using trafilatura", flush=True)
+        metrics.cache_requests.labels("http", response.cache).inc()
+        if response.from_cache:
+            print(f"[Fetch] Served from cache ({response.cache})", flush=True)
+            if not prefetching:
+                prefetcher.record_use(str(input.url))
+        if response.truncated:
+            print(f"[Fetch] Download stopped at {len(response.content)} bytes", flush=True)
 
-        else:
-            # Fallback to readability
-            print("[Fetch] Trafilatura failed, falling back to readability", flush=True)
-            doc = Document(html)
-            title = doc.title()
-            content_html = doc.summary()
+        extra = {}
+        if kind == "text":
+            # Plain text / markdown / JSON: nothing to extract
+            title = _url_filename(response.url) or "Untitled"
             author = None
+            content = response.text
+            if _media_type(response.headers).endswith("json") and not response.truncated:
+                try:
+                    content = json.dumps(json.loads(content), indent=2, ensure_ascii=False)
+                except ValueError:
+                    pass
+            timings = {"download": download_ms}
+            print(f"[Fetch] Returned {len(content)} chars of {_media_type(response.headers) or 'text'} as-is", flush=True)
+        elif kind == "pdf":
+            try:
+                with tracing.span("extraction", method="pypdf"):
+                    extracted = await extraction_pool.run(extraction.extract_pdf, response.content, wanted)
+            except ExtractionTimeout:
+                raise
+            except Exception as e:
+                if response.truncated:
+                    raise UnsupportedContent(f"PDF larger than {FETCH_MAX_BYTES} bytes could not be read") from e
+                raise
+            title = extracted["title"] or _url_filename(response.url) or "Untitled"
+            author = extracted["author"]
+            content = extracted["content"]
+            timings = {"download": download_ms, **extracted["timings"]}
+            extra = {"pages": extracted["pages"], "pages_total": extracted["pages_total"]}
+            print(f"[Fetch] Extracted {len(content)} chars from {extracted['pages']}/{extracted['pages_total']} PDF pages (timings ms: {timings})", flush=True)
+        else:
+            html = response.text
+
+            # CPU-bound extraction runs in the worker pool, off the event loop;
+            # results are cached by the hash of the HTML, and a format the
+            # cached result lacks is rendered from it on first request
+            key = content_key(response.content)
+            render_ms = None
+            with tracing.span("extraction") as extraction_span:
+                extracted, cache_status = await extraction_cache.get_or_extract(
+                    key,
+                    lambda: extraction_pool.run(functools.partial(extraction.extract_all, formats=(input.format,)), html),
+                )
+                extraction_span.set(cache=cache_status, method=extracted["method"])
+                if input.format not in extracted["formats"]:
+                    start = time.perf_counter()
+                    await extraction_cache.get_format(
+                        key, extracted, input.format,
+                        lambda: extraction_pool.run(extraction.render, extracted["source"], input.format),
+                    )
+                    render_ms = round((time.perf_counter() - start) * 1000, 2)
+                    extraction_span.set(rendered=input.format)
+            title = extracted["title"]
+            author = extracted["author"]
+            content = extracted["formats"][input.format]
+            if cache_status == "miss":
+                timings = {"download": download_ms, **extracted["timings"]}
+                print(f"[Fetch] Extracted {len(content)} chars using {extracted['method']} (timings ms: {timings})", flush=True)
+            else:
+                timings = {"download": download_ms}
+                print(f"[Fetch] Extraction cache {cache_status}: {len(content)} chars", flush=True)
+            if render_ms is not None:
+                timings["convert"] = render_ms
+            extra["extraction_cache"] = cache_status
+            metrics.cache_requests.labels("extraction", cache_status).inc()
+            if cache_status == "miss":
+                metrics.extraction_methods.labels(extracted["method"]).inc()
+            if extracted.get("limits"):
+                extra["extraction_limits"] = extracted["limits"]
+                print(f"[Fetch] Extraction limits hit: {', '.join(extracted['limits'])}", flush=True)
 
-            if input.format == "markdown":
-                h = html2text.HTML2Text()
-                h.ignore_links = False
-                h.body_width = 0
-                content = h.handle(content_html)
-            elif input.format == "text":
-                h = html2text.HTML2Text()
-                h.ignore_links = True
-                h.ignore_images = True
-                content = h.handle(content_html)
-            else:  # html
-                content = content_html
-
-            print(f"[Fetch] Extracted {len(content)} chars using readability", flush=True)
+        for stage, ms in timings.items():
+            metrics.fetch_stage_seconds.labels(kind, stage).observe(ms / 1000)
+
+        total_length = len(content)
+        if input.offset:
+            content = content[input.offset:]
+        if input.query:
+            with tracing.span("passages"):
+                selected, passages = select_passages(content, input.query, input.max_length)
+            extra["passages"] = [
+                {"start": p.start + input.offset, "end": p.end + input.offset, "score": p.score}
+                for p in passages
+            ]
+            if passages:
+                content = selected
+                print(f"[Fetch] Selected {len(passages)} passage(s) for query ({len(content)} chars)", flush=True)
+            else:
+                print("[Fetch] No passage matched the query, returning leading content", flush=True)
 
         # Truncate if needed
         if len(content) > input.max_length:
@@ -126,9 +282,38 @@ async def fetch_tool(input: FetchInput) -> dict:
             "excerpt": content[:200] + "..." if len(content) > 200 else content,
             "author": author,
             "length": len(content),
-            "format": input.format
+            "total_length": total_length,
+            "format": input.format,
+            "cache": response.cache,
+            "truncated_download": response.truncated,
+            "timings": timings,
+            **extra
         }
 
+    except UnsupportedContent as e:
+        error_msg = str(e)
+        print(f"[Fetch] Error: {error_msg}", flush=True)
+        return {
+            "error": error_msg,
+            "url": str(input.url),
+            "message": "The URL does not point to a web page or text document."
+        }
+    except ExtractionTimeout as e:
+        error_msg = str(e)
+        print(f"[Fetch] Error: {error_msg}", flush=True)
+        return {
+            "error": error_msg,
+            "url": str(input.url),
+            "message": "Content extraction took too long. The page may be too large or complex."
+        }
+    except deadline.DeadlineExceeded as e:
+        error_msg = str(e)
+        print(f"[Fetch] Error: {error_msg}", flush=True)
+        return {
+            "error": error_msg,
+            "url": str(input.url),
+            "message": "The request deadline was reached before the page could be read."
+        }
     except RequestsError as e:
         error_msg = f"HTTP request failed: {str(e)}"
         print(f"[Fetch] Error: {error_msg}", flush=True)
@@ -145,3 +330,22 @@ async def fetch_tool(input: FetchInput) -> dict:
             "url": str(input.url),
             "message": "Content extraction failed. The page format may not be supported."
         }
+
+
+def schedule_prefetch(results: list[dict]) -> int:
+    """Queue the top search *results* for a speculative ``fetch``.
+
+    URLs are normalized the way ``FetchInput`` does, so the follow-up fetch
+    finds them; returns how many were queued.
+    """
+    urls = []
+    for result in results:
+        try:
+            urls.append(str(FetchInput(url=result.get("url", "")).url))
+        except ValidationError:
+            urls.append("")  # keeps the remaining results at their rank
+    return prefetcher.schedule(urls, _prefetch)
+
+
+async def _prefetch(url: str) -> dict:
+    return await fetch_tool(FetchInput(url=url))
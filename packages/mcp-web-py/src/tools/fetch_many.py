@@ -0,0 +1,100 @@
+"""Batch Fetch Tool: several fetches in one call with bounded concurrency"""
+import asyncio
+import os
+import time
+from typing import Literal, Optional
+from urllib.parse import urlsplit
+from pydantic import BaseModel, Field, HttpUrl
+
+from src.services import deadline
+from src.tools.fetch import fetch_tool, FetchInput
+
+FETCH_MANY_MAX_URLS = int(os.environ.get("FETCH_MANY_MAX_URLS", 20))
+FETCH_MANY_CONCURRENCY = int(os.environ.get("FETCH_MANY_CONCURRENCY", 8))
+FETCH_MANY_PER_HOST = int(os.environ.get("FETCH_MANY_PER_HOST", 2))
+FETCH_MANY_DEADLINE = float(os.environ.get("FETCH_MANY_DEADLINE", 30))
+
+# Time kept back from a request deadline for assembling the response
+_DEADLINE_MARGIN = 0.1
+
+
+class FetchManyInput(BaseModel):
+    """Input schema for batch web fetch"""
+    urls: list[HttpUrl] = Field(..., min_length=1, max_length=FETCH_MANY_MAX_URLS, description="URLs to fetch")
+    format: Literal["markdown", "html", "text"] = Field("markdown", description="Output format")
+    max_length: int = Field(50000, le=100000, description="Maximum content length per URL in characters")
+    query: Optional[str] = Field(None, description="Return only the passages of each page most relevant to this query")
+    deadline: float = Field(FETCH_MANY_DEADLINE, gt=0, le=120, description="Overall time budget in seconds")
+
+
+async def fetch_many_tool(input: FetchManyInput) -> dict:
+    """
+    Fetch several web pages concurrently.
+
+    At most ``FETCH_MANY_CONCURRENCY`` fetches run at once, and at most
+    ``FETCH_MANY_PER_HOST`` against the same host. Fetches still running at
+    the deadline (or the request deadline, if that is sooner) are cancelled
+    and reported as errors; results are returned in input order either way.
+    """
+    start = time.perf_counter()
+    urls = [str(url) for url in input.urls]
+    budget = deadline.clamp(input.deadline, reserve=_DEADLINE_MARGIN)
+    print(f"[FetchMany] {len(urls)} URL(s), deadline {budget:.2f}s", flush=True)
+
+    limit = asyncio.Semaphore(FETCH_MANY_CONCURRENCY)
+    host_limits: dict[str, asyncio.Semaphore] = {}
+
+    async def fetch_one(url: str) -> dict:
+        host = urlsplit(url).hostname or ""
+        host_limit = host_limits.setdefault(host, asyncio.Semaphore(FETCH_MANY_PER_HOST))
+        async with host_limit, limit:
+            began = time.perf_counter()
+            result = await fetch_tool(FetchInput(
+                url=url, format=input.format, max_length=input.max_length, query=input.query
+            ))
+        result["elapsed_ms"] = round((time.perf_counter() - began) * 1000, 2)
+        return result
+
+    # Duplicate URLs in one batch share a single fetch
+    tasks: dict[str, asyncio.Task] = {}
+    for url in urls:
+        if url not in tasks:
+            tasks[url] = asyncio.create_task(fetch_one(url))
+
+    done, pending = await asyncio.wait(tasks.values(), timeout=budget)
+    for task in pending:
+        task.cancel()
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
+        print(f"[FetchMany] Deadline reached, cancelled {len(pending)} fetch(es)", flush=True)
+
+    results = []
+    for url in urls:
+        task = tasks[url]
+        if task in pending:
+            result = {
+                "error": f"Deadline of {budget:.2f}s exceeded",
+                "url": url,
+                "message": "The page did not finish loading within the batch deadline."
+            }
+        elif task.exception() is not None:
+            # fetch_tool reports its own errors; this only catches the unexpected
+            result = {
+                "error": str(task.exception()),
+                "url": url,
+                "message": f"Failed to fetch content: {str(task.exception())}"
+            }
+        else:
+            result = dict(task.result())
+        results.append(result)
+
+    failed = sum(1 for r in results if "error" in r)
+    elapsed_ms = round((time.perf_counter() - start) * 1000, 2)
+    print(f"[FetchMany] {len(results) - failed}/{len(results)} succeeded in {elapsed_ms}ms", flush=True)
+    return {
+        "results": results,
+        "count": len(results),
+        "succeeded": len(results) - failed,
+        "failed": failed,
+        "elapsed_ms": elapsed_ms,
+    }
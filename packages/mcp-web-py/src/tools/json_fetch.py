@@ -1,9 +1,19 @@
 """JSON Fetch Tool using curl_cffi"""
+import asyncio
+import os
 from typing import Literal, Optional
 from pydantic import BaseModel, Field, HttpUrl
-from curl_cffi.requests import AsyncSession, RequestsError
+from curl_cffi.requests import RequestsError
+import ijson
 import time
 
+from src.services import deadline, tracing
+from src.services.http_cache import http_cache
+from src.services.json_path import JsonPath, JsonPathError
+
+# Download cap per response; a path can still be answered from a capped prefix
+JSON_FETCH_MAX_BYTES = int(os.environ.get("JSON_FETCH_MAX_BYTES", 5 * 1024 * 1024))
+
 
 class JsonFetchInput(BaseModel):
     """Input schema for JSON fetch"""
@@ -11,6 +21,9 @@ class JsonFetchInput(BaseModel):
     method: Literal["GET", "POST", "PUT", "DELETE"] = Field("GET", description="HTTP method")
     headers: Optional[dict[str, str]] = Field(None, description="Custom headers (e.g., Authorization)")
     body: Optional[str] = Field(None, description="Request body as JSON string")
+    path: Optional[str] = Field(None, description="JSONPath-style projection, e.g. $.data.items[0:5].name")
+    max_bytes: int = Field(JSON_FETCH_MAX_BYTES, ge=1, le=JSON_FETCH_MAX_BYTES, description="Maximum response bytes to download")
+    include_headers: bool = Field(False, description="Include response headers in the result")
 
 
 async def json_fetch_tool(input: JsonFetchInput) -> dict:
@@ -19,11 +32,22 @@ async def json_fetch_tool(input: JsonFetchInput) -> dict:
 
     Uses curl_cffi with Chrome TLS impersonation.
     Supports all HTTP methods, custom headers for authentication,
-    and handles non-JSON responses gracefully.
+    and handles non-JSON responses gracefully. With ``path`` only the
+    selected values are decoded: the body is parsed incrementally and
+    parsing stops once nothing further can match.
     """
     try:
         print(f"[JSONFetch] {input.method} {input.url}", flush=True)
 
+        try:
+            path = JsonPath(input.path) if input.path else None
+        except JsonPathError as e:
+            return {
+                "error": f"Invalid path: {e}",
+                "url": str(input.url),
+                "message": "Use a path like $.data.items[0:5].name (no '..', filters or negative indexes)."
+            }
+
         start_time = time.time()
 
         # Prepare headers
@@ -34,19 +58,23 @@ async def json_fetch_tool(input: JsonFetchInput) -> dict:
         if input.headers:
             headers.update(input.headers)
 
-        async with AsyncSession() as session:
-            response = await session.request(
-                method=input.method,
-                url=str(input.url),
+        # Only GET without a body or credentials is ever served from the cache
+        timeout = deadline.clamp(10)
+        with tracing.span("download") as download_span:
+            response = await http_cache.request(
+                input.method,
+                str(input.url),
                 headers=headers,
                 data=input.body if input.body else None,
                 impersonate="chrome",
-                timeout=10,
+                timeout=timeout,
+                max_bytes=input.max_bytes,
             )
+            download_span.set(status=response.status_code, cache=response.cache, bytes=len(response.content))
 
         response_time = (time.time() - start_time) * 1000
 
-        print(f"[JSONFetch] Status: {response.status_code}, Time: {response_time:.2f}ms", flush=True)
+        print(f"[JSONFetch] Status: {response.status_code}, Time: {response_time:.2f}ms, Cache: {response.cache}", flush=True)
 
         # Check for HTTP errors
         if response.status_code >= 400:
@@ -66,25 +94,51 @@ async def json_fetch_tool(input: JsonFetchInput) -> dict:
                 "response_time": round(response_time, 2)
             }
 
+        if path is None and response.truncated:
+            return _too_large(input)
+
         # Try to parse as JSON
+        parse_start = time.perf_counter()
+        extra = {}
         try:
-            data = response.json()
-        except (ValueError, TypeError):
+            if path is not None:
+                # Parsing a large body is CPU work: keep it off the event loop
+                matches, parsed_all = await asyncio.wait_for(
+                    asyncio.to_thread(path.select, response.content), deadline.clamp(None)
+                )
+                data = (matches[0] if matches else None) if path.single else matches
+                extra = {"path": input.path, "matched": len(matches)}
+                if not parsed_all:
+                    print(f"[JSONFetch] Path complete after partial parse of {len(response.content)} bytes", flush=True)
+            else:
+                data = response.json()
+        except ijson.IncompleteJSONError:
+            if response.truncated:
+                return _too_large(input)
+            data = {"_raw": response.text, "_note": "Response was not valid JSON"}
+        except (ValueError, TypeError, ijson.JSONError):
             data = {"_raw": response.text, "_note": "Response was not valid JSON"}
+        parse_ms = round((time.perf_counter() - parse_start) * 1000, 2)
 
-        return {
+        result = {
             "url": str(input.url),
             "status_code": response.status_code,
             "status_text": response.reason if hasattr(response, 'reason') else "OK",
-            "headers": dict(response.headers),
             "data": data,
-            "response_time": round(response_time, 2)
+            **extra,
+            "size": len(response.content),
+            "response_time": round(response_time, 2),
+            "parse_ms": parse_ms,
+            "cache": response.cache
         }
+        if input.include_headers:
+            result["headers"] = dict(response.headers)
+        return result
 
     except RequestsError as e:
         err_str = str(e).lower()
         if "timeout" in err_str:
-            error_msg = "Request timed out after 10 seconds"
+            error_msg = f"Request timed out after {timeout:g} seconds"
             message = "The API request timed out. The server may be slow or unreachable."
         else:
             error_msg = f"HTTP request failed: {str(e)}"
@@ -95,6 +149,14 @@ async def json_fetch_tool(input: JsonFetchInput) -> dict:
             "url": str(input.url),
             "message": message
         }
+    except (deadline.DeadlineExceeded, asyncio.TimeoutError):
+        error_msg = "Request deadline exceeded"
+        print(f"[JSONFetch] Error: {error_msg}", flush=True)
+        return {
+            "error": error_msg,
+            "url": str(input.url),
+            "message": "The request deadline was reached before the response was processed."
+        }
     except Exception as e:
         error_msg = str(e)
         print(f"[JSONFetch] Error: {error_msg}", flush=True)
@@ -103,3 +165,12 @@ async def json_fetch_tool(input: JsonFetchInput) -> dict:
             "url": str(input.url),
             "message": "An unexpected error occurred while fetching JSON data."
         }
+
+
+def _too_large(input: JsonFetchInput) -> dict:
+    print(f"[JSONFetch] Response exceeds {input.max_bytes} bytes", flush=True)
+    return {
+        "error": f"Response exceeds {input.max_bytes} bytes",
+        "url": str(input.url),
+        "message": "The response is too large to return in full. Use `path` to select the part you need."
+    }
@@ -1,13 +1,32 @@
 """Web Search Tool — SearXNG (primary) + DDGS (fallback)"""
 import asyncio
 import os
+import time
 from pydantic import BaseModel, Field
 from typing import Literal
-from curl_cffi.requests import AsyncSession, RequestsError
-from ddgs import DDGS
+
+from src.services import deadline, metrics, tracing
+from src.services.http_client import http_pool
+from src.services.ddgs_pool import ddgs_pool
+from src.services.search_cache import search_cache, normalize_query
+from src.services.circuit_breaker import CircuitBreaker
 
 SEARXNG_URL = os.environ.get("SEARXNG_URL", "http://localhost:8888")
 SEARXNG_KEY = os.environ.get("SEARXNG_KEY", "")
+# Auto mode: start a DDGS request if SearXNG hasn't answered after this many seconds
+SEARCH_HEDGE_DELAY = float(os.environ.get("SEARCH_HEDGE_DELAY", 2.0))
+# Under a request deadline, SearXNG alone may use at most this share of what is left
+_HEDGE_BUDGET_SHARE = 0.4
+# Once SearXNG's latency is known, hedge after this multiple of its average
+# (never later than SEARCH_HEDGE_DELAY, never sooner than _HEDGE_MIN_DELAY)
+_HEDGE_LATENCY_FACTOR = 3.0
+_HEDGE_MIN_DELAY = 0.25
+
+searxng_breaker = CircuitBreaker(
+    "searxng",
+    failure_threshold=int(os.environ.get("SEARXNG_BREAKER_FAILURES", 3)),
+    recovery_time=float(os.environ.get("SEARXNG_BREAKER_RECOVERY", 30)),
+)
 
 
 class SearchInput(BaseModel):
@@ -29,15 +48,14 @@ async def _search_searxng(query: str, max_results: int, region: str) -> list[dic
     headers = {}
     if SEARXNG_KEY:
         headers["Authorization"] = f"Bearer {SEARXNG_KEY}"
-    async with AsyncSession() as session:
-        response = await session.get(
-            f"{SEARXNG_URL}/search",
-            params=params,
-            headers=headers,
-            timeout=10,
-        )
-        response.raise_for_status()
-        data = response.json()
+    response = await http_pool.get(
+        f"{SEARXNG_URL}/search",
+        params=params,
+        headers=headers,
+        timeout=deadline.clamp(10),
+    )
+    response.raise_for_status()
+    data = response.json()
 
     results = []
     for r in data.get("results", [])[:max_results]:
@@ -50,18 +68,45 @@ async def _search_searxng(query: str, max_results: int, region: str) -> list[dic
     return results
 
 
+async def _search_searxng_tracked(query: str, max_results: int, region: str,
+                                  lost_hedge: asyncio.Event | None = None) -> list[dict]:
+    """_search_searxng that reports its outcome to the circuit breaker.
+
+    Errors count as failures, and so does being cancelled after *lost_hedge*
+    is set: DDGS answered first, SearXNG was slow.  Any other cancellation
+    (client gone, deadline spent, cache refresh dropped) says nothing about
+    SearXNG and is not recorded.
+    """
+    start = time.monotonic()
+    try:
+        with tracing.span("searxng"):
+            results = await _search_searxng(query, max_results, region)
+    except asyncio.CancelledError:
+        if lost_hedge is not None and lost_hedge.is_set():
+            searxng_breaker.record_failure()
+        else:
+            searxng_breaker.record_abandoned()
+        raise
+    except Exception:
+        searxng_breaker.record_failure()
+        metrics.search_upstream_errors.labels("searxng").inc()
+        raise
+    elapsed = time.monotonic() - start
+    searxng_breaker.record_success(elapsed)
+    metrics.search_upstream_seconds.labels("searxng").observe(elapsed)
+    return results
+
+
 async def _search_ddgs(query: str, max_results: int, region: str) -> list[dict]:
-    """Search using DDGS (DuckDuckGo) — runs sync call in thread."""
-    def _run():
-        return list(DDGS().text(
-            query=query,
-            region=region,
-            safesearch="off",
-            max_results=max_results,
-            backend="auto",
-        ))
-
-    raw = await asyncio.to_thread(_run)
+    """Search using DDGS (DuckDuckGo) on a pooled, long-lived client."""
+    start = time.monotonic()
+    try:
+        with tracing.span("ddgs"):
+            raw = await ddgs_pool.text(query, region, max_results)
+    except Exception:
+        metrics.search_upstream_errors.labels("ddgs").inc()
+        raise
+    metrics.search_upstream_seconds.labels("ddgs").observe(time.monotonic() - start)
     results = []
     for r in raw:
         results.append({
@@ -73,41 +118,111 @@ async def _search_ddgs(query: str, max_results: int, region: str) -> list[dict]:
     return results
 
 
-async def search_tool(input: SearchInput) -> dict:
-    """
-    Search the web using SearXNG (primary) with DDGS as fallback.
+async def _search(query: str, max_results: int, region: str, source: str) -> tuple[list[dict], str]:
+    """Run one upstream search for *source*; returns (results, source_used)."""
+    if source == "searxng":
+        # An explicit choice has no fallback, but an open breaker still spares SearXNG
+        if not searxng_breaker.allow():
+            raise RuntimeError("SearXNG is unavailable (circuit open); retry later or use source=ddgs")
+        print(f"[Search] SearXNG query: {query}", flush=True)
+        return await _search_searxng_tracked(query, max_results, region), "searxng"
 
-    In 'auto' mode, tries SearXNG first. If it fails, falls back to DDGS.
-    """
-    source_used = input.source
-    results = []
+    if source == "ddgs":
+        print(f"[Search] DDGS query: {query}", flush=True)
+        return await _search_ddgs(query, max_results, region), "ddgs"
 
-    try:
-        if input.source == "searxng":
-            print(f"[Search] SearXNG query: {input.query}", flush=True)
-            results = await _search_searxng(input.query, input.max_results, input.region)
-            source_used = "searxng"
+    return await _search_auto(query, max_results, region)
 
-        elif input.source == "ddgs":
-            print(f"[Search] DDGS query: {input.query}", flush=True)
-            results = await _search_ddgs(input.query, input.max_results, input.region)
-            source_used = "ddgs"
 
-        else:  # auto
+def _hedge_delay() -> float:
+    """Seconds to give SearXNG alone before racing DDGS against it."""
+    delay = SEARCH_HEDGE_DELAY
+    if searxng_breaker.latency_ewma is not None:
+        delay = min(delay, max(searxng_breaker.latency_ewma * _HEDGE_LATENCY_FACTOR, _HEDGE_MIN_DELAY))
+    left = deadline.remaining()
+    if left is not None:
+        delay = min(delay, max(left, 0) * _HEDGE_BUDGET_SHARE)
+    return delay
+
+
+async def _search_auto(query: str, max_results: int, region: str) -> tuple[list[dict], str]:
+    """SearXNG first, hedged with DDGS after ``_hedge_delay()``.
+
+    Skips SearXNG entirely while its circuit breaker is open.  The hedge
+    starts after a few times SearXNG's average latency, capped at
+    SEARCH_HEDGE_DELAY, so a SearXNG that is usually fast is not waited on
+    for long when it stalls.  When both requests are in flight the first
+    good answer wins and the other is cancelled.  Under a tight request
+    deadline the hedge starts earlier, so DDGS still has time to answer.
+    """
+    if not searxng_breaker.allow():
+        print(f"[Search] SearXNG circuit open, DDGS query (auto): {query}", flush=True)
+        metrics.search_fallbacks.labels("breaker_open").inc()
+        return await _search_ddgs(query, max_results, region), "ddgs"
+
+    print(f"[Search] SearXNG query (auto): {query}", flush=True)
+    lost_hedge = asyncio.Event()
+    tasks: dict[asyncio.Task, str] = {
+        asyncio.create_task(_search_searxng_tracked(query, max_results, region, lost_hedge)): "searxng",
+    }
+    hedge_delay = _hedge_delay()
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=hedge_delay)
+        if done:
+            searx_task = next(iter(done))
             try:
-                print(f"[Search] SearXNG query (auto): {input.query}", flush=True)
-                results = await _search_searxng(input.query, input.max_results, input.region)
-                source_used = "searxng"
+                return searx_task.result(), "searxng"
             except Exception as searx_err:
                 print(f"[Search] SearXNG failed ({searx_err}), falling back to DDGS", flush=True)
-                results = await _search_ddgs(input.query, input.max_results, input.region)
-                source_used = "ddgs"
+                metrics.search_fallbacks.labels("searxng_error").inc()
+                return await _search_ddgs(query, max_results, region), "ddgs"
+
+        print(f"[Search] SearXNG slower than {hedge_delay:.2f}s, hedging with DDGS", flush=True)
+        metrics.search_fallbacks.labels("hedge").inc()
+        tasks[asyncio.create_task(_search_ddgs(query, max_results, region))] = "ddgs"
+        pending = set(tasks)
+        last_error: BaseException | None = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            # Prefer SearXNG if both finished in the same tick
+            for task in sorted(done, key=lambda t: tasks[t] != "searxng"):
+                if task.exception() is None:
+                    print(f"[Search] Hedge won by {tasks[task]}", flush=True)
+                    if tasks[task] == "ddgs":
+                        lost_hedge.set()
+                    return task.result(), tasks[task]
+                last_error = task.exception()
+                print(f"[Search] {tasks[task]} failed during hedge ({last_error})", flush=True)
+        raise last_error
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+
+async def search_tool(input: SearchInput) -> dict:
+    """
+    Search the web using SearXNG (primary) with DDGS as fallback.
+
+    In 'auto' mode, tries SearXNG first. If it fails, falls back to DDGS; if
+    it is slow, DDGS is raced against it; if its circuit breaker is open,
+    DDGS is used directly.  Results are cached per (normalized query,
+    region, source); identical concurrent searches share one upstream call.
+    """
+    try:
+        key = (normalize_query(input.query), input.region, input.source)
+        results, source_used, cache_status = await search_cache.get_or_fetch(
+            key,
+            input.max_results,
+            lambda n: _search(input.query, n, input.region, input.source),
+        )
 
         # Add position numbers
         for idx, r in enumerate(results):
             r["position"] = idx + 1
 
-        print(f"[Search] Found {len(results)} results via {source_used}", flush=True)
+        print(f"[Search] Found {len(results)} results via {source_used} (cache: {cache_status})", flush=True)
+        metrics.cache_requests.labels("search", cache_status).inc()
 
         return {
             "query": input.query,
@@ -115,6 +230,7 @@ async def search_tool(input: SearchInput) -> dict:
             "count": len(results),
             "source": source_used,
             "region": input.region,
+            "cache": cache_status,
         }
 
     except Exception as e:
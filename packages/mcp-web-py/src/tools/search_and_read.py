@@ -0,0 +1,131 @@
+"""Search-and-Read Tool: search, then fetch the top results in one call"""
+import asyncio
+import os
+import time
+from typing import Literal
+from pydantic import BaseModel, Field, HttpUrl, TypeAdapter, ValidationError
+
+from src.services import deadline
+from src.tools.search import search_tool, SearchInput
+from src.tools.fetch_many import fetch_many_tool, FetchManyInput
+
+SEARCH_AND_READ_DEADLINE = float(os.environ.get("SEARCH_AND_READ_DEADLINE", 30))
+
+# Time kept back for assembling the response once fetches return
+_DEADLINE_MARGIN = 0.25
+
+_HTTP_URL = TypeAdapter(HttpUrl)
+
+
+def _invalid_url(url: str) -> str | None:
+    """Why *url* would be rejected by ``FetchManyInput``, or None if it is fine."""
+    try:
+        _HTTP_URL.validate_python(url)
+    except ValidationError as e:
+        return f"Invalid URL: {e.errors()[0]['msg']}"
+    return None
+
+
+class SearchAndReadInput(BaseModel):
+    """Input schema for search followed by concurrent reads"""
+    query: str = Field(..., min_length=1, description="Search query")
+    max_results: int = Field(5, ge=1, le=20, description="Number of search results to return (1-20)")
+    read: int = Field(3, ge=0, le=10, description="How many of the top results to fetch and extract (0-10, at most max_results)")
+    region: str = Field("wt-wt", description="Region code (us-en, uk-en, wt-wt for worldwide)")
+    source: Literal["auto", "searxng", "ddgs"] = Field("auto", description="Search source")
+    format: Literal["markdown", "text"] = Field("markdown", description="Format of extracted passages")
+    max_length: int = Field(3000, ge=1, le=20000, description="Maximum extracted characters per result")
+    deadline: float = Field(SEARCH_AND_READ_DEADLINE, gt=0, le=120, description="Overall time budget in seconds")
+
+
+async def search_and_read_tool(input: SearchAndReadInput) -> dict:
+    """
+    Search the web and read the top results in one round trip.
+
+    Runs ``search_tool``, then fetches the first ``read`` result URLs through
+    ``fetch_many_tool`` (same download / cache / extraction path as
+    ``fetch``); each excerpt is made of the page passages most relevant to
+    the query. Everything shares one deadline: results whose page is not
+    ready in time keep their search metadata and carry a per-result error.
+    A sooner request deadline takes precedence over ``deadline``.
+    """
+    start = time.perf_counter()
+    budget = deadline.clamp(input.deadline)
+    deadline_at = time.monotonic() + budget
+
+    try:
+        search_result = await asyncio.wait_for(
+            search_tool(SearchInput(
+                query=input.query,
+                max_results=input.max_results,
+                region=input.region,
+                source=input.source,
+            )),
+            budget,
+        )
+    except asyncio.TimeoutError:
+        print(f"[SearchAndRead] Search exceeded {budget:g}s", flush=True)
+        return {
+            "error": f"Search exceeded the {budget:g}s deadline",
+            "query": input.query,
+            "message": "Search did not finish in time. Please try again.",
+        }
+    if "error" in search_result:
+        return search_result
+
+    results = search_result["results"]
+    # Indices of results to read; skip entries without a fetchable URL
+    to_read = [i for i, r in enumerate(results[:input.read])
+               if r.get("url", "").startswith(("http://", "https://"))]
+    # Validate one by one: a single bad URL must not fail the whole batch
+    invalid = {i: error for i in to_read if (error := _invalid_url(results[i]["url"]))}
+    to_read = [i for i in to_read if i not in invalid]
+    remaining = deadline_at - time.monotonic() - _DEADLINE_MARGIN
+
+    pages: dict[int, dict] = {}
+    if to_read and remaining > 0:
+        print(f"[SearchAndRead] Reading {len(to_read)} result(s), {remaining:.1f}s left", flush=True)
+        batch = await fetch_many_tool(FetchManyInput(
+            urls=[results[i]["url"] for i in to_read],
+            format=input.format,
+            max_length=input.max_length,
+            query=input.query,
+            deadline=remaining,
+        ))
+        pages = dict(zip(to_read, batch["results"]))
+    elif to_read:
+        print("[SearchAndRead] No time left to read results", flush=True)
+
+    combined = []
+    for i, result in enumerate(results):
+        entry = dict(result)
+        if i in invalid:
+            entry["read_error"] = invalid[i]
+        elif i in to_read:
+            page = pages.get(i)
+            if page is None:
+                entry["read_error"] = "Deadline exceeded before the page could be fetched"
+            elif "error" in page:
+                entry["read_error"] = page["error"]
+            else:
+                entry["content"] = page["content"]
+                entry["length"] = page["length"]
+                entry["passages"] = page.get("passages", [])
+                if page.get("title") and page["title"] != "Untitled":
+                    entry["page_title"] = page["title"]
+                entry["read_ms"] = page.get("elapsed_ms")
+        combined.append(entry)
+
+    read_ok = sum(1 for r in combined if "content" in r)
+    elapsed_ms = round((time.perf_counter() - start) * 1000, 2)
+    print(f"[SearchAndRead] {len(combined)} result(s), {read_ok} read in {elapsed_ms}ms", flush=True)
+    return {
+        "query": input.query,
+        "results": combined,
+        "count": len(combined),
+        "read": read_ok,
+        "source": search_result["source"],
+        "region": search_result["region"],
+        "cache": search_result["cache"],
+        "elapsed_ms": elapsed_ms,
+    }
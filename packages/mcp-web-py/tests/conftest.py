@@ -0,0 +1,94 @@
+"""Shared fixtures: a local HTTP server so tests never touch the network,
+isolated fetch services, and MCP request builders."""
+import asyncio
+import http.server
+import json
+import threading
+import time
+
+import pytest
+from starlette.requests import Request
+
+from src.services.extraction_cache import ExtractionCache
+from src.services.http_cache import HttpCache
+from src.services.worker_pool import WorkerPool
+from src.tools import fetch
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    routes: dict = {}
+
+    def do_GET(self):
+        route = self.routes.get(self.path, (404, {"Content-Type": "text/plain"}, b"not found"))
+        status, headers, body = route(self) if callable(route) else route
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def http_server():
+    """Serve ``server.routes[path] = (status, headers, body)`` on localhost.
+
+    A route may also be a callable taking the request handler and returning
+    that tuple, for responses that depend on request headers.
+    """
+    handler = type("Handler", (_Handler,), {"routes": {}})
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.routes = handler.routes
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def slow_route():
+    """Build a route that answers ``200 text/plain`` *body* after *delay* seconds."""
+    def build(delay: float, body: bytes):
+        def respond(handler):
+            time.sleep(delay)
+            return 200, {"Content-Type": "text/plain"}, body
+        return respond
+    return build
+
+
+@pytest.fixture
+def isolated_services(tmp_path, monkeypatch):
+    """Give ``fetch`` a private HTTP cache, extraction cache and in-process extraction."""
+    monkeypatch.setattr(fetch, "http_cache", HttpCache(directory=str(tmp_path), max_bytes=1024 * 1024))
+    monkeypatch.setattr(fetch, "extraction_pool", WorkerPool(workers=0))
+    monkeypatch.setattr(fetch, "extraction_cache", ExtractionCache())
+
+
+@pytest.fixture
+def mcp_request():
+    """Build a POST /mcp request for ``server.handle_messages``.
+
+    *body* is JSON-encoded unless it is already bytes; with
+    *disconnect_after* the client hangs up after that many seconds.
+    """
+    def build(body, disconnect_after: float | None = None) -> Request:
+        payload = body if isinstance(body, bytes) else json.dumps(body).encode()
+        messages = [{"type": "http.request", "body": payload, "more_body": False}]
+
+        async def receive():
+            if messages:
+                return messages.pop(0)
+            if disconnect_after is None:
+                await asyncio.Event().wait()
+            await asyncio.sleep(disconnect_after)
+            return {"type": "http.disconnect"}
+
+        scope = {"type": "http", "method": "POST", "path": "/mcp", "headers": [], "query_string": b""}
+        return Request(scope, receive)
+    return build
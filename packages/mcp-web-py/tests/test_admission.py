@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+
+from src.services.admission import AdmissionController, ServerBusy
+
+
+async def _hold(controller, tool, release: asyncio.Event, order: list, tag):
+    async with controller.admit(tool):
+        order.append(tag)
+        await release.wait()
+
+
+@pytest.mark.asyncio
+async def test_calls_beyond_limit_queue_in_fifo_order():
+    controller = AdmissionController(limits={"fetch": 1}, queue_size=4, queue_timeout=5)
+    release, order = asyncio.Event(), []
+    tasks = [asyncio.create_task(_hold(controller, "fetch", release, order, i)) for i in range(3)]
+    await asyncio.sleep(0.01)
+    stats = controller.stats()["tools"]["fetch"]
+    assert (stats["active"], stats["queue_depth"]) == (1, 2)
+
+    release.set()
+    await asyncio.gather(*tasks)
+    assert order == [0, 1, 2]
+    stats = controller.stats()["tools"]["fetch"]
+    assert (stats["active"], stats["queue_depth"], stats["admitted"]) == (0, 0, 3)
+
+
+@pytest.mark.asyncio
+async def test_full_queue_and_wait_timeout_are_rejected():
+    controller = AdmissionController(limits={"fetch": 1}, queue_size=1, queue_timeout=0.1)
+    release = asyncio.Event()
+    holder = asyncio.create_task(_hold(controller, "fetch", release, [], 0))
+    waiter = asyncio.create_task(_hold(controller, "fetch", release, [], 1))
+    await asyncio.sleep(0.01)
+
+    with pytest.raises(ServerBusy, match="queue is full"):
+        async with controller.admit("fetch"):
+            pass
+    with pytest.raises(ServerBusy):
+        await waiter
+
+    release.set()
+    await holder
+    stats = controller.stats()
+    assert stats["rejected"] == 2
+    assert stats["tools"]["fetch"]["rejected_timeout"] == 1
+    assert stats["tools"]["fetch"]["active"] == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_leak_a_slot():
+    controller = AdmissionController(limits={"fetch": 1}, queue_size=4, queue_timeout=5)
+    release = asyncio.Event()
+    holder = asyncio.create_task(_hold(controller, "fetch", release, [], 0))
+    waiter = asyncio.create_task(_hold(controller, "fetch", release, [], 1))
+    await asyncio.sleep(0.01)
+    waiter.cancel()
+    release.set()
+    await holder
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    assert controller.stats()["tools"]["fetch"]["active"] == 0
+
+
+@pytest.mark.asyncio
+async def test_unknown_tools_share_one_gate():
+    controller = AdmissionController(limits={"fetch": 1}, default_limit=2)
+    for name in ("nope", "also-nope", None):
+        async with controller.admit(name):
+            pass
+    assert set(controller.stats()["tools"]) == {"(other)"}
+
+
+@pytest.mark.asyncio
+async def test_slot_handed_over_as_the_wait_times_out_is_not_leaked(monkeypatch):
+    # Python >= 3.12: wait_for may raise TimeoutError after the waiter got its result
+    async def late_timeout(future, timeout):
+        await future
+        raise asyncio.TimeoutError
+
+    controller = AdmissionController(limits={"fetch": 1}, queue_size=4, queue_timeout=5)
+    release = asyncio.Event()
+    holder = asyncio.create_task(_hold(controller, "fetch", release, [], 0))
+    await asyncio.sleep(0.01)
+    monkeypatch.setattr(asyncio, "wait_for", late_timeout)
+    waiter = asyncio.create_task(_hold(controller, "fetch", release, [], 1))
+    await asyncio.sleep(0.01)
+
+    release.set()
+    await holder
+    with pytest.raises(ServerBusy):
+        await waiter
+    assert controller.stats()["tools"]["fetch"]["active"] == 0
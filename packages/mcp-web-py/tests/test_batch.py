@@ -0,0 +1,72 @@
+import json
+import time
+
+import pytest
+
+from src import server
+
+pytestmark = pytest.mark.usefixtures("isolated_services")
+
+
+def fetch_call(request_id: int, url: str) -> dict:
+    return {"jsonrpc": "2.0", "id": request_id, "method": "tools/call",
+            "params": {"name": "fetch", "arguments": {"url": url}}}
+
+
+@pytest.mark.asyncio
+async def test_batch_answers_in_order_without_notifications(mcp_request):
+    response = await server.handle_messages(mcp_request([
+        {"jsonrpc": "2.0", "id": "a", "method": "ping"},
+        {"jsonrpc": "2.0", "method": "notifications/initialized"},
+        {"jsonrpc": "2.0", "id": "b", "method": "tools/list"},
+        {"jsonrpc": "2.0", "id": "c", "method": "no/such"},
+        42,
+    ]))
+
+    replies = json.loads(response.body)
+    assert response.status_code == 200
+    assert [reply["id"] for reply in replies] == ["a", "b", "c", None]
+    assert replies[0]["result"] == {}
+    assert {tool["name"] for tool in replies[1]["result"]["tools"]} >= {"search", "fetch"}
+    assert replies[2]["error"]["code"] == -32601
+    assert replies[3]["error"]["code"] == -32600
+
+
+@pytest.mark.asyncio
+async def test_batch_tool_calls_run_concurrently(http_server, mcp_request, slow_route):
+    http_server.routes["/one"] = slow_route(0.5, b"first page")
+    http_server.routes["/two"] = slow_route(0.5, b"second page")
+
+    started = time.perf_counter()
+    response = await server.handle_messages(mcp_request([
+        fetch_call(1, f"{http_server.url}/one"),
+        fetch_call(2, f"{http_server.url}/two"),
+    ]))
+    elapsed = time.perf_counter() - started
+
+    replies = json.loads(response.body)
+    assert [reply["id"] for reply in replies] == [1, 2]
+    texts = [json.loads(reply["result"]["content"][0]["text"]) for reply in replies]
+    assert "first page" in json.dumps(texts[0]) and "second page" in json.dumps(texts[1])
+    assert elapsed < 0.9
+
+
+@pytest.mark.asyncio
+async def test_invalid_batches_and_bodies_are_rejected(monkeypatch, mcp_request):
+    monkeypatch.setattr(server, "MCP_BATCH_MAX_SIZE", 2)
+    ping = {"jsonrpc": "2.0", "id": 1, "method": "ping"}
+
+    for body in ([], [ping, ping, ping]):
+        response = await server.handle_messages(mcp_request(body))
+        assert response.status_code == 400
+        assert json.loads(response.body)["error"]["code"] == -32600
+
+    response = await server.handle_messages(mcp_request(b"[{not json"))
+    assert response.status_code == 400
+    error = json.loads(response.body)
+    assert (error["id"], error["error"]["code"]) == (None, -32700)
+
+    response = await server.handle_messages(mcp_request([
+        {"jsonrpc": "2.0", "method": "notifications/initialized"},
+    ]))
+    assert (response.status_code, response.body) == (202, b"")
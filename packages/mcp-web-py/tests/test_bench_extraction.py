@@ -0,0 +1,62 @@
+import copy
+import urllib.request
+
+from benchmarks.bench_extraction import CORPUS_DIR, compare, serve_corpus
+
+RESULTS = {
+    "meta": {},
+    "pages": {
+        "news_article.html": {
+            "size_bytes": 30000,
+            "peak_rss_mb": 70.0,
+            "rss_growth_mb": 14.0,
+            "formats": {
+                "markdown": {
+                    "stages": {"download": 3.0, "parse": 1.0, "extract": 100.0, "convert": 20.0, "total": 125.0},
+                    "chars": 9000,
+                    "bytes": 9000,
+                    "method": "trafilatura",
+                },
+            },
+        },
+    },
+}
+
+
+def test_compare_ignores_noise():
+    current = copy.deepcopy(RESULTS)
+    stages = current["pages"]["news_article.html"]["formats"]["markdown"]["stages"]
+    stages["download"] = 6.0  # +100% but only 3ms
+    stages["extract"] = 120.0  # +20%, within tolerance
+    current["pages"]["news_article.html"]["formats"]["markdown"]["chars"] = 9100
+    assert compare(current, RESULTS, tolerance=0.3) == []
+
+
+def test_compare_flags_slower_stages_memory_and_output_changes():
+    current = copy.deepcopy(RESULTS)
+    page = current["pages"]["news_article.html"]
+    page["rss_growth_mb"] = 40.0
+    page["formats"]["markdown"]["stages"]["convert"] = 60.0
+    page["formats"]["markdown"]["chars"] = 4000
+    page["formats"]["markdown"]["method"] = "readability"
+    regressions = compare(current, RESULTS, tolerance=0.3)
+    assert any("RSS growth" in line for line in regressions)
+    assert any("convert: 20.0 -> 60.0" in line for line in regressions)
+    assert any("output: 9000 -> 4000" in line for line in regressions)
+    assert any("method: trafilatura -> readability" in line for line in regressions)
+
+
+def test_compare_skips_pages_missing_from_baseline():
+    assert compare(RESULTS, {"pages": {}}, tolerance=0.3) == []
+
+
+def test_corpus_is_served_locally():
+    page = sorted(CORPUS_DIR.glob("*.html"))[0]
+    server = serve_corpus()
+    try:
+        with urllib.request.urlopen(f"{server.url}/{page.name}") as response:
+            assert response.headers.get_content_type() == "text/html"
+            assert response.read() == page.read_bytes()
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,133 @@
+from types import SimpleNamespace
+
+import pytest
+
+from src.services import ddgs_pool as ddgs_pool_module
+from src.services.ddgs_pool import DdgsPool
+
+
+class _HttpClient:
+    def __init__(self, engine):
+        self.engine = engine
+
+    def request(self, *args, **kwargs):
+        if self.engine.behaviour == "raise":
+            raise RuntimeError("connection reset")
+        status = 429 if self.engine.behaviour == "limited" else 200
+        return SimpleNamespace(status_code=status)
+
+
+def _engine_class(name: str):
+    class Engine:
+        behaviour = "ok"
+        instances = 0
+
+        def __init__(self):
+            type(self).instances += 1
+            self.name = name
+            self.http_client = _HttpClient(self)
+
+    return Engine
+
+
+class FakeDDGS:
+    engine_classes: list = []
+    fail_next = False
+
+    def __init__(self):
+        self._engines_cache = {}
+
+    def _get_engines(self, category, backend):
+        for cls in self.engine_classes:
+            if cls not in self._engines_cache:
+                self._engines_cache[cls] = cls()
+        return list(self._engines_cache.values())
+
+    def text(self, query, **kwargs):
+        for engine in self._engines_cache.values():
+            try:
+                engine.http_client.request("GET", "https://example.invalid")
+            except RuntimeError:
+                pass
+        if FakeDDGS.fail_next:
+            FakeDDGS.fail_next = False
+            raise RuntimeError("No results found.")
+        return [{"title": query, "href": "https://example.com", "body": "", "source": "fake"}]
+
+
+@pytest.fixture
+def engines(monkeypatch):
+    classes = {"alpha": _engine_class("alpha"), "beta": _engine_class("beta")}
+    FakeDDGS.engine_classes = list(classes.values())
+    FakeDDGS.fail_next = False
+    monkeypatch.setattr(ddgs_pool_module, "DDGS", FakeDDGS)
+    return classes
+
+
+@pytest.mark.asyncio
+async def test_clients_are_warmed_once_and_reused(engines):
+    pool = DdgsPool(workers=2)
+    try:
+        await pool.start()
+        for i in range(5):
+            results = await pool.text(f"q{i}", "wt-wt", 5)
+            assert results[0]["title"] == f"q{i}"
+    finally:
+        await pool.close()
+    stats = pool.stats()
+    assert stats["clients_created"] == 2
+    assert engines["alpha"].instances == 2
+    assert stats["backends"]["alpha"]["requests"] == 5
+    assert stats["backends"]["alpha"]["latency_ewma_ms"] is not None
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_and_failing_engines_are_recycled(engines):
+    pool = DdgsPool(workers=1)
+    try:
+        engines["alpha"].behaviour = "limited"
+        engines["beta"].behaviour = "raise"
+        await pool.text("q", "wt-wt", 5)
+        engines["alpha"].behaviour = engines["beta"].behaviour = "ok"
+        await pool.text("q", "wt-wt", 5)
+    finally:
+        await pool.close()
+    stats = pool.stats()
+    assert stats["engines_recycled"] == 2
+    assert engines["alpha"].instances == engines["beta"].instances == 2
+    assert stats["backends"]["alpha"]["rate_limited"] == 1
+    assert stats["backends"]["beta"]["errors"] == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_search_replaces_the_client(engines):
+    pool = DdgsPool(workers=1)
+    try:
+        FakeDDGS.fail_next = True
+        with pytest.raises(RuntimeError):
+            await pool.text("q", "wt-wt", 5)
+        await pool.text("q", "wt-wt", 5)
+    finally:
+        await pool.close()
+    stats = pool.stats()
+    assert (stats["errors"], stats["clients_recycled"], stats["clients_created"]) == (1, 1, 2)
+
+
+class PlainDDGS:
+    """A DDGS without the private engine hooks the pool instruments."""
+
+    def text(self, query, **kwargs):
+        return [{"title": query, "href": "https://example.com", "body": "", "source": "plain"}]
+
+
+@pytest.mark.asyncio
+async def test_missing_ddgs_internals_fall_back_to_plain_searches(monkeypatch):
+    monkeypatch.setattr(ddgs_pool_module, "DDGS", PlainDDGS)
+    pool = DdgsPool(workers=1)
+    try:
+        results = await pool.text("q", "wt-wt", 5)
+    finally:
+        await pool.close()
+    assert results[0]["source"] == "plain"
+    stats = pool.stats()
+    assert (stats["instrumented"], stats["errors"], stats["backends"]) == (False, 0, {})
@@ -0,0 +1,135 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+from src import server
+from src.services import deadline
+from src.services.admission import AdmissionController
+from src.tools.fetch import FetchInput, fetch_tool
+from src.tools.fetch_many import FetchManyInput, fetch_many_tool
+
+pytestmark = pytest.mark.usefixtures("isolated_services")
+
+
+def call(name: str, arguments: dict, meta: dict | None = None) -> dict:
+    params = {"name": name, "arguments": arguments}
+    if meta is not None:
+        params["_meta"] = meta
+    return {"jsonrpc": "2.0", "id": 7, "method": "tools/call", "params": params}
+
+
+def test_budget_nests_and_clamps():
+    assert deadline.remaining() is None
+    assert deadline.clamp(15) == 15
+    with deadline.budget(5):
+        assert deadline.clamp(15) <= 5
+        with deadline.budget(60):  # an inner budget never extends the outer one
+            assert deadline.remaining() <= 5
+        with deadline.budget(1):
+            assert deadline.clamp(None) <= 1
+            assert deadline.clamp(15, reserve=0.5) <= 0.5
+    assert deadline.remaining() is None
+
+
+def test_clamp_raises_once_the_budget_is_spent():
+    with deadline.budget(0.01):
+        time.sleep(0.02)
+        with pytest.raises(deadline.DeadlineExceeded):
+            deadline.clamp(10)
+
+
+@pytest.mark.asyncio
+async def test_fetch_gives_up_at_the_request_deadline(http_server, slow_route):
+    http_server.routes["/slow"] = slow_route(3, b"finally")
+    start = time.monotonic()
+    with deadline.budget(0.5):
+        result = await fetch_tool(FetchInput(url=f"{http_server.url}/slow"))
+    assert "error" in result
+    assert time.monotonic() - start < 1.5
+
+
+@pytest.mark.asyncio
+async def test_fetch_many_returns_partial_results_within_the_request_deadline(http_server, slow_route):
+    http_server.routes["/fast"] = (200, {"Content-Type": "text/plain"}, b"quick")
+    http_server.routes["/slow"] = slow_route(3, b"finally")
+    start = time.monotonic()
+    with deadline.budget(1):
+        result = await fetch_many_tool(FetchManyInput(
+            urls=[f"{http_server.url}/fast", f"{http_server.url}/slow"], deadline=30
+        ))
+    assert time.monotonic() - start < 1.2
+    fast, slow = result["results"]
+    assert fast["content"] == "quick"
+    assert "error" in slow
+
+
+@pytest.mark.asyncio
+async def test_tools_call_honours_meta_deadline(monkeypatch, mcp_request):
+    async def stuck_fetch(input):
+        await asyncio.sleep(10)
+
+    monkeypatch.setattr(server, "fetch_tool", stuck_fetch)
+    start = time.monotonic()
+    response = await server.handle_messages(mcp_request(
+        call("fetch", {"url": "https://example.com/"}, meta={"deadline_ms": 300})
+    ))
+    assert time.monotonic() - start < 1
+    payload = json.loads(json.loads(response.body)["result"]["content"][0]["text"])
+    assert payload["error"] == "Request deadline exceeded"
+
+
+@pytest.mark.asyncio
+async def test_deadline_running_out_in_the_admission_queue_is_not_busy(monkeypatch, mcp_request):
+    controller = AdmissionController(limits={"fetch": 1}, queue_size=4, queue_timeout=5)
+    monkeypatch.setattr(server, "admission", controller)
+    release = asyncio.Event()
+
+    async def hold():
+        async with controller.admit("fetch"):
+            await release.wait()
+
+    holder = asyncio.create_task(hold())
+    await asyncio.sleep(0.01)
+    response = await server.handle_messages(mcp_request(
+        call("fetch", {"url": "https://example.com/"}, meta={"deadline_ms": 200})
+    ))
+    release.set()
+    await holder
+
+    assert response.status_code == 200
+    payload = json.loads(json.loads(response.body)["result"]["content"][0]["text"])
+    assert payload["error"] == "Request deadline exceeded"
+    stats = controller.stats()["tools"]["fetch"]
+    assert (stats["rejected_timeout"], stats["deadline_expired"]) == (0, 1)
+
+
+@pytest.mark.asyncio
+async def test_invalid_meta_deadline_is_rejected(mcp_request):
+    response = await server.handle_messages(mcp_request(
+        call("fetch", {"url": "https://example.com/"}, meta={"deadline_ms": "soon"})
+    ))
+    assert json.loads(response.body)["error"]["code"] == -32602
+
+
+@pytest.mark.asyncio
+async def test_client_disconnect_cancels_the_tool(monkeypatch, mcp_request):
+    cancelled = asyncio.Event()
+
+    async def stuck_fetch(input):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    monkeypatch.setattr(server, "fetch_tool", stuck_fetch)
+    start = time.monotonic()
+    response = await server.handle_messages(mcp_request(
+        call("fetch", {"url": "https://example.com/"}), disconnect_after=0.2
+    ))
+    assert time.monotonic() - start < 1
+    assert response.status_code == 499
+    assert cancelled.is_set()
+    assert server.admission.stats()["tools"]["fetch"]["active"] == 0
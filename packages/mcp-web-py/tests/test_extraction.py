@@ -0,0 +1,86 @@
+import time
+
+import pytest
+from trafilatura.utils import load_html
+
+from src.services import extraction
+
+ARTICLE = (
+    "<html><head><title>Doc Title</title><meta name='author' content='Jane Roe'></head><body>"
+    "<nav><a href='/'>Home</a></nav><article><h1>Heading</h1>"
+    "<p>" + "First paragraph of readable article text with a <a href='https://example.com'>link</a>. " * 8 + "</p>"
+    "<p>" + "Second paragraph follows with more words for the extractor. " * 8 + "</p>"
+    "</article></body></html>"
+)
+
+
+@pytest.mark.parametrize("fmt", ["markdown", "text", "html"])
+def test_single_parse_yields_content_metadata_and_timings(fmt):
+    result = extraction.extract_all(ARTICLE, formats=(fmt,))
+
+    assert result["method"] == "trafilatura"
+    assert result["author"] == "Jane Roe"
+    assert "Second paragraph follows" in result["formats"][fmt]
+    assert {"parse", "extract", "convert"} <= result["timings"].keys()
+
+
+def test_readability_fallback_for_unextractable_page():
+    result = extraction.extract_all("<html><head><title>Empty</title></head><body></body></html>", formats=("text",))
+    assert result["method"] == "readability"
+    assert result["title"] == "Empty"
+
+
+def test_prune_drops_dead_weight_but_keeps_text_and_json_ld():
+    tree = load_html(
+        "<html><head><style>p{}</style>"
+        "<script type='application/ld+json'>{\"author\": \"Jane Roe\"}</script></head><body>"
+        "<p>Before<script>var x = 1;</script> after script<!-- note --></p>"
+        "<svg><path d='M0 0'/></svg><p>Tail</p></body></html>"
+    )
+    stats = extraction.prune(tree)
+
+    assert not tree.xpath("//style | //svg | //path | //comment() | //script[not(@type)]")
+    assert tree.xpath("//script[@type='application/ld+json']")
+    assert tree.findtext(".//p") == "Before after script"
+    assert stats["removed"] >= 3
+    assert not stats["truncated"]
+
+
+def test_prune_flattens_deep_nesting_and_caps_nodes():
+    tree = load_html("<html><body>" + "<div>" * 20 + "deep text" + "</div>" * 20 + "<p>after</p></body></html>")
+    stats = extraction.prune(tree, max_depth=5)
+    assert stats["flattened"] == 1
+    assert max(len(list(el.iterancestors())) for el in tree.iter()) == 5
+    assert "deep text" in tree.text_content()
+
+    tree = load_html("<html><body>" + "".join(f"<p>item {i}</p>" for i in range(100)) + "</body></html>")
+    stats = extraction.prune(tree, max_nodes=12)
+    assert stats["truncated"]
+    assert len(list(tree.iter())) == 12
+    assert "item 9" in tree.text_content()
+    assert "item 10" not in tree.text_content()
+
+
+def test_spent_budget_falls_back_to_plain_text():
+    result = extraction.extract_all(ARTICLE, budget=0)
+
+    assert result["method"] == "text"
+    assert result["degraded"]
+    assert result["limits"] == ["trafilatura_skipped", "readability_skipped"]
+    assert result["title"] == "Doc Title"
+    assert "Second paragraph follows" in result["formats"]["text"]
+
+
+def test_slow_attempt_is_interrupted(monkeypatch):
+    def stuck(tree, timings, formats):
+        time.sleep(5)
+
+    monkeypatch.setattr(extraction, "_trafilatura", stuck)
+    start = time.monotonic()
+    result = extraction.extract_all(ARTICLE, budget=0.5)
+
+    assert time.monotonic() - start < 1
+    assert result["method"] == "readability"
+    assert result["limits"] == ["trafilatura_timeout"]
+    assert result["degraded"]
+    assert "Second paragraph follows" in result["formats"]["text"]
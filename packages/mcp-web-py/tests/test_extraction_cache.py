@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+
+from src.services.extraction_cache import ExtractionCache, content_key
+
+
+def entry(text: str) -> dict:
+    return {"title": "T", "author": None, "formats": {"markdown": text, "text": text, "html": text}}
+
+
+@pytest.mark.asyncio
+async def test_hit_after_miss():
+    cache = ExtractionCache(max_bytes=1024 * 1024)
+    calls = 0
+
+    async def extract():
+        nonlocal calls
+        calls += 1
+        return entry("body")
+
+    key = content_key(b"<html>body</html>")
+    first, status1 = await cache.get_or_extract(key, extract)
+    second, status2 = await cache.get_or_extract(key, extract)
+    assert (status1, status2) == ("miss", "hit")
+    assert first is second
+    assert calls == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_lookups_share_one_extraction():
+    cache = ExtractionCache(max_bytes=1024 * 1024)
+    calls = 0
+
+    async def extract():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return entry("body")
+
+    results = await asyncio.gather(*(cache.get_or_extract("k", extract) for _ in range(5)))
+    assert calls == 1
+    assert sorted(status for _, status in results) == ["coalesced"] * 4 + ["miss"]
+
+
+@pytest.mark.asyncio
+async def test_failed_extraction_is_not_cached():
+    cache = ExtractionCache(max_bytes=1024 * 1024)
+
+    async def fail():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        await cache.get_or_extract("k", fail)
+    result, status = await cache.get_or_extract("k", lambda: asyncio.sleep(0, entry("ok")))
+    assert status == "miss"
+    assert result["formats"]["text"] == "ok"
+
+
+@pytest.mark.asyncio
+async def test_least_recently_used_entries_are_evicted():
+    cache = ExtractionCache(max_bytes=3000)
+
+    async def extract():
+        return entry("x" * 300)  # ~1.1 KB per entry
+
+    await cache.get_or_extract("a", extract)
+    await cache.get_or_extract("b", extract)
+    await cache.get_or_extract("a", extract)  # a is now most recent
+    await cache.get_or_extract("c", extract)
+    assert (await cache.get_or_extract("a", extract))[1] == "hit"
+    assert (await cache.get_or_extract("b", extract))[1] == "miss"
+    assert cache.stats()["bytes"] <= 3000
+
+
+@pytest.mark.asyncio
+async def test_degraded_results_are_not_cached():
+    cache = ExtractionCache(max_bytes=1024 * 1024)
+
+    async def extract():
+        return {**entry("partial"), "degraded": True}
+
+    _, status1 = await cache.get_or_extract("k", extract)
+    _, status2 = await cache.get_or_extract("k", extract)
+    assert (status1, status2) == ("miss", "miss")
+    assert cache.stats()["degraded"] == 2
@@ -0,0 +1,172 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from src.tools import fetch
+from src.tools.fetch import FetchInput, classify_content, fetch_tool
+
+pytestmark = pytest.mark.usefixtures("isolated_services")
+
+SAMPLE_PDF = (Path(__file__).parent / "fixtures" / "sample.pdf").read_bytes()
+
+ARTICLE = (
+    b"<html><head><title>Streaming</title></head><body><article><h1>Streaming</h1>"
+    + (b"<p>" + b"Bytes arrive in chunks and the reader stops early. " * 40 + b"</p>") * 50
+    + b"</article></body></html>"
+)
+
+
+def test_classify_content_uses_type_then_magic_bytes():
+    assert classify_content("text/plain", b"hello") == "text"
+    assert classify_content("application/ld+json", b"{}") == "text"
+    assert classify_content("image/png", b"\x89PNG") == "binary"
+    assert classify_content("", b"%PDF-1.7") == "pdf"
+    assert classify_content("application/octet-stream", b"%PDF-1.4") == "pdf"
+    assert classify_content("", b"PK\x03\x04") == "binary"
+    assert classify_content("text/html", b"\x1f\x8b\x08\x00") == "binary"
+    assert classify_content("application/octet-stream", b"  <!doctype html>") == "html"
+    assert classify_content("text/html", b"<html>") == "html"
+
+
+@pytest.mark.asyncio
+async def test_binary_content_is_rejected_without_extraction(http_server):
+    http_server.routes["/file.zip"] = (200, {"Content-Type": "application/zip"}, b"PK\x03\x04" + b"\0" * 50_000)
+    result = await fetch_tool(FetchInput(url=f"{http_server.url}/file.zip"))
+    assert "error" in result
+    assert "application/zip" in result["error"]
+
+
+@pytest.mark.asyncio
+async def test_text_content_skips_extraction(http_server):
+    http_server.routes["/notes.md"] = (200, {"Content-Type": "text/markdown; charset=utf-8"}, b"# Notes\n\nplain body")
+    result = await fetch_tool(FetchInput(url=f"{http_server.url}/notes.md"))
+    assert result["content"] == "# Notes\n\nplain body"
+    assert result["title"] == "notes.md"
+    assert set(result["timings"]) == {"download"}
+
+
+@pytest.mark.asyncio
+async def test_large_text_download_is_capped(http_server):
+    http_server.routes["/log.txt"] = (200, {"Content-Type": "text/plain"}, b"a" * 2_000_000)
+    result = await fetch_tool(FetchInput(url=f"{http_server.url}/log.txt", max_length=1000))
+    assert result["truncated_download"] is True
+    assert result["content"].startswith("a" * 1000)
+    assert result["content"].endswith("[Content truncated...]")
+
+
+@pytest.mark.asyncio
+async def test_html_prefix_is_extracted_when_download_is_capped(http_server, monkeypatch):
+    monkeypatch.setattr(fetch, "FETCH_MIN_BYTES", 0)
+    http_server.routes["/article"] = (200, {"Content-Type": "text/html"}, ARTICLE)
+    result = await fetch_tool(FetchInput(url=f"{http_server.url}/article", max_length=200))
+    assert result["truncated_download"] is True
+    assert result["title"] == "Streaming"
+    assert "stops early" in result["content"]
+
+
+@pytest.mark.asyncio
+async def test_pdf_is_extracted_page_by_page(http_server):
+    http_server.routes["/paper.pdf"] = (200, {"Content-Type": "application/pdf"}, SAMPLE_PDF)
+    result = await fetch_tool(FetchInput(url=f"{http_server.url}/paper.pdf"))
+    assert result["title"] == "Sample Whitepaper"
+    assert result["author"] == "Unicity Labs"
+    assert "token transfer protocol" in result["content"]
+    assert (result["pages"], result["pages_total"]) == (3, 3)
+
+
+@pytest.mark.asyncio
+async def test_pdf_extraction_stops_at_max_length(http_server):
+    http_server.routes["/paper"] = (200, {"Content-Type": "application/octet-stream"}, SAMPLE_PDF)
+    result = await fetch_tool(FetchInput(url=f"{http_server.url}/paper", max_length=10))
+    assert result["pages"] == 1
+    assert result["content"].startswith("Page one")
+    assert "Page two" not in result["content"]
+
+
+@pytest.mark.asyncio
+async def test_query_returns_relevant_passages_with_offsets(http_server):
+    body = "\n\n".join([
+        "Intro paragraph about nothing in particular, repeated to be long enough. " * 3,
+        "The refund policy allows returns within thirty days of purchase for a full refund. " * 2,
+        "Closing paragraph about shipping times and unrelated logistics matters. " * 3,
+    ]).encode()
+    http_server.routes["/policy.txt"] = (200, {"Content-Type": "text/plain"}, body)
+    result = await fetch_tool(FetchInput(url=f"{http_server.url}/policy.txt", query="refund returns", max_length=500))
+    assert result["total_length"] == len(body)
+    [passage] = result["passages"]
+    assert body.decode()[passage["start"]:passage["end"]].startswith("The refund policy")
+    assert "Intro paragraph" not in result["content"]
+
+    more = await fetch_tool(FetchInput(url=f"{http_server.url}/policy.txt", offset=passage["end"], max_length=500))
+    assert more["content"].lstrip().startswith("Closing paragraph")
+
+
+@pytest.mark.asyncio
+async def test_extraction_is_shared_across_formats_and_urls(http_server, monkeypatch):
+    calls = []
+    extract_all = fetch.extraction.extract_all
+
+    def counting_extract_all(html, **kwargs):
+        calls.append(html)
+        return extract_all(html, **kwargs)
+
+    monkeypatch.setattr(fetch.extraction, "extract_all", counting_extract_all)
+    http_server.routes["/a.html"] = (200, {"Content-Type": "text/html"}, ARTICLE)
+    http_server.routes["/mirror/a.html"] = (200, {"Content-Type": "text/html"}, ARTICLE)
+
+    markdown = await fetch_tool(FetchInput(url=f"{http_server.url}/a.html", format="markdown"))
+    text = await fetch_tool(FetchInput(url=f"{http_server.url}/a.html", format="text"))
+    mirrored = await fetch_tool(FetchInput(url=f"{http_server.url}/mirror/a.html", format="text"))
+
+    assert len(calls) == 1
+    assert markdown["extraction_cache"] == "miss"
+    assert text["extraction_cache"] == mirrored["extraction_cache"] == "hit"
+    assert set(text["timings"]) == {"download"}
+    assert text["content"] == mirrored["content"]
+    assert text["title"] == markdown["title"] == "Streaming"
+    assert "Bytes arrive in chunks" in markdown["content"]
+
+
+@pytest.mark.asyncio
+async def test_markdown_is_rendered_from_a_cached_text_extraction(http_server, monkeypatch):
+    calls = []
+    extract_all = fetch.extraction.extract_all
+
+    def counting_extract_all(html, **kwargs):
+        calls.append(kwargs.get("formats"))
+        return extract_all(html, **kwargs)
+
+    monkeypatch.setattr(fetch.extraction, "extract_all", counting_extract_all)
+    http_server.routes["/a.html"] = (200, {"Content-Type": "text/html"}, ARTICLE)
+
+    text = await fetch_tool(FetchInput(url=f"{http_server.url}/a.html", format="text"))
+    first, second = await asyncio.gather(*(
+        fetch_tool(FetchInput(url=f"{http_server.url}/a.html", format="markdown")) for _ in range(2)
+    ))
+
+    # Only the text was rendered by the extraction; markdown once, on demand
+    assert calls == [("text",)]
+    assert (text["extraction_cache"], first["extraction_cache"], second["extraction_cache"]) == ("miss", "hit", "hit")
+    assert "Bytes arrive in chunks" in text["content"]
+    assert first["content"] == second["content"]
+    assert "Bytes arrive in chunks" in first["content"]
+    assert fetch.extraction_cache.stats()["renders"] == 1
+    assert "markdown" in fetch.extraction_cache._entries[next(iter(fetch.extraction_cache._entries))][0]["formats"]
+
+
+@pytest.mark.asyncio
+async def test_hostile_markup_is_pruned_and_reported(http_server):
+    body = (
+        b"<html><head><title>Hostile</title><script>" + b"var filler = 1;" * 50000 + b"</script></head><body>"
+        + b"<div>" * 150
+        + b"<p>" + b"Nested far below the cap, this text still reaches the reader. " * 20 + b"</p>"
+        + b"</div>" * 150 + b"</body></html>"
+    )
+    http_server.routes["/hostile.html"] = (200, {"Content-Type": "text/html"}, body)
+    result = await fetch_tool(FetchInput(url=f"{http_server.url}/hostile.html", format="text"))
+
+    assert result["extraction_limits"] == ["max_depth"]
+    assert "prune" in result["timings"]
+    assert "this text still reaches the reader" in result["content"]
+    assert "filler" not in result["content"]
@@ -0,0 +1,72 @@
+import asyncio
+import time
+
+import pytest
+
+from src.tools import fetch_many
+from src.tools.fetch_many import FetchManyInput, fetch_many_tool
+
+
+@pytest.fixture
+def fake_fetch(monkeypatch):
+    """Replace fetch_tool with a stub that sleeps per URL and tracks concurrency."""
+    state = {"delays": {}, "active": 0, "peak": 0, "calls": []}
+
+    async def fetch_tool(input):
+        url = str(input.url)
+        state["calls"].append(url)
+        state["active"] += 1
+        state["peak"] = max(state["peak"], state["active"])
+        try:
+            await asyncio.sleep(state["delays"].get(url, 0.05))
+        finally:
+            state["active"] -= 1
+        if "broken" in url:
+            return {"error": "HTTP 500: Error", "url": url, "message": "boom"}
+        return {"url": url, "title": url, "content": "ok", "length": 2}
+
+    monkeypatch.setattr(fetch_many, "fetch_tool", fetch_tool)
+    return state
+
+
+@pytest.mark.asyncio
+async def test_results_keep_input_order_with_per_url_errors(fake_fetch):
+    fake_fetch["delays"]["https://a.example/1"] = 0.2
+    urls = ["https://a.example/1", "https://b.example/broken", "https://c.example/3"]
+    result = await fetch_many_tool(FetchManyInput(urls=urls))
+    assert [r["url"] for r in result["results"]] == urls
+    assert result["succeeded"] == 2 and result["failed"] == 1
+    assert "error" in result["results"][1]
+    assert all("elapsed_ms" in r for r in result["results"])
+
+
+@pytest.mark.asyncio
+async def test_global_and_per_host_limits(fake_fetch, monkeypatch):
+    monkeypatch.setattr(fetch_many, "FETCH_MANY_CONCURRENCY", 3)
+    monkeypatch.setattr(fetch_many, "FETCH_MANY_PER_HOST", 1)
+    urls = [f"https://same.example/{i}" for i in range(4)]
+    await fetch_many_tool(FetchManyInput(urls=urls))
+    assert fake_fetch["peak"] == 1
+
+    fake_fetch["peak"] = 0
+    urls = [f"https://host{i}.example/" for i in range(6)]
+    await fetch_many_tool(FetchManyInput(urls=urls))
+    assert fake_fetch["peak"] == 3
+
+
+@pytest.mark.asyncio
+async def test_deadline_cancels_slow_urls_only(fake_fetch):
+    fake_fetch["delays"]["https://slow.example/"] = 10
+    start = time.perf_counter()
+    result = await fetch_many_tool(FetchManyInput(urls=["https://slow.example/", "https://fast.example/"], deadline=0.5))
+    assert time.perf_counter() - start < 2
+    slow, fast = result["results"]
+    assert "Deadline" in slow["error"]
+    assert fast["content"] == "ok"
+
+
+@pytest.mark.asyncio
+async def test_duplicate_urls_are_fetched_once(fake_fetch):
+    result = await fetch_many_tool(FetchManyInput(urls=["https://a.example/", "https://a.example/"]))
+    assert fake_fetch["calls"] == ["https://a.example/"]
+    assert result["count"] == 2
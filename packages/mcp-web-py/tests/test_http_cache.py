@@ -0,0 +1,93 @@
+import time
+
+import pytest
+
+from src.services.http_cache import HttpCache, freshness_lifetime, is_storable
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return HttpCache(directory=str(tmp_path), max_bytes=1024 * 1024)
+
+
+def test_freshness_prefers_max_age_over_expires():
+    headers = {"Cache-Control": "public, max-age=60", "Expires": "Thu, 01 Jan 1970 00:00:00 GMT"}
+    assert freshness_lifetime(headers, time.time()) == 60
+
+
+def test_private_and_no_store_are_not_storable():
+    assert not is_storable("GET", {}, 200, {"Cache-Control": "private, max-age=60"})
+    assert not is_storable("GET", {}, 200, {"Cache-Control": "no-store"})
+    assert not is_storable("POST", {}, 200, {"Cache-Control": "max-age=60"})
+    assert not is_storable("GET", {"Authorization": "x"}, 200, {"Cache-Control": "max-age=60"})
+    assert is_storable("GET", {}, 200, {"ETag": '"v1"'})
+
+
+@pytest.mark.asyncio
+async def test_fresh_response_is_served_from_disk(cache, http_server):
+    calls = []
+
+    def page(handler):
+        calls.append(handler.path)
+        return 200, {"Content-Type": "text/html", "Cache-Control": "max-age=300"}, b"<p>hi</p>"
+
+    http_server.routes["/page"] = page
+    first = await cache.request("GET", f"{http_server.url}/page", timeout=5)
+    second = await cache.request("GET", f"{http_server.url}/page", timeout=5)
+
+    assert (first.cache, second.cache) == ("miss", "hit")
+    assert second.text == "<p>hi</p>"
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_stale_response_is_revalidated_with_etag(cache, http_server):
+    def page(handler):
+        if handler.headers.get("If-None-Match") == '"v1"':
+            return 304, {"ETag": '"v1"'}, b""
+        return 200, {"Content-Type": "text/plain", "ETag": '"v1"', "Cache-Control": "no-cache"}, b"body"
+
+    http_server.routes["/etag"] = page
+    first = await cache.request("GET", f"{http_server.url}/etag", timeout=5)
+    second = await cache.request("GET", f"{http_server.url}/etag", timeout=5)
+
+    assert (first.cache, second.cache) == ("miss", "revalidated")
+    assert second.status_code == 200
+    assert second.text == "body"
+
+
+@pytest.mark.asyncio
+async def test_lru_eviction_keeps_cache_under_budget(tmp_path, http_server):
+    cache = HttpCache(directory=str(tmp_path), max_bytes=3000)
+    body = b"x" * 1000
+    for name in ("a", "b", "c"):
+        http_server.routes[f"/{name}"] = (200, {"Cache-Control": "max-age=300"}, body)
+        await cache.request("GET", f"{http_server.url}/{name}", timeout=5)
+
+    stats = cache.stats()
+    assert stats["bytes"] <= 3000
+    assert stats["evictions"] >= 1
+    # Oldest entry went first
+    assert (await cache.request("GET", f"{http_server.url}/c", timeout=5)).cache == "hit"
+    assert (await cache.request("GET", f"{http_server.url}/a", timeout=5)).cache == "miss"
+
+
+@pytest.mark.asyncio
+async def test_workers_sharing_a_directory_see_each_others_entries(tmp_path, http_server):
+    calls = []
+
+    def page(handler):
+        calls.append(handler.path)
+        return 200, {"Content-Type": "text/html", "Cache-Control": "max-age=300"}, b"<p>shared</p>"
+
+    http_server.routes["/shared"] = page
+    worker_a = HttpCache(directory=str(tmp_path), max_bytes=1024 * 1024, shared=True)
+    worker_b = HttpCache(directory=str(tmp_path), max_bytes=1024 * 1024, shared=True)
+    worker_b._load_index()  # b's index predates a's write
+
+    first = await worker_a.request("GET", f"{http_server.url}/shared", timeout=5)
+    second = await worker_b.request("GET", f"{http_server.url}/shared", timeout=5)
+
+    assert (first.cache, second.cache) == ("miss", "hit")
+    assert len(calls) == 1
+    assert worker_b.stats()["entries"] == 1
@@ -0,0 +1,55 @@
+import pytest
+
+from src.services.http_client import HttpClientPool
+
+
+@pytest.mark.asyncio
+async def test_connections_are_reused_across_requests(http_server):
+    http_server.routes["/ping"] = (200, {"Content-Type": "text/plain"}, b"pong")
+    pool = HttpClientPool()
+    try:
+        for _ in range(3):
+            response = await pool.get(f"{http_server.url}/ping", timeout=5)
+            assert response.text == "pong"
+    finally:
+        await pool.close()
+
+    stats = pool.stats()
+    assert stats["requests"] == 3
+    assert stats["new_connections"] == 1
+    assert stats["reused_connections"] == 2
+
+
+@pytest.mark.asyncio
+async def test_close_is_idempotent_and_session_recreated_lazily(http_server):
+    http_server.routes["/ping"] = (200, {}, b"pong")
+    pool = HttpClientPool()
+    await pool.close()
+    response = await pool.get(f"{http_server.url}/ping", timeout=5)
+    assert response.status_code == 200
+    await pool.close()
+    assert pool.stats()["active"] is False
+
+
+@pytest.mark.asyncio
+async def test_max_bytes_stops_download_and_inspect_can_abort(http_server):
+    http_server.routes["/big"] = (200, {"Content-Type": "text/html"}, b"x" * 1_000_000)
+    http_server.routes["/zip"] = (200, {"Content-Type": "application/zip"}, b"PK\x03\x04" + b"\0" * 100_000)
+    pool = HttpClientPool()
+    try:
+        response = await pool.get(f"{http_server.url}/big", timeout=5, max_bytes=10_000)
+        assert response.truncated is True
+        assert len(response.content) == 10_000
+
+        def reject(resp, head):
+            if head.startswith(b"PK"):
+                raise ValueError("binary")
+
+        with pytest.raises(ValueError):
+            await pool.get(f"{http_server.url}/zip", timeout=5, inspect=reject)
+
+        response = await pool.get(f"{http_server.url}/big", timeout=5, inspect=lambda r, h: 100)
+        assert len(response.content) == 100
+        assert response.truncated is True
+    finally:
+        await pool.close()
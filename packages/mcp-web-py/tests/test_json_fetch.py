@@ -0,0 +1,62 @@
+import json
+
+import pytest
+
+from src.services.http_cache import HttpCache
+from src.tools import json_fetch
+from src.tools.json_fetch import JsonFetchInput, json_fetch_tool
+
+PAYLOAD = json.dumps({
+    "data": {"id": 42, "items": [{"name": f"item-{i}", "blob": "x" * 1000} for i in range(500)]},
+}).encode()
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(json_fetch, "http_cache", HttpCache(directory=str(tmp_path), max_bytes=0))
+
+
+@pytest.fixture
+def api(http_server):
+    http_server.routes["/api"] = (200, {"Content-Type": "application/json", "X-Trace": "abc"}, PAYLOAD)
+    return f"{http_server.url}/api"
+
+
+@pytest.mark.asyncio
+async def test_full_response_without_headers_by_default(api):
+    result = await json_fetch_tool(JsonFetchInput(url=api))
+    assert result["data"]["data"]["id"] == 42
+    assert result["size"] == len(PAYLOAD)
+    assert "headers" not in result
+
+    result = await json_fetch_tool(JsonFetchInput(url=api, include_headers=True))
+    assert {k.lower(): v for k, v in result["headers"].items()}["x-trace"] == "abc"
+
+
+@pytest.mark.asyncio
+async def test_path_projects_selected_values(api):
+    result = await json_fetch_tool(JsonFetchInput(url=api, path="$.data.items[0:3].name"))
+    assert result["data"] == ["item-0", "item-1", "item-2"]
+    assert result["matched"] == 3
+
+    result = await json_fetch_tool(JsonFetchInput(url=api, path="$.data.id"))
+    assert result["data"] == 42
+
+
+@pytest.mark.asyncio
+async def test_size_cap_needs_a_path_that_fits_the_prefix(api):
+    result = await json_fetch_tool(JsonFetchInput(url=api, max_bytes=20_000))
+    assert "exceeds 20000 bytes" in result["error"]
+
+    result = await json_fetch_tool(JsonFetchInput(url=api, max_bytes=20_000, path="$.data.items[1].name"))
+    assert result["data"] == "item-1"
+    assert result["size"] == 20_000
+
+    result = await json_fetch_tool(JsonFetchInput(url=api, max_bytes=20_000, path="$.data.items[400].name"))
+    assert "exceeds" in result["error"]
+
+
+@pytest.mark.asyncio
+async def test_invalid_path_is_reported(api):
+    result = await json_fetch_tool(JsonFetchInput(url=api, path="$..name"))
+    assert result["error"].startswith("Invalid path")
@@ -0,0 +1,48 @@
+import json
+
+import pytest
+
+from src.services.json_path import JsonPath, JsonPathError
+
+DOC = json.dumps({
+    "data": {
+        "id": 7,
+        "items": [{"name": f"n{i}", "tags": [i, i + 1]} for i in range(6)],
+        "meta": {"total": 6, "next page": None},
+    },
+    "tail": list(range(1000)),
+}).encode()
+
+
+@pytest.mark.parametrize("expression, expected", [
+    ("$", [json.loads(DOC)]),
+    ("$.data.id", [7]),
+    ("data.items[*].name", [f"n{i}" for i in range(6)]),
+    ("$.data.items[1:3]", [{"name": "n1", "tags": [1, 2]}, {"name": "n2", "tags": [2, 3]}]),
+    ("$.data.items[2].tags[1]", [3]),
+    ("$['data']['meta']['next page']", [None]),
+    ("$.data.meta.*", [6, None]),
+    ("$.nope", []),
+])
+def test_select(expression, expected):
+    matches, _ = JsonPath(expression).select(DOC)
+    assert matches == expected
+
+
+def test_parsing_stops_once_nothing_more_can_match():
+    # Everything after the selection is cut off: it must never be decoded
+    cut = DOC.index(b'"meta"')
+    assert JsonPath("$.data.items[0:2].name").select(DOC[:cut]) == (["n0", "n1"], False)
+    assert JsonPath("$.data.id").select(DOC[:cut]) == ([7], False)
+    assert JsonPath("$.data.items[*].name").select(DOC[:cut]) == ([f"n{i}" for i in range(6)], False)
+
+
+def test_single_paths_know_they_are_single():
+    assert JsonPath("$.data.items[2].name").single
+    assert not JsonPath("$.data.items[*].name").single
+
+
+@pytest.mark.parametrize("expression", ["$..name", "$.items[-1]", "$.items[?(@.x)]", "$.a b"])
+def test_unsupported_syntax_is_rejected(expression):
+    with pytest.raises(JsonPathError):
+        JsonPath(expression)
@@ -0,0 +1,98 @@
+
+import pytest
+
+from src import server
+from src.services import metrics
+from src.services.metrics import Registry
+
+pytestmark = pytest.mark.usefixtures("isolated_services")
+
+PAGE = (
+    b"<html><head><title>Measured</title></head><body><article>"
+    + b"<p>" + b"Histograms show the tail that averages hide. " * 30 + b"</p>"
+    + b"</article></body></html>"
+)
+
+
+def observations(histogram, *labels) -> int:
+    return sum(histogram.labels(*labels).counts)
+
+
+def test_histogram_exposition_is_cumulative():
+    registry = Registry()
+    latency = registry.histogram("op_seconds", "Op latency.", ("op",), buckets=(0.1, 1.0))
+    errors = registry.counter("op_errors_total", "Op errors.", ("op",))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        latency.labels("read").observe(value)
+    errors.labels('say "hi"\n').inc()
+
+    text = registry.render()
+
+    assert "# TYPE op_seconds histogram" in text
+    assert 'op_seconds_bucket{op="read",le="0.1"} 2' in text
+    assert 'op_seconds_bucket{op="read",le="1"} 3' in text
+    assert 'op_seconds_bucket{op="read",le="+Inf"} 4' in text
+    assert 'op_seconds_sum{op="read"} 3.65' in text
+    assert 'op_seconds_count{op="read"} 4' in text
+    assert 'op_errors_total{op="say \\"hi\\"\\n"} 1' in text
+
+
+def test_metrics_validate_labels_and_names():
+    registry = Registry()
+    gauge = registry.gauge("busy", "Busy.")
+
+    with gauge.track():
+        assert "busy 1" in registry.render()
+    assert "busy 0" in registry.render()
+    with pytest.raises(ValueError):
+        registry.counter("busy", "Again.")
+    with pytest.raises(ValueError):
+        registry.counter("things_total", "Things.", ("kind",)).labels("a", "b")
+
+
+@pytest.mark.asyncio
+async def test_tool_call_records_latency_stages_and_cache(http_server, mcp_request):
+    http_server.routes["/page.html"] = (200, {"Content-Type": "text/html"}, PAGE)
+    before = {
+        "rpc": observations(metrics.rpc_seconds, "tools/call"),
+        "tool": observations(metrics.tool_seconds, "fetch"),
+        "download": observations(metrics.fetch_stage_seconds, "html", "download"),
+        "extract": observations(metrics.fetch_stage_seconds, "html", "extract"),
+        "misses": metrics.cache_requests.labels("extraction", "miss").value,
+    }
+
+    response = await server.handle_messages(mcp_request({
+        "jsonrpc": "2.0", "id": 1, "method": "tools/call",
+        "params": {"name": "fetch", "arguments": {"url": f"{http_server.url}/page.html"}},
+    }))
+
+    assert response.status_code == 200
+    assert observations(metrics.rpc_seconds, "tools/call") == before["rpc"] + 1
+    assert observations(metrics.tool_seconds, "fetch") == before["tool"] + 1
+    assert observations(metrics.fetch_stage_seconds, "html", "download") == before["download"] + 1
+    assert observations(metrics.fetch_stage_seconds, "html", "extract") == before["extract"] + 1
+    assert metrics.cache_requests.labels("extraction", "miss").value == before["misses"] + 1
+    assert metrics.rpc_in_flight.labels().value == 0
+
+
+@pytest.mark.asyncio
+async def test_errors_are_counted_and_unknown_names_bounded(mcp_request):
+    unknown_method = metrics.rpc_errors.labels("other", "-32601").value
+    unknown_tool = metrics.tool_errors.labels("other", "exception").value
+
+    await server.handle_messages(mcp_request({"jsonrpc": "2.0", "id": 2, "method": "no/such"}))
+    await server.call_tool("no_such_tool", {})
+
+    assert metrics.rpc_errors.labels("other", "-32601").value == unknown_method + 1
+    assert metrics.tool_errors.labels("other", "exception").value == unknown_tool + 1
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_serves_text_format():
+    response = await server.handle_metrics(None)
+    text = response.body.decode()
+
+    assert response.media_type == metrics.CONTENT_TYPE
+    assert "# TYPE mcp_tool_duration_seconds histogram" in text
+    assert "# TYPE web_search_fallbacks_total counter" in text
+    assert "mcp_rpc_in_flight 0" in text
@@ -0,0 +1,45 @@
+from src.services.passages import GAP_MARKER, select_passages, split_passages
+
+FILLER = "General remarks about the project history and the people involved in it. " * 3
+DOC = "\n\n".join([
+    "# Handbook",
+    FILLER,
+    "Validators stake tokens and the consensus protocol finalizes blocks every second. " * 2,
+    FILLER,
+    "Token transfers are signed offline and aggregated by the consensus layer. " * 2,
+    FILLER,
+])
+
+
+def test_passages_cover_paragraphs_and_merge_short_headings():
+    passages = split_passages(DOC)
+    assert passages[0].start == 0 and DOC[passages[0].start:passages[0].end].startswith("# Handbook\n\n")
+    assert len(passages) == 5
+    for p in passages:
+        assert DOC[p.start:p.end] == DOC[p.start:p.end].strip()
+
+
+def test_long_paragraphs_are_split_at_sentences():
+    text = "A sentence that keeps going for a while. " * 100
+    passages = split_passages(text)
+    assert len(passages) > 1
+    assert all(p.end - p.start <= 1200 for p in passages)
+    assert all(text[p.start:p.end].endswith(".") for p in passages[:-1])
+
+
+def test_best_passages_are_returned_in_document_order_with_offsets():
+    content, passages = select_passages(DOC, "consensus tokens", budget=400)
+    assert [DOC[p.start:p.end][:10] for p in passages] == ["Validators", "Token tran"]
+    assert passages[0].start < passages[1].start
+    assert content.startswith(GAP_MARKER.lstrip("\n"))
+    assert "General remarks" not in content
+
+
+def test_budget_limits_selection_to_best_passage():
+    content, passages = select_passages(DOC, "validators stake finalizes", budget=200)
+    assert len(passages) == 1
+    assert "Validators" in content
+
+
+def test_no_match_returns_nothing():
+    assert select_passages(DOC, "kubernetes", budget=1000) == ("", [])
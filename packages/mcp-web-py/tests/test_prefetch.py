@@ -0,0 +1,173 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.services.prefetch import Prefetcher
+from src.tools import fetch
+from src.tools.fetch import FetchInput, fetch_tool, schedule_prefetch
+
+pytestmark = pytest.mark.usefixtures("isolated_services")
+
+PAGE = (
+    b"<html><head><title>Prefetched</title></head><body><article>"
+    + b"<p>" + b"Speculative downloads make the next read instant. " * 30 + b"</p>"
+    + b"</article></body></html>"
+)
+
+
+def use_prefetcher(monkeypatch, **kwargs) -> Prefetcher:
+    prefetcher = Prefetcher(**{"top_n": 3, "busy": lambda: False, **kwargs})
+    monkeypatch.setattr(fetch, "prefetcher", prefetcher)
+    return prefetcher
+
+
+def counted(body: bytes, delay: float = 0.0, log: list | None = None):
+    """A route serving *body* (no cache headers) that records each request."""
+    active = [0]
+    lock = threading.Lock()
+
+    def respond(handler):
+        with lock:
+            active[0] += 1
+            if log is not None:
+                log.append(active[0])
+        time.sleep(delay)
+        with lock:
+            active[0] -= 1
+        return 200, {"Content-Type": "text/html"}, body
+    return respond
+
+
+async def settle(prefetcher: Prefetcher) -> None:
+    while prefetcher.stats()["queued"] or prefetcher.stats()["running"]:
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_follow_up_fetch_is_served_by_the_prefetch(http_server, monkeypatch):
+    prefetcher = use_prefetcher(monkeypatch)
+    hits = []
+    http_server.routes["/a.html"] = counted(PAGE, log=hits)
+    http_server.routes["/b.html"] = counted(PAGE.replace(b"Prefetched", b"Other"))
+
+    queued = schedule_prefetch([
+        {"url": f"{http_server.url}/a.html"}, {"url": "not a url"}, {"url": f"{http_server.url}/b.html"},
+    ])
+    await settle(prefetcher)
+    result = await fetch_tool(FetchInput(url=f"{http_server.url}/a.html"))
+
+    assert queued == 2
+    assert len(hits) == 1
+    assert result["cache"] == "prefetch"
+    assert result["extraction_cache"] == "hit"
+    assert result["title"] == "Prefetched"
+    stats = prefetcher.stats()
+    assert (stats["completed"], stats["used"], stats["hit_rate"]) == (2, 1, 0.5)
+    assert stats["by_rank"]["1"] == {"completed": 1, "used": 1, "hit_rate": 1.0}
+    assert stats["by_rank"]["3"]["used"] == 0
+
+
+@pytest.mark.asyncio
+async def test_fetch_joins_a_prefetch_in_flight(http_server, monkeypatch):
+    prefetcher = use_prefetcher(monkeypatch)
+    hits = []
+    http_server.routes["/slow.html"] = counted(PAGE, delay=0.3, log=hits)
+
+    schedule_prefetch([{"url": f"{http_server.url}/slow.html"}])
+    await asyncio.sleep(0.1)
+    result = await fetch_tool(FetchInput(url=f"{http_server.url}/slow.html"))
+
+    assert len(hits) == 1
+    assert result["cache"] == "prefetch"
+    assert prefetcher.stats()["joined"] == 1
+
+
+@pytest.mark.asyncio
+async def test_prefetch_yields_to_foreground_work(http_server, monkeypatch):
+    busy = True
+    prefetcher = use_prefetcher(monkeypatch, busy=lambda: busy, max_wait=5)
+    hits = []
+    http_server.routes["/a.html"] = counted(PAGE, log=hits)
+
+    schedule_prefetch([{"url": f"{http_server.url}/a.html"}])
+    await asyncio.sleep(0.2)
+    assert hits == []
+    assert prefetcher.stats()["queued"] == 1
+
+    busy = False
+    await settle(prefetcher)
+    assert len(hits) == 1
+
+
+@pytest.mark.asyncio
+async def test_queued_prefetch_is_taken_over_or_expires(http_server, monkeypatch):
+    prefetcher = use_prefetcher(monkeypatch, busy=lambda: True, max_wait=0.2)
+    hits = []
+    http_server.routes["/a.html"] = counted(PAGE, log=hits)
+    http_server.routes["/b.html"] = counted(PAGE)
+
+    schedule_prefetch([{"url": f"{http_server.url}/a.html"}, {"url": f"{http_server.url}/b.html"}])
+    result = await fetch_tool(FetchInput(url=f"{http_server.url}/a.html"))
+    await settle(prefetcher)
+
+    assert result["cache"] == "miss"
+    assert len(hits) == 1
+    stats = prefetcher.stats()
+    assert (stats["promoted"], stats["expired"], stats["completed"]) == (1, 1, 0)
+
+
+@pytest.mark.asyncio
+async def test_prefetch_respects_per_host_and_queue_limits(http_server, monkeypatch):
+    prefetcher = use_prefetcher(monkeypatch, top_n=10, concurrency=4, per_host=1, queue_size=3)
+    concurrent = []
+    for name in "abcd":
+        http_server.routes[f"/{name}.html"] = counted(PAGE + name.encode(), delay=0.1, log=concurrent)
+
+    queued = schedule_prefetch([{"url": f"{http_server.url}/{name}.html"} for name in "abcd"])
+    await settle(prefetcher)
+
+    assert queued == 3
+    assert prefetcher.stats()["dropped"] == 1
+    assert max(concurrent) == 1
+
+
+@pytest.mark.asyncio
+async def test_prefetch_is_skipped_when_it_downloaded_too_little(http_server, monkeypatch):
+    use_prefetcher(monkeypatch)
+    # Byte caps of 50000 for the default max_length, 100000 for the larger read
+    monkeypatch.setattr(fetch, "FETCH_MIN_BYTES", 1000)
+    monkeypatch.setattr(fetch, "_HTML_BYTES_PER_CHAR", 1)
+    hits = []
+    http_server.routes["/long.html"] = counted(PAGE * 50, log=hits)
+
+    schedule_prefetch([{"url": f"{http_server.url}/long.html"}])
+    await settle(fetch.prefetcher)
+    # A larger read than the prefetch's default max_length needs the full page
+    result = await fetch_tool(FetchInput(url=f"{http_server.url}/long.html", max_length=100000))
+
+    assert len(hits) == 2
+    assert result["cache"] == "miss"
+    assert fetch.http_cache.stats()["prefetched"]["too_short"] == 1
+
+
+def test_disabled_prefetcher_queues_nothing():
+    assert Prefetcher(top_n=0).schedule(["https://example.com/"], fetch_tool) == 0
+
+
+@pytest.mark.asyncio
+async def test_search_tool_call_schedules_prefetch(http_server, monkeypatch):
+    from src import server
+
+    prefetcher = use_prefetcher(monkeypatch)
+    http_server.routes["/a.html"] = counted(PAGE)
+
+    async def found(input):
+        return {"query": input.query, "results": [{"url": f"{http_server.url}/a.html", "position": 1}]}
+
+    monkeypatch.setattr(server, "search_tool", found)
+    await server.call_tool("search", {"query": "prefetch"})
+    await settle(prefetcher)
+
+    assert prefetcher.stats()["completed"] == 1
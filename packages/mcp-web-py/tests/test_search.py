@@ -0,0 +1,116 @@
+import asyncio
+
+import pytest
+
+from src.services.circuit_breaker import CircuitBreaker
+from src.tools import search
+
+
+@pytest.fixture
+def upstreams(monkeypatch):
+    """Replace both search backends with controllable fakes."""
+    calls = {"searxng": 0, "ddgs": 0}
+    behaviour = {"searxng": (0.0, None), "ddgs": (0.0, None)}
+
+    def fake(name):
+        async def run(query, max_results, region):
+            calls[name] += 1
+            delay, error = behaviour[name]
+            await asyncio.sleep(delay)
+            if error:
+                raise error
+            return [{"title": name, "url": f"https://{name}.example", "description": "", "engine": name}]
+
+        return run
+
+    monkeypatch.setattr(search, "_search_searxng", fake("searxng"))
+    monkeypatch.setattr(search, "_search_ddgs", fake("ddgs"))
+    monkeypatch.setattr(search, "searxng_breaker", CircuitBreaker("searxng", failure_threshold=2, recovery_time=60))
+    monkeypatch.setattr(search, "SEARCH_HEDGE_DELAY", 0.05)
+    return calls, behaviour
+
+
+@pytest.mark.asyncio
+async def test_fast_searxng_wins_without_hedging(upstreams):
+    calls, _ = upstreams
+    results, source = await search._search_auto("q", 5, "wt-wt")
+    assert source == "searxng"
+    assert calls == {"searxng": 1, "ddgs": 0}
+
+
+@pytest.mark.asyncio
+async def test_slow_searxng_is_hedged_and_loser_cancelled(upstreams):
+    calls, behaviour = upstreams
+    behaviour["searxng"] = (5.0, None)
+
+    start = asyncio.get_running_loop().time()
+    results, source = await search._search_auto("q", 5, "wt-wt")
+    elapsed = asyncio.get_running_loop().time() - start
+
+    assert source == "ddgs"
+    assert elapsed < 1.0
+    await asyncio.sleep(0)  # let the cancelled SearXNG task report to the breaker
+    assert search.searxng_breaker.failures == 1
+
+
+@pytest.mark.asyncio
+async def test_open_breaker_goes_straight_to_ddgs(upstreams):
+    calls, behaviour = upstreams
+    behaviour["searxng"] = (0.0, RuntimeError("down"))
+
+    for _ in range(2):
+        _, source = await search._search_auto("q", 5, "wt-wt")
+        assert source == "ddgs"
+    assert search.searxng_breaker.state == "open"
+
+    _, source = await search._search_auto("q", 5, "wt-wt")
+    assert source == "ddgs"
+    assert calls["searxng"] == 2
+
+
+@pytest.mark.asyncio
+async def test_cancellation_outside_a_lost_hedge_is_not_a_failure(upstreams):
+    _, behaviour = upstreams
+    behaviour["searxng"] = (5.0, None)
+    search.searxng_breaker.state = "half_open"  # the next call is the probe
+
+    for _ in range(3):  # e.g. the client disconnected mid-search
+        task = asyncio.create_task(search._search_auto("q", 5, "wt-wt"))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    breaker = search.searxng_breaker
+    assert (breaker.failures, breaker.consecutive_failures, breaker.state) == (0, 0, "half_open")
+    assert breaker.allow()  # the abandoned probe did not block the next one
+
+
+@pytest.mark.asyncio
+async def test_hedge_delay_follows_searxng_latency(upstreams, monkeypatch):
+    _, behaviour = upstreams
+    monkeypatch.setattr(search, "SEARCH_HEDGE_DELAY", 5.0)
+    assert search._hedge_delay() == 5.0  # nothing measured yet
+
+    for _ in range(3):
+        await search._search_auto("q", 5, "wt-wt")  # answers in ~0 s
+    assert search._hedge_delay() == search._HEDGE_MIN_DELAY
+
+    behaviour["searxng"] = (5.0, None)
+    start = asyncio.get_running_loop().time()
+    _, source = await search._search_auto("q", 5, "wt-wt")
+    assert source == "ddgs"
+    assert asyncio.get_running_loop().time() - start < 1.0
+
+
+@pytest.mark.asyncio
+async def test_explicit_searxng_respects_an_open_breaker(upstreams):
+    calls, behaviour = upstreams
+    behaviour["searxng"] = (0.0, RuntimeError("down"))
+
+    for _ in range(2):
+        with pytest.raises(RuntimeError, match="down"):
+            await search._search("q", 5, "wt-wt", "searxng")
+    with pytest.raises(RuntimeError, match="circuit open"):
+        await search._search("q", 5, "wt-wt", "searxng")
+    assert calls["searxng"] == 2
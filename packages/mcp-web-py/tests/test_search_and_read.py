@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+
+from src import server
+from src.tools import fetch_many, search_and_read
+from src.tools.search_and_read import SearchAndReadInput, search_and_read_tool
+
+
+@pytest.fixture
+def stubs(monkeypatch):
+    state = {"results": [], "delays": {}, "fetched": [], "sources": []}
+
+    async def search_tool(input):
+        state["sources"].append(input.source)
+        return {
+            "query": input.query,
+            "results": [dict(r, position=i + 1) for i, r in enumerate(state["results"][:input.max_results])],
+            "count": min(len(state["results"]), input.max_results),
+            "source": "searxng",
+            "region": input.region,
+            "cache": "miss",
+        }
+
+    async def fetch_tool(input):
+        url = str(input.url)
+        state["fetched"].append(url)
+        await asyncio.sleep(state["delays"].get(url, 0.01))
+        if "broken" in url:
+            return {"error": "HTTP 404: Not Found", "url": url, "message": "missing"}
+        return {"url": url, "title": f"Page {url}", "content": "body of " + url, "length": 8 + len(url)}
+
+    monkeypatch.setattr(search_and_read, "search_tool", search_tool)
+    monkeypatch.setattr(fetch_many, "fetch_tool", fetch_tool)
+    return state
+
+
+@pytest.mark.asyncio
+async def test_top_results_are_read_and_rest_keep_metadata(stubs):
+    stubs["results"] = [{"title": f"R{i}", "url": f"https://site{i}.example/", "description": "d"} for i in range(5)]
+    result = await search_and_read_tool(SearchAndReadInput(query="q", max_results=4, read=2))
+    assert result["count"] == 4 and result["read"] == 2
+    first, second, third, _ = result["results"]
+    assert first["title"] == "R0" and first["content"] == "body of https://site0.example/"
+    assert second["position"] == 2 and "content" in second
+    assert "content" not in third and "read_error" not in third
+    assert stubs["fetched"] == ["https://site0.example/", "https://site1.example/"]
+
+
+@pytest.mark.asyncio
+async def test_read_errors_and_deadline_are_reported_per_result(stubs):
+    stubs["results"] = [
+        {"title": "slow", "url": "https://slow.example/", "description": ""},
+        {"title": "broken", "url": "https://broken.example/", "description": ""},
+        {"title": "ok", "url": "https://ok.example/", "description": ""},
+    ]
+    stubs["delays"]["https://slow.example/"] = 10
+    result = await search_and_read_tool(SearchAndReadInput(query="q", read=3, deadline=1))
+    slow, broken, ok = result["results"]
+    assert "Deadline" in slow["read_error"]
+    assert broken["read_error"].startswith("HTTP 404")
+    assert ok["content"] == "body of https://ok.example/"
+    assert result["elapsed_ms"] < 2000
+
+
+@pytest.mark.asyncio
+async def test_malformed_url_is_a_per_result_read_error(stubs):
+    stubs["results"] = [
+        {"title": "bad", "url": "http://exa mple.com/", "description": "kept"},
+        {"title": "ok", "url": "https://ok.example/", "description": ""},
+    ]
+    result = await search_and_read_tool(SearchAndReadInput(query="q", read=2))
+    bad, ok = result["results"]
+    assert bad["read_error"].startswith("Invalid URL")
+    assert (bad["title"], bad["description"], bad["url"]) == ("bad", "kept", "http://exa mple.com/")
+    assert ok["content"] == "body of https://ok.example/"
+    assert stubs["fetched"] == ["https://ok.example/"]
+
+@pytest.mark.asyncio
+async def test_search_errors_are_passed_through(monkeypatch):
+    async def failing_search(input):
+        return {"error": "boom", "query": input.query, "message": "Search failed. Please try again."}
+
+    monkeypatch.setattr(search_and_read, "search_tool", failing_search)
+    result = await search_and_read_tool(SearchAndReadInput(query="q"))
+    assert result["error"] == "boom"
+
+
+@pytest.mark.asyncio
+async def test_source_is_passed_through_the_tool_call(stubs):
+    stubs["results"] = [{"title": "A", "url": "https://a.example/"}]
+    [schema] = [tool.inputSchema for tool in await server.list_tools() if tool.name == "search_and_read"]
+
+    await server.call_tool("search_and_read", {"query": "q", "read": 0, "source": "ddgs"})
+    await server.call_tool("search_and_read", {"query": "q", "read": 0})
+
+    assert schema["properties"]["source"]["enum"] == ["auto", "searxng", "ddgs"]
+    assert stubs["sources"] == ["ddgs", "auto"]
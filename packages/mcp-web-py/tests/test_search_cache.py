@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+
+from src.services import deadline
+from src.services.search_cache import SearchCache, normalize_query
+
+
+def _fetcher(calls, delay=0.0):
+    async def fetch(n):
+        calls.append(n)
+        await asyncio.sleep(delay)
+        return [{"url": f"https://example.com/{i}"} for i in range(n)], "searxng"
+
+    return fetch
+
+
+def test_normalize_query():
+    assert normalize_query("  Python   FastMCP ") == normalize_query("python fastmcp")
+
+
+@pytest.mark.asyncio
+async def test_larger_cached_set_serves_smaller_request():
+    cache, calls = SearchCache(ttl=60, stale=60), []
+    key = ("q", "wt-wt", "auto")
+    await cache.get_or_fetch(key, 20, _fetcher(calls))
+    results, source, status = await cache.get_or_fetch(key, 5, _fetcher(calls))
+
+    assert status == "hit"
+    assert len(results) == 5
+    assert calls == [20]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_searches_share_one_upstream_call():
+    cache, calls = SearchCache(ttl=60, stale=60), []
+    key = ("q", "wt-wt", "auto")
+    outcomes = await asyncio.gather(*(cache.get_or_fetch(key, 10, _fetcher(calls, 0.05)) for _ in range(5)))
+
+    assert calls == [10]
+    assert sorted(o[2] for o in outcomes) == ["coalesced"] * 4 + ["miss"]
+    assert cache.stats()["upstream_calls_avoided"] == 4
+
+
+@pytest.mark.asyncio
+async def test_stale_entry_is_served_while_refreshing():
+    cache, calls = SearchCache(ttl=0.01, stale=60), []
+    key = ("q", "wt-wt", "auto")
+    await cache.get_or_fetch(key, 3, _fetcher(calls))
+    await asyncio.sleep(0.02)
+    _, _, status = await cache.get_or_fetch(key, 3, _fetcher(calls))
+    await asyncio.sleep(0.01)
+
+    assert status == "stale"
+    assert calls == [3, 3]
+
+
+@pytest.mark.asyncio
+async def test_errors_are_not_cached():
+    cache = SearchCache(ttl=60, stale=60)
+
+    async def failing(n):
+        raise RuntimeError("upstream down")
+
+    with pytest.raises(RuntimeError):
+        await cache.get_or_fetch(("q", "wt-wt", "auto"), 10, failing)
+    assert cache.stats()["entries"] == 0
+
+
+@pytest.mark.asyncio
+async def test_stale_refresh_outlives_a_short_request_deadline():
+    cache, calls = SearchCache(ttl=0.05, stale=60), []
+    key = ("q", "wt-wt", "auto")
+
+    async def fetch(n):
+        calls.append(n)
+        await asyncio.sleep(0.1)
+        deadline.clamp(10)  # raises if the caller's budget leaked into the refresh
+        return [{"url": f"https://example.com/{len(calls)}"}], "searxng"
+
+    await cache.get_or_fetch(key, 5, fetch)
+    await asyncio.sleep(0.06)
+    with deadline.budget(0.05):
+        _, _, status = await cache.get_or_fetch(key, 5, fetch)
+    assert status == "stale"
+    await asyncio.gather(*cache._background)
+
+    results, _, status = await cache.get_or_fetch(key, 5, fetch)
+    assert (status, results[0]["url"], cache.upstream_errors) == ("hit", "https://example.com/2", 0)
@@ -0,0 +1,124 @@
+import asyncio
+import multiprocessing
+import sqlite3
+import time
+
+import pytest
+
+from src.services.extraction_cache import ExtractionCache
+from src.services.search_cache import SearchCache
+from src.services.shared_cache import SharedCache
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "shared.sqlite3")
+
+
+def _write_many(path: str, worker: int) -> None:
+    cache = SharedCache(path=path, max_bytes=10 * 1024 * 1024)
+    for i in range(50):
+        cache._put("ns", f"{worker}-{i}", b"x" * (100 + i), None)
+
+
+@pytest.mark.asyncio
+async def test_roundtrip_and_expiry(path):
+    cache = SharedCache(path=path)
+    await cache.put("ns", "k", b"value")
+    await cache.put("ns", "short", b"value", ttl=0.05)
+    assert await cache.get("ns", "k") == b"value"
+    assert await cache.get("other", "k") is None
+    await asyncio.sleep(0.1)
+    assert await cache.get("ns", "short") is None
+    assert (await cache.stats())["entries"] == 1
+
+
+@pytest.mark.asyncio
+async def test_least_recently_read_entries_are_evicted(path, monkeypatch):
+    monkeypatch.setattr("src.services.shared_cache._TOUCH_INTERVAL", 0)
+    cache = SharedCache(path=path, max_bytes=3000)
+    await cache.put("ns", "a", b"a" * 1000)
+    await cache.put("ns", "b", b"b" * 1000)
+    time.sleep(0.01)
+    assert await cache.get("ns", "a")  # a is now more recent than b
+    await cache.put("ns", "c", b"c" * 1500)
+    assert await cache.get("ns", "b") is None
+    assert await cache.get("ns", "a") and await cache.get("ns", "c")
+    assert (await cache.stats())["bytes"] <= 3000
+    assert cache.evictions == 1
+
+
+def test_concurrent_writers_keep_usage_consistent(path):
+    context = multiprocessing.get_context("spawn")
+    workers = [context.Process(target=_write_many, args=(path, w)) for w in range(4)]
+    for p in workers:
+        p.start()
+    for p in workers:
+        p.join(30)
+        assert p.exitcode == 0
+    stats = asyncio.run(SharedCache(path=path).stats())
+    assert stats["entries"] == 200
+    assert stats["bytes"] == 4 * sum(100 + i for i in range(50))
+
+
+@pytest.mark.asyncio
+async def test_search_results_are_shared_between_workers(path):
+    calls = []
+
+    async def fetch(max_results):
+        calls.append(max_results)
+        return [{"title": "r", "url": "https://example.com"}], "searxng"
+
+    key = ("query", "wt-wt", "auto")
+    worker_a = SearchCache(shared=SharedCache(path=path))
+    worker_b = SearchCache(shared=SharedCache(path=path))
+    await worker_a.get_or_fetch(key, 5, fetch)
+    await worker_a.shared.flush()
+    results, source, status = await worker_b.get_or_fetch(key, 5, fetch)
+
+    assert calls == [5]
+    assert (source, status) == ("searxng", "hit")
+    assert results[0]["title"] == "r"
+    assert worker_b.stats()["shared_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_extraction_results_are_shared_between_workers(path):
+    calls = []
+
+    async def extract():
+        calls.append(1)
+        return {"title": "T", "author": None, "formats": {"markdown": "m", "text": "t", "html": "h"}}
+
+    worker_a = ExtractionCache(shared=SharedCache(path=path))
+    worker_b = ExtractionCache(shared=SharedCache(path=path))
+    await worker_a.get_or_extract("hash", extract)
+    await worker_a.shared.flush()
+    entry, status = await worker_b.get_or_extract("hash", extract)
+
+    assert calls == [1]
+    assert status == "hit"
+    assert entry["formats"]["text"] == "t"
+
+
+@pytest.mark.asyncio
+async def test_locked_database_does_not_delay_a_miss(path, monkeypatch):
+    monkeypatch.setattr("src.services.shared_cache._BUSY_TIMEOUT", 1.0)
+    shared = SharedCache(path=path)
+    await shared.put("ns", "warm", b"x")  # creates the schema
+    blocker = sqlite3.connect(path, isolation_level=None)
+    blocker.execute("BEGIN IMMEDIATE")  # another worker holding the write lock
+
+    async def extract():
+        return {"title": "T", "author": None, "formats": {"markdown": "m", "text": "t", "html": "h"}}
+
+    try:
+        start = time.monotonic()
+        entry, status = await ExtractionCache(shared=shared).get_or_extract("hash", extract)
+        assert time.monotonic() - start < 0.5
+        assert (status, (await shared.stats())["pending_writes"]) == ("miss", 1)
+    finally:
+        blocker.execute("ROLLBACK")
+        blocker.close()
+    await shared.flush()
+    assert await shared.get("extraction", "hash") is not None
@@ -0,0 +1,116 @@
+import asyncio
+import json
+import os
+import time
+
+import pytest
+
+from src import server
+from src.services import tracing
+from src.services.profiler import Profiler
+
+pytestmark = pytest.mark.usefixtures("isolated_services")
+
+PAGE = (
+    b"<html><head><title>Traced</title></head><body><article>"
+    + b"<p>" + b"Spans tell you which stage ate the latency budget. " * 30 + b"</p>"
+    + b"</article></body></html>"
+)
+
+
+def fetch_call(url: str, meta: dict | None = None) -> dict:
+    params = {"name": "fetch", "arguments": {"url": url}}
+    if meta is not None:
+        params["_meta"] = meta
+    return {"jsonrpc": "2.0", "id": 3, "method": "tools/call", "params": params}
+
+
+@pytest.mark.asyncio
+async def test_tool_call_returns_its_spans_on_request(http_server, mcp_request):
+    http_server.routes["/page.html"] = (200, {"Content-Type": "text/html"}, PAGE)
+
+    response = await server.handle_messages(mcp_request(fetch_call(f"{http_server.url}/page.html", {"trace": True})))
+    trace = json.loads(response.body)["result"]["_meta"]["trace"]
+
+    assert (trace["method"], trace["tool"], trace["id"]) == ("tools/call", "fetch", 3)
+    spans = {span["name"]: (index, span) for index, span in enumerate(trace["spans"])}
+    assert {"parse", "admission", "tool", "download", "extraction", "serialize"} <= set(spans)
+    tool_index = spans["tool"][0]
+    assert spans["download"][1]["parent"] == tool_index
+    assert spans["extraction"][1]["parent"] == tool_index
+    assert spans["download"][1]["status"] == 200
+    assert spans["extraction"][1]["cache"] == "miss"
+    assert all(span["duration_ms"] is not None for _, span in spans.values())
+    assert spans["download"][1]["start_ms"] <= spans["extraction"][1]["start_ms"]
+
+
+@pytest.mark.asyncio
+async def test_trace_is_logged_but_not_returned_by_default(http_server, capsys, mcp_request):
+    http_server.routes["/page.html"] = (200, {"Content-Type": "text/html"}, PAGE)
+
+    response = await server.handle_messages(mcp_request(fetch_call(f"{http_server.url}/page.html")))
+
+    assert "_meta" not in json.loads(response.body)["result"]
+    logged = [line for line in capsys.readouterr().out.splitlines() if line.startswith("[Trace] ")]
+    assert json.loads(logged[-1][len("[Trace] "):])["tool"] == "fetch"
+
+
+def test_spans_outside_a_request_are_free_and_bounded():
+    with tracing.span("orphan") as span:
+        span.set(ignored=True)
+    assert tracing.current() is None
+
+    with tracing.start() as trace:
+        for _ in range(tracing._MAX_SPANS + 5):
+            with tracing.span("step"):
+                pass
+    assert len(trace.spans) == tracing._MAX_SPANS
+    assert trace.as_dict()["spans_dropped"] == 5
+
+
+async def _wait_on_upstream():
+    with tracing.span("upstream"):
+        await asyncio.sleep(0.25)
+
+
+def _block_the_loop():
+    time.sleep(0.15)
+
+
+@pytest.mark.asyncio
+async def test_slow_request_profile_is_written(tmp_path):
+    profiler = Profiler(slow_ms=50, interval_ms=5, directory=str(tmp_path), max_files=1)
+
+    with tracing.start() as trace:
+        async with profiler.watch(trace):
+            _block_the_loop()
+            await asyncio.create_task(_wait_on_upstream())
+
+    files = os.listdir(tmp_path)
+    assert len(files) == 1
+    with open(tmp_path / files[0]) as f:
+        profile = json.load(f)
+    assert profile["trace_id"] == trace.id
+    assert profile["samples"] > 5
+    assert any("_block_the_loop" in stack for stack in profile["loop_stacks"])
+    assert any(stack.startswith("_wait_on_upstream") for stack in profile["task_stacks"])
+    assert profiler.stats()["profiled"] == 1
+
+    # Only the newest max_files profiles are kept
+    with tracing.start() as trace:
+        async with profiler.watch(trace):
+            await asyncio.sleep(0.1)
+    assert os.listdir(tmp_path) == [f"{os.path.basename(profiler.stats()['last'])}"]
+
+
+@pytest.mark.asyncio
+async def test_fast_request_is_not_profiled(tmp_path):
+    profiler = Profiler(slow_ms=500, interval_ms=5, directory=str(tmp_path))
+
+    with tracing.start() as trace:
+        async with profiler.watch(trace):
+            await asyncio.sleep(0.01)
+    await asyncio.sleep(0.05)
+
+    assert os.listdir(tmp_path) == []
+    assert profiler.stats()["watching"] == 0
@@ -0,0 +1,62 @@
+import asyncio
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from src.services.warmup import Warmup
+
+PACKAGE_DIR = Path(__file__).resolve().parent.parent
+
+
+@pytest.mark.asyncio
+async def test_ready_only_after_every_step_finished(monkeypatch):
+    from src import server
+
+    warmup = Warmup(enabled=True)
+    monkeypatch.setattr(server, "warmup", warmup)
+    release = asyncio.Event()
+
+    async def slow():
+        await release.wait()
+
+    async def broken():
+        raise RuntimeError("no route to host")
+
+    warmup.start({"slow": slow, "broken": broken})
+    await asyncio.sleep(0.05)
+    response = await server.handle_ready(None)
+    assert response.status_code == 503
+    assert json.loads(response.body)["status"] == "warming"
+
+    release.set()
+    await asyncio.wait_for(warmup._task, timeout=5)
+    response = await server.handle_ready(None)
+    body = json.loads(response.body)
+    assert response.status_code == 200
+    assert body["status"] == "ready"
+    assert set(body["steps_ms"]) == {"slow", "broken"}
+    # A failed step is reported but does not hold readiness back
+    assert body["errors"] == {"broken": "no route to host"}
+
+
+@pytest.mark.asyncio
+async def test_disabled_warmup_is_ready_at_once():
+    warmup = Warmup(enabled=False)
+    warmup.start({"never": lambda: asyncio.sleep(10)})
+
+    assert warmup.ready
+    assert warmup.stats()["steps_ms"] == {}
+    await warmup.close()
+
+
+def test_server_import_leaves_extraction_libraries_unloaded():
+    code = (
+        "import sys, src.server; "
+        "print(sorted(m for m in ('trafilatura', 'readability', 'html2text', 'pypdf') if m in sys.modules))"
+    )
+    proc = subprocess.run([sys.executable, "-c", code], cwd=PACKAGE_DIR, capture_output=True, text=True, check=True)
+
+    assert proc.stdout.strip() == "[]"
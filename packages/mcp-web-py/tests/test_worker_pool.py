@@ -0,0 +1,71 @@
+import signal
+import time
+
+import pytest
+
+from src.services import extraction, worker_pool
+from src.services.worker_pool import ExtractionTimeout, WorkerPool
+
+HTML = (
+    "<html><head><title>T</title></head><body><article><h1>Heading</h1><p>"
+    + "Readable article text for the extractor. " * 30
+    + "</p></article></body></html>"
+)
+
+
+@pytest.mark.asyncio
+async def test_extraction_runs_in_worker_process():
+    pool = WorkerPool(workers=1, timeout=30)
+    try:
+        result = await pool.run(extraction.extract_all, HTML)
+    finally:
+        await pool.close()
+    assert result["method"] == "trafilatura"
+    assert "Readable article text" in result["formats"]["markdown"]
+
+
+@pytest.mark.asyncio
+async def test_task_timeout_interrupts_worker():
+    pool = WorkerPool(workers=1, timeout=0.3)
+    try:
+        await pool.start()
+        start = time.monotonic()
+        with pytest.raises(ExtractionTimeout):
+            await pool.run(time.sleep, 10)
+        assert time.monotonic() - start < 2
+        # The worker survived the alarm and keeps serving
+        assert (await pool.run(extraction.extract_all, HTML))["formats"]["text"]
+    finally:
+        await pool.close()
+    assert pool.stats()["timeouts"] == 1
+
+
+def _stuck_beyond_alarm(seconds: float) -> None:
+    # Like a long C call: SIGALRM cannot interrupt it
+    signal.pthread_sigmask(signal.SIG_BLOCK, {signal.SIGALRM})
+    time.sleep(seconds)
+
+
+@pytest.mark.asyncio
+async def test_stuck_worker_is_replaced_after_the_grace(monkeypatch):
+    monkeypatch.setattr(worker_pool, "_TIMEOUT_GRACE", 0.3)
+    pool = WorkerPool(workers=1, timeout=0.2)
+    try:
+        await pool.start()
+        start = time.monotonic()
+        with pytest.raises(ExtractionTimeout):
+            await pool.run(_stuck_beyond_alarm, 30)
+        assert time.monotonic() - start < 2
+        # The next task does not queue behind the stuck one
+        assert (await pool.run(extraction.extract_all, HTML, timeout=10))["formats"]["text"]
+    finally:
+        await pool.close()
+    stats = pool.stats()
+    assert (stats["timeouts"], stats["restarts"]) == (1, 1)
+
+
+@pytest.mark.asyncio
+async def test_inline_mode_without_workers():
+    pool = WorkerPool(workers=0, timeout=30)
+    result = await pool.run(extraction.extract_all, HTML)
+    assert result["title"]